@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+import random
+import time
+
+from cnegng.ACME.spatial2d import Area, Motion, Position
+from cnegng.ACME.spatial2d.flocking import Flock
+from cnegng.ACME.spatial2d.grid import Grid, GridSize
+
+# tiny_shapes sized: 20k agents in a 1M x 1M wrapping world, on a 40x40 grid so
+# the cells are the 25k neighbour radius
+COORDINATE_SPACE = 1_000_000
+NUM_AGENTS = 20_000
+GRID_CELLS = 40
+FRAMES = 120
+
+
+class Agent:
+    def __init__(self, position, motion):
+        self.owning_cell = None
+        self.position = position
+        self.motion = motion
+
+
+def benchmark():
+    random.seed(1)
+    area = Area(0, 0, COORDINATE_SPACE, COORDINATE_SPACE)
+    grid = Grid(area, GridSize(GRID_CELLS, GRID_CELLS), wrap=True)
+    agents = [
+        Agent(area.random_position_inside(), Motion(random.uniform(0, 6.28), 5_000))
+        for _ in range(NUM_AGENTS)
+    ]
+    grid.add_many(agents)
+    flock = Flock.for_grid(grid, agents)
+    flock.seek(range(0, NUM_AGENTS, 10), Position(500_000, 500_000))
+
+    stepping = writing = 0.0
+    for _ in range(FRAMES):
+        start = time.perf_counter()
+        flock.step(1 / 60)
+        stepping += time.perf_counter() - start
+        start = time.perf_counter()
+        flock.write_back()
+        writing += time.perf_counter() - start
+    print(f"Flock.for_grid on a {GRID_CELLS}x{GRID_CELLS} grid, {NUM_AGENTS} agents")
+    print(f"step: {stepping / FRAMES * 1000:.2f} ms per frame")
+    print(f"write_back: {writing / FRAMES * 1000:.2f} ms per frame")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cnegng.ACME.spatial2d import Area, Circle, Position
+from cnegng.ACME.spatial2d.grid import Grid, GridSize
+
+# Same shape of workload as tiny_shapes: 20k sprites in a 1M x 1M space, 20x20 grid
+COORDINATE_SPACE = 1_000_000
+NUM_SPRITES = 20_000
+GRID_CELLS = 20
+NUM_QUERIES = 2_000
+QUERY_RADIUS = 25_000
+
+
+class DemoSprite:
+    def __init__(self, position):
+        self.owning_cell = None
+        self.position = position
+
+
+def build_grid():
+    area = Area(0, 0, COORDINATE_SPACE, COORDINATE_SPACE)
+    grid = Grid(area, GridSize(GRID_CELLS, GRID_CELLS))
+    for _ in range(NUM_SPRITES):
+        sprite = DemoSprite(area.random_position_inside())
+        grid.add_to_cell(sprite, coords=sprite.position)
+    return grid
+
+
+def benchmark():
+    random.seed(1)
+    grid = build_grid()
+    shapes = [
+        Circle(
+            Position(
+                random.uniform(0, COORDINATE_SPACE), random.uniform(0, COORDINATE_SPACE)
+            ),
+            QUERY_RADIUS,
+        )
+        for _ in range(NUM_QUERIES)
+    ]
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+
+    baseline = None
+    for workers in (1, 2, 4, 8):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            grid.query_batch(shapes[:50], executor=executor, max_workers=workers)
+            start = time.perf_counter()
+            grid.query_batch(shapes, executor=executor, max_workers=workers)
+            elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(
+            f"{workers} thread(s): {elapsed:.4f} seconds, speedup {baseline / elapsed:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
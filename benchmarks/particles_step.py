@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+import time
+
+import numpy as np
+import pygame
+
+from cnegng.ACME.particles import ParticleSystem
+from cnegng.ACME.spatial2d import Area
+
+# a full 1080p frame of sparks: 100k particles, all alive, spread over the screen
+NUM_PARTICLES = 100_000
+SCREEN_WIDTH = 1920
+SCREEN_HEIGHT = 1080
+FRAMES = 120
+
+
+def benchmark():
+    world = Area(top=0, left=0, bottom=SCREEN_HEIGHT, right=SCREEN_WIDTH)
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), depth=32)
+    particles = ParticleSystem(NUM_PARTICLES, gravity=(0, 50), drag=0.1, seed=1)
+    rng = np.random.default_rng(1)
+    particles.emit(
+        rng.uniform(0, SCREEN_WIDTH, NUM_PARTICLES),
+        rng.uniform(0, SCREEN_HEIGHT, NUM_PARTICLES),
+        rng.uniform(-30, 30, NUM_PARTICLES),
+        rng.uniform(-30, 30, NUM_PARTICLES),
+        # longer than the run, so every particle is drawn every frame
+        FRAMES,
+        (255, 200, 0),
+    )
+
+    updating = rendering = 0.0
+    drawn = 0
+    for _ in range(FRAMES):
+        start = time.perf_counter()
+        particles.update(1 / 60)
+        updating += time.perf_counter() - start
+        surface.fill((0, 0, 0))
+        start = time.perf_counter()
+        drawn += particles.render(surface, world)
+        rendering += time.perf_counter() - start
+    print(
+        f"ParticleSystem, {NUM_PARTICLES} particles on a "
+        f"{SCREEN_WIDTH}x{SCREEN_HEIGHT} surface, {drawn // FRAMES} drawn a frame"
+    )
+    print(f"update: {updating / FRAMES * 1000:.2f} ms per frame")
+    print(f"render: {rendering / FRAMES * 1000:.2f} ms per frame")
+    print(f"both: {(updating + rendering) / FRAMES * 1000:.2f} ms per frame")
+
+
+if __name__ == "__main__":
+    benchmark()
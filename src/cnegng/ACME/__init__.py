@@ -5,6 +5,8 @@ from cnegng.ACME.stats.player_wearing_stats import PlayerWearingStats
 from cnegng.ACME.stats.attribute_modifier import AttributeModifier
 from cnegng.ACME.stats.item_with_modifiers import ItemWithModifiers
 from cnegng.ACME.loot_table import LootTable
+from cnegng.ACME.alias_table import AliasTable
+from cnegng.ACME.particles import ParticleSystem
 from cnegng.ACME.events.timed_event_handler import TimedEventHandler
 from cnegng.ACME.game_handler import GameHandler
 
@@ -17,6 +19,8 @@ __all__ = [
     "AttributeModifier",
     "ItemWithModifiers",
     "LootTable",
+    "AliasTable",
+    "ParticleSystem",
     "TimedEventHandler",
     "GameHandler",
 ]
@@ -0,0 +1,142 @@
+import numpy as np
+
+
+def build_alias(weights):
+    """
+    Vose's alias table for a list of weights.
+
+    :param weights: Non-negative weights with a positive sum.
+    :return: (prob, alias) arrays; slot i keeps itself with probability prob[i],
+        otherwise it gives alias[i].
+    """
+    count = len(weights)
+    scaled = np.asarray(weights, dtype=float) * (count / float(np.sum(weights)))
+    prob = np.ones(count)
+    alias = np.arange(count)
+    small = [index for index in range(count) if scaled[index] < 1]
+    large = [index for index in range(count) if scaled[index] >= 1]
+    scaled = scaled.tolist()
+    while small and large:
+        less = small.pop()
+        more = large.pop()
+        prob[less] = scaled[less]
+        alias[less] = more
+        scaled[more] -= 1 - scaled[less]
+        if scaled[more] < 1:
+            small.append(more)
+        else:
+            large.append(more)
+    # whatever is left is 1 up to rounding
+    return prob, alias
+
+
+class AliasTable:
+    """
+    Draws indices with probability proportional to their weights in O(1) each.
+
+    The weights are split into blocks of ``block_size`` with an alias table per
+    block, plus a small alias table choosing between blocks by their totals. A draw
+    picks a block, then a slot in it, then the slot or its alias, all with array
+    operations for a batch. Changing some weights only rebuilds the blocks they
+    are in and the table over the blocks.
+
+    .. code-block:: python
+
+        table = AliasTable([1, 5, 0, 2])
+        picks = table.draw(1000)  # index 1 about five times as often as index 0
+        table.update([2], [10])
+
+    Attributes
+    ----------
+    weights : numpy.ndarray
+        The current weights.
+    blocks_rebuilt : int
+        Blocks rebuilt by the most recent update().
+    """
+
+    def __init__(self, weights, block_size: int = 256, seed=None):
+        """
+        :param weights: Non-negative weight per index.
+        :param block_size: Indices per block.
+        :param seed: Seed or numpy Generator for the draws.
+        """
+        weights = np.array(weights, dtype=float)
+        if weights.ndim != 1 or weights.size == 0:
+            raise ValueError("weights must be a non-empty list")
+        if (weights < 0).any():
+            raise ValueError("weights must not be negative")
+        self.weights = weights
+        self.block_size = block_size
+        self.rng = np.random.default_rng(seed)
+        blocks = -(-weights.size // block_size)
+        self._prob = np.ones((blocks, block_size))
+        self._alias = np.tile(np.arange(block_size), (blocks, 1))
+        self._block_totals = np.zeros(blocks)
+        self.blocks_rebuilt = 0
+        self._rebuild(range(blocks))
+
+    def __len__(self):
+        return self.weights.size
+
+    def __repr__(self):
+        return f"AliasTable({len(self)} weights, total={self.total})"
+
+    @property
+    def total(self) -> float:
+        return float(self._block_totals.sum())
+
+    def _rebuild(self, blocks):
+        size = self.block_size
+        rebuilt = 0
+        for block in blocks:
+            part = self.weights[block * size : (block + 1) * size]
+            padded = np.zeros(size)
+            padded[: part.size] = part
+            total = padded.sum()
+            self._block_totals[block] = total
+            if total > 0:
+                self._prob[block], self._alias[block] = build_alias(padded)
+            rebuilt += 1
+        self.blocks_rebuilt = rebuilt
+        if self.total > 0:
+            self._top_prob, self._top_alias = build_alias(self._block_totals)
+
+    def update(self, indices, weights) -> None:
+        """
+        Change the weights of some indices, rebuilding only their blocks.
+
+        :param indices: Indices to change.
+        :param weights: Their new weights.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        weights = np.asarray(weights, dtype=float)
+        if (weights < 0).any():
+            raise ValueError("weights must not be negative")
+        self.weights[indices] = weights
+        self._rebuild(np.unique(indices // self.block_size).tolist())
+
+    def draw(self, count: int) -> np.ndarray:
+        """
+        Draw count indices at once.
+
+        :return: An int64 array of indices.
+        """
+        if self.total <= 0:
+            raise ValueError("Cannot draw from weights that are all zero")
+        rng = self.rng
+        block = self._pick(self._top_prob, self._top_alias, count)
+        size = self.block_size
+        spot = rng.random(count) * size
+        slot = spot.astype(np.int64)
+        np.minimum(slot, size - 1, out=slot)
+        keep = spot - slot < self._prob[block, slot]
+        return block * size + np.where(keep, slot, self._alias[block, slot])
+
+    def draw_one(self) -> int:
+        return int(self.draw(1)[0])
+
+    def _pick(self, prob, alias, count):
+        spot = self.rng.random(count) * prob.size
+        slot = spot.astype(np.int64)
+        np.minimum(slot, prob.size - 1, out=slot)
+        return np.where(spot - slot < prob[slot], slot, alias[slot])
@@ -0,0 +1,37 @@
+from cnegng.ACME.events.exceptions import DuplicateHandlersError
+
+
+class MouseButtonEventHandler:
+    """
+    A class to register and handle mouse button events.
+
+    Works like KeyEventHandler, dispatching on the event's ``button`` instead of
+    its ``key``.
+
+    Methods
+    -------
+    register_button_event(button, handler_method)
+        Registers a handler method to be invoked when the specified button is used.
+    """
+
+    def __init__(self):
+        self.button_event_handlers = {}
+
+    def register_button_event(self, button, handler_method):
+        """
+        Registers a handler method for the specified mouse button.
+
+        :param button: The button number from pygame (e.g., ``pygame.BUTTON_LEFT``).
+        :type button: int
+        :param handler_method: The method to call with the event.
+        :type handler_method: function
+        """
+        if button in self.button_event_handlers:
+            raise DuplicateHandlersError(
+                f'Duplicate mouse handler configured for button "{button}"'
+            )
+        self.button_event_handlers[button] = handler_method
+
+    def __call__(self, event):
+        if (button_event := self.button_event_handlers.get(event.button)) is not None:
+            button_event(event)
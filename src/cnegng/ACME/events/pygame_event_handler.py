@@ -1,6 +1,9 @@
 import pygame
 
+from cnegng.ACME.spatial2d.position import Position
+
 from cnegng.ACME.events.key_event_handler import KeyEventHandler
+from cnegng.ACME.events.mouse_button_event_handler import MouseButtonEventHandler
 
 
 class PyGameEventHandler:
@@ -23,6 +26,10 @@ class PyGameEventHandler:
         convenience method for setting up keyup events to a specific key.
     register_key_event_handler(self, event_type, key, handler_method)
         sets up a KeyEventHandler for the given event_type, then uses it to register a handler for the given key.
+    register_mousedown_event_handler(self, button, handler_method)
+        convenience method for setting up mouse button down events for a specific button.
+    register_pick_handler(self, picker, handler_method, button=pygame.BUTTON_LEFT)
+        calls handler_method with the object clicked on, as found by a Picker.
 
     :Example:
 
@@ -103,3 +110,51 @@ class PyGameEventHandler:
             self.event_handlers[event_type] = KeyEventHandler()
         # if it blows up here because NoMethodError for register_key_event, it means something is already configured to listen to this event_type that isn't using a KeyEventHandler
         self.event_handlers[event_type].register_key_event(key, handler_method)
+
+    def register_mousedown_event_handler(self, button, handler_method):
+        """Register a callback for when a specific mouse button is pressed
+
+        :param button: the mouse button to react to, e.g. pygame.BUTTON_LEFT
+        :param handler_method: the method to call when this event is handled.  It works well to use a method from a class that inherits from PyGameEventHandler
+
+        """
+        self.register_mouse_button_event_handler(
+            pygame.MOUSEBUTTONDOWN, button, handler_method
+        )
+
+    def register_mouseup_event_handler(self, button, handler_method):
+        """Register a callback for when a specific mouse button is released
+
+        :param button: the mouse button to react to, e.g. pygame.BUTTON_LEFT
+        :param handler_method: the method to call when this event is handled.  It works well to use a method from a class that inherits from PyGameEventHandler
+
+        """
+        self.register_mouse_button_event_handler(
+            pygame.MOUSEBUTTONUP, button, handler_method
+        )
+
+    def register_mouse_button_event_handler(self, event_type, button, handler_method):
+        """Register a callback for a specific mouse button event
+
+        :param event_type: the event type we are registering a handler for.
+        :param button: the mouse button to react to.  If it already exists, DuplicateHandlersError will be raised instead
+        :param handler_method: the method to call when this event is handled.
+
+        """
+        if event_type not in self.event_handlers:
+            self.event_handlers[event_type] = MouseButtonEventHandler()
+        self.event_handlers[event_type].register_button_event(button, handler_method)
+
+    def register_pick_handler(self, picker, handler_method, button=pygame.BUTTON_LEFT):
+        """Register a callback for clicking on objects
+
+        :param picker: a Picker that finds the object under the mouse
+        :param handler_method: called with (picked object or None, event) when the button is pressed
+        :param button: the mouse button to react to
+
+        """
+
+        def pick(event):
+            handler_method(picker.pick(Position(*event.pos)), event)
+
+        self.register_mousedown_event_handler(button, pick)
@@ -28,6 +28,13 @@ class TimedEventHandler:
         self._current_time: float = 0.0  # Internal clock to manage virtual time
         self._counter = itertools.count()
 
+    @property
+    def current_time(self) -> float:
+        """
+        The internal clock: the seconds applied so far.
+        """
+        return self._current_time
+
     def add_event(
         self, time_until_trigger: float, callback: Callable[[], None]
     ) -> None:
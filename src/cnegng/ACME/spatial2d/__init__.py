@@ -1,9 +1,21 @@
 from cnegng.ACME.spatial2d.area import Area
 from cnegng.ACME.spatial2d.dimensions import Dimensions
-from cnegng.ACME.spatial2d.grid import Grid, GridCoord, GlobalCoord, GridCell
+from cnegng.ACME.spatial2d.grid import (
+    Grid,
+    GridCoord,
+    GlobalCoord,
+    GridCell,
+    SweptHit,
+)
 from cnegng.ACME.spatial2d.position import Position
 from cnegng.ACME.spatial2d.motion import Motion
 from cnegng.ACME.spatial2d.circle import Circle
+from cnegng.ACME.spatial2d.polygon import Polygon
+from cnegng.ACME.spatial2d.influence_map import InfluenceMap
+from cnegng.ACME.spatial2d.packed_rtree import PackedRTree
+from cnegng.ACME.spatial2d.fixed_point import FixedPoint
+from cnegng.ACME.spatial2d.picking import Picker
+from cnegng.ACME.spatial2d.visibility import VisibilityMap
 
 __all__ = [
     "Area",
@@ -13,6 +25,13 @@ __all__ = [
     "Position",
     "Motion",
     "Circle",
+    "Polygon",
+    "InfluenceMap",
+    "PackedRTree",
+    "FixedPoint",
+    "Picker",
+    "VisibilityMap",
     "GlobalCoord",
     "GridCoord",
+    "SweptHit",
 ]
@@ -20,6 +20,13 @@ class Circle:
         # Check if the distance is less than or equal to the radius
         return distance <= self.radius
 
+    def overlaps_with_circle(self, other: "Circle") -> bool:
+        """Check if two circles overlap (touching counts)."""
+        reach = self.radius + other.radius
+        return (self.center.x - other.center.x) ** 2 + (
+            self.center.y - other.center.y
+        ) ** 2 <= reach * reach
+
     def move_along_arc(self, position, speed, dt):
         # Get the center coordinates
         C_x, C_y = self.center.x, self.center.y
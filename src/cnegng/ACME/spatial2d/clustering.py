@@ -0,0 +1,246 @@
+from typing import Dict, List
+
+import numpy as np
+
+from cnegng.ACME.spatial2d.grid.batch_query import LayerSnapshot
+
+NOISE = -1
+
+
+def connected_roots(count: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Union-find over an edge list, done with array operations.
+
+    Every round hooks the larger root of each edge under the smaller one and then
+    compresses paths until every entry points straight at its root.
+
+    :param count: Number of nodes.
+    :param a: Edge endpoints.
+    :param b: Edge endpoints, same length as a.
+    :return: The parent array; parent[i] is the smallest node in i's component.
+    """
+    parent = np.arange(count)
+    while True:
+        root_a, root_b = parent[a], parent[b]
+        split = root_a != root_b
+        if not split.any():
+            return parent
+        low = np.minimum(root_a[split], root_b[split])
+        high = np.maximum(root_a[split], root_b[split])
+        np.minimum.at(parent, high, low)
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+
+class DensityClusters:
+    """
+    DBSCAN clustering of the point objects in one Grid layer.
+
+    A point with at least ``min_points`` objects (itself included) within ``eps`` is
+    a core point; core points within eps of each other share a cluster, and other
+    points join the cluster of any core point within eps, or are noise (label -1).
+
+    Neighbours come from Grid.query_circles, so only objects in nearby cells are
+    ever compared. On update() only points near something that moved are queried
+    again; the clusters are then re-merged with union-find over the stored
+    neighbour lists. Cluster labels carry over between updates: a cluster keeps the
+    label most of its members had before.
+
+    .. code-block:: python
+
+        clusters = DensityClusters(grid, eps=40, min_points=4)
+        # every tick, after moving things
+        labels = clusters.update()
+        for label, members in clusters.clusters().items():
+            ...
+
+    Attributes
+    ----------
+    objects : list
+        The clustered objects; labels[i] belongs to objects[i].
+    labels : numpy.ndarray
+        Cluster label per object, -1 for noise.
+    """
+
+    def __init__(
+        self,
+        grid,
+        eps: float,
+        min_points: int = 4,
+        layer="default",
+        full_rebuild_fraction: float = 0.25,
+    ):
+        """
+        :param grid: The grid holding the objects.
+        :param eps: Neighbourhood radius.
+        :param min_points: Neighbours (including the point itself) making a core point.
+        :param layer: The layer to cluster.
+        :param full_rebuild_fraction: Moved fraction beyond which everything is
+            recomputed rather than patched.
+        """
+        self.grid = grid
+        self.eps = eps
+        self.min_points = min_points
+        self.layer = layer
+        self.full_rebuild_fraction = full_rebuild_fraction
+        self.version = None
+        self.objects: List = []
+        self.labels = np.empty(0, dtype=np.int64)
+        self._index: Dict = {}
+        self._xs = np.empty(0)
+        self._ys = np.empty(0)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._neighbours = np.empty(0, dtype=np.int64)
+        self._next_label = 0
+
+    def __repr__(self):
+        return (
+            f"DensityClusters(eps={self.eps}, min_points={self.min_points}, "
+            f"objects={len(self.objects)})"
+        )
+
+    def update(self) -> np.ndarray:
+        """
+        Bring the clustering up to date with the grid.
+
+        :return: The labels array, aligned with self.objects.
+        """
+        grid = self.grid
+        if self.version == grid.version:
+            return self.labels
+        snapshot = grid.layer_snapshot(self.layer)
+        self.version = grid.version
+
+        order = self._order(snapshot)
+        if order is None:
+            self._rebuild(snapshot)
+        else:
+            xs = np.empty(order.size)
+            ys = np.empty(order.size)
+            xs[order] = snapshot.xs
+            ys[order] = snapshot.ys
+            moved = np.flatnonzero((xs != self._xs) | (ys != self._ys))
+            if moved.size == 0:
+                return self.labels
+            if moved.size > self.full_rebuild_fraction * order.size:
+                self._rebuild(snapshot)
+            else:
+                self._patch(order, moved, xs, ys)
+        self._label()
+        return self.labels
+
+    def _order(self, snapshot: LayerSnapshot):
+        """Our index for every snapshot object, or None if the membership changed."""
+        if len(snapshot) != len(self.objects):
+            return None
+        index = self._index
+        try:
+            return np.fromiter(
+                (index[obj] for obj in snapshot.objects), np.int64, len(snapshot)
+            )
+        except KeyError:
+            return None
+
+    def _rebuild(self, snapshot: LayerSnapshot):
+        old_index, old_labels = self._index, self.labels.tolist()
+        self.objects = list(snapshot.objects)
+        self._index = {obj: index for index, obj in enumerate(self.objects)}
+        self._xs = snapshot.xs.copy()
+        self._ys = snapshot.ys.copy()
+        # snapshot order is our order, so query results need no translation
+        results = self.grid.query_circles(self._xs, self._ys, self.eps, self.layer)
+        self._offsets, self._neighbours = results.offsets, results.indices
+        # keep the old labels by object so _stable_labels can carry them over
+        self.labels = np.fromiter(
+            (
+                old_labels[old_index[obj]] if obj in old_index else NOISE
+                for obj in self.objects
+            ),
+            np.int64,
+            len(self.objects),
+        )
+
+    def _patch(self, order, moved, xs, ys):
+        """Re-query only the points whose neighbourhood can have changed."""
+        grid = self.grid
+        # everything near a moved point's old position...
+        starts = self._offsets[moved]
+        old_near = self._neighbours[_ranges(starts, self._offsets[moved + 1] - starts)]
+        # ...or near its new one
+        new_near = grid.query_circles(xs[moved], ys[moved], self.eps, self.layer)
+        dirty = np.unique(np.concatenate([moved, old_near, order[new_near.indices]]))
+        refreshed = grid.query_circles(xs[dirty], ys[dirty], self.eps, self.layer)
+
+        counts = np.diff(self._offsets)
+        counts[dirty] = refreshed.counts()
+        offsets = np.zeros(counts.size + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        # gather every row from either the old neighbour lists or the fresh ones
+        pool = np.concatenate([self._neighbours, order[refreshed.indices]])
+        starts = self._offsets[:-1].copy()
+        starts[dirty] = self._neighbours.size + refreshed.offsets[:-1]
+        self._neighbours = pool[_ranges(starts, counts)]
+        self._offsets = offsets
+        self._xs, self._ys = xs, ys
+
+    def _label(self):
+        count = len(self.objects)
+        degree = np.diff(self._offsets)
+        core = degree >= self.min_points
+        source = np.repeat(np.arange(count), degree)
+        target = self._neighbours
+        both = core[source] & core[target]
+        roots = connected_roots(count, source[both], target[both])
+
+        fresh = np.full(count, NOISE, dtype=np.int64)
+        fresh[core] = roots[core]
+        border = ~core[source] & core[target]
+        fresh[source[border]] = roots[target[border]]
+        self.labels = self._stable_labels(fresh)
+
+    def _stable_labels(self, roots: np.ndarray) -> np.ndarray:
+        """Map component roots to labels, reusing each cluster's previous label."""
+        labels = np.full(roots.size, NOISE, dtype=np.int64)
+        clustered = np.flatnonzero(roots != NOISE)
+        if clustered.size == 0:
+            return labels
+        cluster_ids, members = np.unique(roots[clustered], return_inverse=True)
+        old = self.labels[clustered]
+
+        # votes for (cluster, old label), biggest first
+        pairs, votes = np.unique(np.stack([members, old]), axis=1, return_counts=True)
+        assigned = np.full(cluster_ids.size, NOISE, dtype=np.int64)
+        taken = set()
+        for cluster, label in pairs[:, np.argsort(-votes, kind="stable")].T.tolist():
+            if label != NOISE and assigned[cluster] == NOISE and label not in taken:
+                assigned[cluster] = label
+                taken.add(label)
+        for cluster in np.flatnonzero(assigned == NOISE).tolist():
+            assigned[cluster] = self._next_label
+            self._next_label += 1
+        self._next_label = max(self._next_label, int(assigned.max()) + 1)
+        labels[clustered] = assigned[members]
+        return labels
+
+    def label_of(self, obj) -> int:
+        """The cluster label of one object, -1 for noise."""
+        return int(self.labels[self._index[obj]])
+
+    def clusters(self) -> Dict[int, list]:
+        """Members of every cluster, keyed by label; noise is left out."""
+        result = {}
+        objects = self.objects
+        for index, label in enumerate(self.labels.tolist()):
+            if label != NOISE:
+                result.setdefault(label, []).append(objects[index])
+        return result
+
+
+def _ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(start, start + count) for every (start, count)."""
+    total = int(counts.sum())
+    first = np.cumsum(counts) - counts
+    return np.repeat(starts - first, counts) + np.arange(total)
@@ -0,0 +1,483 @@
+import math
+from typing import Sequence
+
+import numpy as np
+
+from cnegng.ACME.spatial2d.area import Area
+from cnegng.ACME.spatial2d.grid.batch_query import _expand
+from cnegng.ACME.spatial2d.motion import Motion
+from cnegng.ACME.spatial2d.position import Position
+
+
+def _shifted(values: np.ndarray, row_offset: int, col_offset: int, wrap: bool):
+    """result[r, c] = values[r + row_offset, c + col_offset], zero (or wrapped) outside."""
+    if wrap:
+        return np.roll(values, (-row_offset, -col_offset), axis=(0, 1))
+    rows, cols = values.shape
+    result = np.zeros_like(values)
+    src_rows = slice(max(0, row_offset), rows + min(0, row_offset))
+    dst_rows = slice(max(0, -row_offset), rows + min(0, -row_offset))
+    src_cols = slice(max(0, col_offset), cols + min(0, col_offset))
+    dst_cols = slice(max(0, -col_offset), cols + min(0, -col_offset))
+    result[dst_rows, dst_cols] = values[src_rows, src_cols]
+    return result
+
+
+class _Lattice:
+    """Cells over the flock's area, used to aggregate agents."""
+
+    def __init__(self, area: Area, cols: int, rows: int, wrap: bool, grid=None):
+        self.area = area
+        self.wrap = wrap
+        self.cols = cols
+        self.rows = rows
+        if wrap and (cols < 3 or rows < 3):
+            # with fewer, the wrapped neighbourhood would count cells twice
+            raise ValueError(f"A wrapped flock needs 3 cells a side, got {cols}x{rows}")
+        self.cell_width = area.width / cols
+        self.cell_height = area.height / rows
+        # the grid whose cells these are, which then bins the agents itself
+        self.grid = grid
+
+    @classmethod
+    def of_size(cls, area: Area, cell_size: float, wrap: bool) -> "_Lattice":
+        """As many cells of at least cell_size as fit."""
+        cols = max(1, int(area.width // cell_size))
+        rows = max(1, int(area.height // cell_size))
+        return cls(area, cols, rows, wrap)
+
+    @classmethod
+    def of_grid(cls, grid) -> "_Lattice":
+        """The cells of a Grid."""
+        return cls(
+            grid.area, grid.grid_size.width, grid.grid_size.height, grid.wrap, grid
+        )
+
+    def cells(self, xs, ys):
+        """The column and row of every agent."""
+        if self.grid is not None:
+            col, row = self.grid._cells_of_many(xs, ys)
+        else:
+            # positions are inside the area, so truncation is the floor here
+            col = ((xs - self.area.left) * (1 / self.cell_width)).astype(np.int64)
+            row = ((ys - self.area.top) * (1 / self.cell_height)).astype(np.int64)
+        np.clip(col, 0, self.cols - 1, out=col)
+        np.clip(row, 0, self.rows - 1, out=row)
+        return col, row
+
+    def candidate_pairs(self, xs, ys):
+        """
+        Every pair of agents in the same or neighbouring cells, each pair once.
+
+        Cells are paired with themselves and four of their eight neighbours, so
+        no pair is listed twice; with cells at least r wide this finds every pair
+        closer than r.
+
+        :return: (a, b) index arrays.
+        """
+        col, row = self.cells(xs, ys)
+        cols, rows = self.cols, self.rows
+        flat = row * cols + col
+        # any order within a cell will do, and the unstable sort is much quicker
+        order = np.argsort(flat)
+        start = np.zeros(cols * rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(flat, minlength=cols * rows), out=start[1:])
+        # where each agent sits in the cell-sorted order
+        slot = np.empty_like(order)
+        slot[order] = np.arange(order.size)
+        # in its own cell, only the agents after this one
+        agents = [np.arange(order.size)]
+        firsts = [slot + 1]
+        ends = [start[flat + 1]]
+        # and everyone in four of the neighbouring cells, all offsets in one go
+        other_col = col + np.array([[1], [-1], [0], [1]])
+        other_row = row + np.array([[0], [1], [1], [1]])
+        if self.wrap:
+            agents.append(np.tile(agents[0], 4))
+            other_col = (other_col % cols).ravel()
+            other_row = (other_row % rows).ravel()
+        else:
+            inside = (
+                (other_col >= 0)
+                & (other_col < cols)
+                & (other_row >= 0)
+                & (other_row < rows)
+            ).ravel()
+            agents.append(np.flatnonzero(inside) % order.size)
+            other_col = other_col.ravel()[inside]
+            other_row = other_row.ravel()[inside]
+        other = other_row * cols + other_col
+        firsts.append(start[other])
+        ends.append(start[other + 1])
+        agents = np.concatenate(agents)
+        first = np.concatenate(firsts)
+        count = np.concatenate(ends) - first
+        # most agents have nobody in a given neighbouring sub-cell
+        some = np.flatnonzero(count > 0)
+        members, run = _expand(first[some], count[some])
+        return agents[some[run]], order[members]
+
+    def neighbourhood(self, xs, ys, vxs, vys):
+        """
+        Per agent, the count, position sum and velocity sum of all agents in its
+        cell and the eight around it, themselves excluded. Positions are relative
+        to the agent, so wrapped neighbourhoods work without special cases.
+        """
+        col, row = self.cells(xs, ys)
+        flat = row * self.cols + col
+        size = self.rows * self.cols
+        shape = (self.rows, self.cols)
+        # positions relative to the owning cell's corner keep the sums small and
+        # let neighbouring cells be moved by whole cell offsets
+        rel_x = xs - (self.area.left + col * self.cell_width)
+        rel_y = ys - (self.area.top + row * self.cell_height)
+        count = np.bincount(flat, minlength=size).reshape(shape).astype(float)
+        sum_x = np.bincount(flat, rel_x, size).reshape(shape)
+        sum_y = np.bincount(flat, rel_y, size).reshape(shape)
+        sum_vx = np.bincount(flat, vxs, size).reshape(shape)
+        sum_vy = np.bincount(flat, vys, size).reshape(shape)
+
+        total = np.zeros(shape)
+        total_x = np.zeros(shape)
+        total_y = np.zeros(shape)
+        total_vx = np.zeros(shape)
+        total_vy = np.zeros(shape)
+        for row_offset in (-1, 0, 1):
+            for col_offset in (-1, 0, 1):
+                n = _shifted(count, row_offset, col_offset, self.wrap)
+                total += n
+                total_x += _shifted(sum_x, row_offset, col_offset, self.wrap)
+                total_x += n * (col_offset * self.cell_width)
+                total_y += _shifted(sum_y, row_offset, col_offset, self.wrap)
+                total_y += n * (row_offset * self.cell_height)
+                total_vx += _shifted(sum_vx, row_offset, col_offset, self.wrap)
+                total_vy += _shifted(sum_vy, row_offset, col_offset, self.wrap)
+
+        total = total.ravel()[flat] - 1
+        offset_x = total_x.ravel()[flat] - (total + 1) * rel_x
+        offset_y = total_y.ravel()[flat] - (total + 1) * rel_y
+        return (
+            total,
+            offset_x,
+            offset_y,
+            total_vx.ravel()[flat] - vxs,
+            total_vy.ravel()[flat] - vys,
+        )
+
+
+class Flock:
+    """
+    Boids-style flocking and steering for many agents, computed in batches.
+
+    Positions and velocities live in NumPy arrays, and neighbours are gathered
+    per cell rather than by pair tests: each step bins the agents, sums counts,
+    positions and velocities per cell, and reads every agent's alignment and
+    cohesion neighbourhood from its own and the eight surrounding cells, so that
+    part of the step is linear in the number of agents. Neighbourhoods are square
+    blocks of cells rather than exact circles.
+
+    A flock made with for_grid() uses the grid's own cells for this, and so
+    reaches about one grid cell around each agent. Separation, which has to be
+    sharp, uses exact distances: each grid cell is split into sub-cells at least
+    ``separation_radius`` wide, every pair of agents in the same or neighbouring
+    sub-cells is measured once, and only the pairs closer than
+    ``separation_radius`` push. write_back() then rebins the agents with
+    Grid.rebin_many(), so the grid's cells, caches and snapshots follow them.
+
+    A flock with no grid uses lattices of its own instead, with cells of
+    ``neighbour_radius`` for alignment and cohesion and of ``separation_radius``
+    for separation.
+
+    On a 40x40 wrapping grid, 20k agents take about 20 ms a step and 15 ms to
+    write back on one core (benchmarks/flock_step.py), so at that size a flock
+    runs at 30 FPS rather than 60.
+
+    .. code-block:: python
+
+        flock = Flock.for_grid(grid, sprites)
+        # every frame
+        flock.step(dt)
+        flock.write_back()
+
+    Attributes
+    ----------
+    agents : list
+        The agents; row i of the arrays belongs to agents[i].
+    xs, ys : numpy.ndarray
+        Positions.
+    vxs, vys : numpy.ndarray
+        Velocities, distance per second.
+    """
+
+    def __init__(
+        self,
+        area: Area,
+        agents: Sequence,
+        neighbour_radius: float,
+        separation_radius: float = None,
+        max_speed: float = 10_000,
+        max_force: float = 20_000,
+        wrap: bool = False,
+        grid=None,
+        layer="default",
+    ):
+        """
+        :param area: The world the agents live in.
+        :param agents: Objects with a position and optionally a motion.
+        :param neighbour_radius: Reach of alignment and cohesion; with a grid, no
+            more than its cells, which set the reach.
+        :param separation_radius: Reach of separation; defaults to a quarter of
+            neighbour_radius.
+        :param max_speed: Speed limit, distance per second.
+        :param max_force: Limit on the steering acceleration.
+        :param wrap: The world wraps around its edges (positions are wrapped too).
+        :param grid: Grid holding the agents, to gather neighbours through; see
+            for_grid().
+        :param layer: The grid layer the agents are in.
+        """
+        self.area = area.clone()
+        self.agents = list(agents)
+        self.wrap = wrap
+        self.max_speed = max_speed
+        self.max_force = max_force
+        if separation_radius is None:
+            separation_radius = neighbour_radius / 4
+        self.neighbour_radius = neighbour_radius
+        self.separation_radius = separation_radius
+        self.grid = grid
+        self.layer = layer
+        if grid is None:
+            self._neighbours = _Lattice.of_size(self.area, neighbour_radius, wrap)
+            self._separation = _Lattice.of_size(self.area, separation_radius, wrap)
+        elif neighbour_radius > min(grid.cell_width, grid.cell_height):
+            raise ValueError(
+                f"neighbour_radius {neighbour_radius} is larger than the grid's cells"
+            )
+        self.weights = {
+            "separation": 1.5,
+            "alignment": 1.0,
+            "cohesion": 1.0,
+            "seek": 1.0,
+            "flee": 1.0,
+        }
+
+        count = len(self.agents)
+        self.xs = np.fromiter((a.position.x for a in self.agents), float, count)
+        self.ys = np.fromiter((a.position.y for a in self.agents), float, count)
+        velocities = np.array(
+            [
+                a.motion.velocity() if getattr(a, "motion", None) else (0.0, 0.0)
+                for a in self.agents
+            ],
+            dtype=float,
+        ).reshape(count, 2)
+        self.vxs = velocities[:, 0].copy()
+        self.vys = velocities[:, 1].copy()
+        # per agent steering targets; NaN means none
+        self.seek_x = np.full(count, np.nan)
+        self.seek_y = np.full(count, np.nan)
+        self.flee_x = np.full(count, np.nan)
+        self.flee_y = np.full(count, np.nan)
+
+    @classmethod
+    def for_grid(cls, grid, agents: Sequence, neighbour_radius: float = None, **kwargs):
+        """
+        A Flock over a Grid's area, sharing its wrap mode, that finds neighbours
+        through the grid's cells. The agents must already be in the grid, in
+        ``layer``. neighbour_radius defaults to the grid's cell size.
+        """
+        kwargs.setdefault("wrap", grid.wrap)
+        if neighbour_radius is None:
+            neighbour_radius = min(grid.cell_width, grid.cell_height)
+        return cls(grid.area, agents, neighbour_radius, grid=grid, **kwargs)
+
+    def __len__(self):
+        return len(self.agents)
+
+    def __repr__(self):
+        return f"Flock({len(self)} agents)"
+
+    def seek(self, indices, target: Position) -> None:
+        """Make the given agents steer towards target."""
+        self.seek_x[indices] = target.x
+        self.seek_y[indices] = target.y
+
+    def flee(self, indices, threat: Position) -> None:
+        """Make the given agents steer away from threat."""
+        self.flee_x[indices] = threat.x
+        self.flee_y[indices] = threat.y
+
+    def clear_targets(self, indices=slice(None)) -> None:
+        self.seek_x[indices] = np.nan
+        self.seek_y[indices] = np.nan
+        self.flee_x[indices] = np.nan
+        self.flee_y[indices] = np.nan
+
+    def _offset(self, dx, dy):
+        if self.wrap:
+            width, height = self.area.width, self.area.height
+            dx = (dx + width / 2) % width - width / 2
+            dy = (dy + height / 2) % height - height / 2
+        return dx, dy
+
+    def _toward(self, dx, dy, vxs, vys):
+        """Steering that turns the velocities into max_speed along (dx, dy)."""
+        length = np.hypot(dx, dy)
+        scale = np.divide(
+            self.max_speed, length, out=np.zeros_like(length), where=length > 0
+        )
+        return dx * scale - vxs, dy * scale - vys
+
+    def _steer_to_targets(self, ax, ay, target_x, target_y, weight, away):
+        """Seek (or flee) for the agents that have a target, and only those."""
+        picked = np.flatnonzero(~np.isnan(target_x))
+        if picked.size == 0:
+            return
+        dx = target_x[picked] - self.xs[picked]
+        dy = target_y[picked] - self.ys[picked]
+        if away:
+            dx, dy = -dx, -dy
+        dx, dy = self._offset(dx, dy)
+        tx, ty = self._toward(dx, dy, self.vxs[picked], self.vys[picked])
+        ax[picked] += weight * tx
+        ay[picked] += weight * ty
+
+    def _separation_lattice(self) -> _Lattice:
+        """The grid's cells, each split into sub-cells at least separation_radius wide."""
+        grid = self.grid
+        across = max(1, int(grid.cell_width // self.separation_radius))
+        down = max(1, int(grid.cell_height // self.separation_radius))
+        return _Lattice(
+            self.area,
+            grid.grid_size.width * across,
+            grid.grid_size.height * down,
+            self.wrap,
+        )
+
+    def _close_pairs(self):
+        """Both directions of every pair closer than separation_radius."""
+        a, b = self._separation_lattice().candidate_pairs(self.xs, self.ys)
+        dx, dy = self._offset(self.xs[b] - self.xs[a], self.ys[b] - self.ys[a])
+        close = np.flatnonzero(dx * dx + dy * dy <= self.separation_radius**2)
+        a, b, dx, dy = a[close], b[close], dx[close], dy[close]
+        return (
+            np.concatenate([a, b]),
+            np.concatenate([b, a]),
+            np.concatenate([dx, -dx]),
+            np.concatenate([dy, -dy]),
+        )
+
+    def _pair_sums(self, agent, other, dx, dy):
+        """Per agent the neighbour count, offset sums and velocity sums of the pairs."""
+        count = len(self)
+        return (
+            np.bincount(agent, minlength=count).astype(float),
+            np.bincount(agent, dx, count),
+            np.bincount(agent, dy, count),
+            np.bincount(agent, self.vxs[other], count),
+            np.bincount(agent, self.vys[other], count),
+        )
+
+    def _neighbourhoods(self):
+        """Neighbour sums for alignment and cohesion, then for separation."""
+        xs, ys, vxs, vys = self.xs, self.ys, self.vxs, self.vys
+        if self.grid is None:
+            return (
+                self._neighbours.neighbourhood(xs, ys, vxs, vys),
+                self._separation.neighbourhood(xs, ys, vxs, vys),
+            )
+        # built each step, since a GridTuner may change the grid's resolution
+        neighbours = _Lattice.of_grid(self.grid).neighbourhood(xs, ys, vxs, vys)
+        return neighbours, self._pair_sums(*self._close_pairs())
+
+    def steering(self):
+        """The combined steering acceleration of every agent, before clamping."""
+        xs, ys, vxs, vys = self.xs, self.ys, self.vxs, self.vys
+        weights = self.weights
+        ax = np.zeros_like(xs)
+        ay = np.zeros_like(ys)
+
+        neighbours, separation = self._neighbourhoods()
+        count, off_x, off_y, sum_vx, sum_vy = neighbours
+        has = count > 0
+        safe = np.where(has, count, 1)
+        # cohesion: towards the neighbours' centre
+        cx, cy = self._toward(off_x / safe, off_y / safe, vxs, vys)
+        # alignment: match the neighbours' mean velocity
+        lx = sum_vx / safe - vxs
+        ly = sum_vy / safe - vys
+        ax += np.where(has, weights["cohesion"] * cx + weights["alignment"] * lx, 0)
+        ay += np.where(has, weights["cohesion"] * cy + weights["alignment"] * ly, 0)
+
+        # separation: away from the centre of the crowd close by, harder when denser
+        close, off_x, off_y, _, _ = separation
+        crowded = close > 0
+        sx, sy = self._toward(-off_x, -off_y, vxs, vys)
+        ax += np.where(crowded, weights["separation"] * sx, 0)
+        ay += np.where(crowded, weights["separation"] * sy, 0)
+
+        self._steer_to_targets(
+            ax, ay, self.seek_x, self.seek_y, weights["seek"], away=False
+        )
+        self._steer_to_targets(
+            ax, ay, self.flee_x, self.flee_y, weights["flee"], away=True
+        )
+        return ax, ay
+
+    def step(self, dt: float) -> None:
+        """Steer, then move every agent by dt seconds."""
+        ax, ay = self.steering()
+        force = np.hypot(ax, ay)
+        limit = np.minimum(1, self.max_force / np.maximum(force, 1e-12))
+        self.vxs += ax * limit * dt
+        self.vys += ay * limit * dt
+        speed = np.hypot(self.vxs, self.vys)
+        limit = np.minimum(1, self.max_speed / np.maximum(speed, 1e-12))
+        self.vxs *= limit
+        self.vys *= limit
+        self.xs += self.vxs * dt
+        self.ys += self.vys * dt
+        area = self.area
+        if self.wrap:
+            self.xs = (self.xs - area.left) % area.width + area.left
+            self.ys = (self.ys - area.top) % area.height + area.top
+        else:
+            # the right and bottom edges belong to no grid cell, so stop just short
+            right = np.nextafter(area.right, area.left)
+            bottom = np.nextafter(area.bottom, area.top)
+            np.clip(self.xs, area.left, right, out=self.xs)
+            np.clip(self.ys, area.top, bottom, out=self.ys)
+
+    def _set_positions(self, xs, ys):
+        positions = map(Position, xs.tolist(), ys.tolist())
+        for agent, position in zip(self.agents, positions):
+            agent.position = position
+
+    def write_back(self, motions: bool = False) -> None:
+        """
+        Copy the arrays back onto the agents' positions (and motions if asked).
+
+        With a grid, the agents are then rebinned with Grid.rebin_many(), which also
+        bumps the grid version, all inside one write phase so no reader sees agents
+        that have moved but not been rebinned. Agents should not also be moved by
+        their own Motion in the same frame.
+        """
+        xs, ys = self.xs, self.ys
+        if self.grid is not None and self.grid.integer_coords:
+            xs = np.rint(xs).astype(np.int64)
+            ys = np.rint(ys).astype(np.int64)
+            if not self.wrap:
+                area = self.area
+                np.clip(xs, area.left, area.right - 1, out=xs)
+                np.clip(ys, area.top, area.bottom - 1, out=ys)
+        if self.grid is None:
+            self._set_positions(xs, ys)
+        else:
+            with self.grid.write_phase():
+                self._set_positions(xs, ys)
+                self.grid.rebin_many(self.agents, layer=self.layer, xs=xs, ys=ys)
+        if motions:
+            directions = np.arctan2(self.vys, self.vxs).tolist()
+            speeds = np.hypot(self.vxs, self.vys).tolist()
+            for agent, direction, speed in zip(self.agents, directions, speeds):
+                agent.motion = Motion(direction, speed)
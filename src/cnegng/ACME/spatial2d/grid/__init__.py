@@ -5,5 +5,24 @@ from cnegng.ACME.spatial2d.grid.grid import (
     GridCell,
     GridSize,
 )
+from cnegng.ACME.spatial2d.grid.batch_query import QueryResults
+from cnegng.ACME.spatial2d.grid.query_cache import QueryCache
+from cnegng.ACME.spatial2d.grid.read_phase import GridPhaseError
+from cnegng.ACME.spatial2d.grid.stats import GridStats
+from cnegng.ACME.spatial2d.grid.tuning import GridRebuild, GridTuner
+from cnegng.ACME.spatial2d.grid.sweep import SweptHit
 
-__all__ = ["Grid", "GridCoord", "GlobalCoord", "GridCell", "GridSize"]
+__all__ = [
+    "Grid",
+    "GridCoord",
+    "GlobalCoord",
+    "GridCell",
+    "GridSize",
+    "SweptHit",
+    "QueryCache",
+    "QueryResults",
+    "GridPhaseError",
+    "GridStats",
+    "GridRebuild",
+    "GridTuner",
+]
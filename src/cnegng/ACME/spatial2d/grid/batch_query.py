@@ -0,0 +1,275 @@
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import numpy as np
+
+from cnegng.ACME.spatial2d.area import Area
+from cnegng.ACME.spatial2d.circle import Circle
+from cnegng.ACME.spatial2d.grid.torus import min_image
+
+
+def _coordinate_type(grid):
+    return np.int64 if grid.integer_coords else float
+
+
+class LayerSnapshot:
+    """
+    The point objects of one grid layer, packed into arrays ordered by cell.
+
+    Objects are listed cell by cell (row-major), so the members of flat cell ``i``
+    are ``objects[cell_start[i]:cell_start[i + 1]]``; xs and ys hold their positions
+    at the time of the snapshot. Objects stay in the cell the grid keeps them in,
+    exactly as the per-shape queries see them.
+
+    Attributes
+    ----------
+    version : int
+        The grid version the snapshot was taken at.
+    objects : list
+        The objects, grouped by cell.
+    xs, ys : numpy.ndarray
+        Their positions; int64 for grids with integer_coords.
+    cell_start : numpy.ndarray
+        Offsets into objects, one per cell plus a final end offset.
+    """
+
+    def __init__(self, grid, layer):
+        self.version = grid.version
+        objects = []
+        counts = np.zeros(grid.grid_size.width * grid.grid_size.height, dtype=np.int64)
+        flat = 0
+        for row in grid.cells:
+            for cell in row:
+                before = len(objects)
+                objects.extend(cell.object_container.iter_layer(layer))
+                counts[flat] = len(objects) - before
+                flat += 1
+        self.objects = objects
+        dtype = _coordinate_type(grid)
+        self.xs = np.fromiter((obj.position.x for obj in objects), dtype, len(objects))
+        self.ys = np.fromiter((obj.position.y for obj in objects), dtype, len(objects))
+        self.cell_start = np.zeros(counts.size + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.cell_start[1:])
+
+    def __len__(self):
+        return len(self.objects)
+
+
+@dataclass
+class QueryResults:
+    """
+    Results of Grid.query_many in CSR form.
+
+    The hits of query ``i`` are ``indices[offsets[i]:offsets[i + 1]]``, indices into
+    ``objects``.
+    """
+
+    offsets: np.ndarray
+    indices: np.ndarray
+    objects: List
+
+    def __len__(self):
+        return self.offsets.size - 1
+
+    def __getitem__(self, query: int) -> list:
+        """The objects hit by one query."""
+        objects = self.objects
+        return [
+            objects[index]
+            for index in self.indices[
+                self.offsets[query] : self.offsets[query + 1]
+            ].tolist()
+        ]
+
+    def counts(self) -> np.ndarray:
+        """Number of hits per query."""
+        return np.diff(self.offsets)
+
+
+def _expand(starts, counts):
+    """For runs (start, count) return the concatenated aranges and each item's run."""
+    total = int(counts.sum())
+    run = np.repeat(np.arange(counts.size), counts)
+    first = np.cumsum(counts) - counts
+    return np.repeat(starts, counts) + np.arange(total) - first[run], run
+
+
+def _integer_cells(grid, xs, ys):
+    """Unclamped cell columns and rows of int64 coordinates, as Grid.to_coords."""
+    if grid._shift_x is None:
+        cols = xs // grid.cell_width
+    else:
+        cols = xs >> grid._shift_x
+    if grid._shift_y is None:
+        rows = ys // grid.cell_height
+    else:
+        rows = ys >> grid._shift_y
+    return cols, rows
+
+
+def candidate_pairs(grid, snapshot, left, top, right, bottom):
+    """
+    Expand query bounding boxes into (query, object) candidate pairs.
+
+    Every query is paired with each cell under its bounding box, and every such
+    pair with the objects of that cell, all with array operations. Rather than
+    grouping the queries by cell and looping over cells, the whole batch is joined
+    against the snapshot's cell ranges at once, which is what makes small queries
+    cheap: no Python runs per query or per cell.
+
+    :return: (query, object) index arrays, ordered by query.
+    """
+    cols, rows = grid.grid_size.width, grid.grid_size.height
+    if grid.integer_coords:
+        c0, r0 = _integer_cells(grid, left, top)
+        c1, r1 = _integer_cells(grid, right, bottom)
+    else:
+        c0 = np.floor(left / grid.cell_width).astype(np.int64)
+        c1 = np.floor(right / grid.cell_width).astype(np.int64)
+        r0 = np.floor(top / grid.cell_height).astype(np.int64)
+        r1 = np.floor(bottom / grid.cell_height).astype(np.int64)
+    if grid.wrap:
+        # never visit a cell twice, however far the box hangs over the edges
+        c1 = np.minimum(c1, c0 + cols - 1)
+        r1 = np.minimum(r1, r0 + rows - 1)
+    else:
+        c0, c1 = np.maximum(c0, 0), np.minimum(c1, cols - 1)
+        r0, r1 = np.maximum(r0, 0), np.minimum(r1, rows - 1)
+    span_x = np.maximum(c1 - c0 + 1, 0)
+    span_y = np.maximum(r1 - r0 + 1, 0)
+
+    local, query = _expand(np.zeros(span_x.size, dtype=np.int64), span_x * span_y)
+    col = c0[query] + local % span_x[query]
+    row = r0[query] + local // span_x[query]
+    if grid.wrap:
+        col, row = col % cols, row % rows
+    flat = row * cols + col
+
+    start = snapshot.cell_start[flat]
+    members, pair = _expand(start, snapshot.cell_start[flat + 1] - start)
+    return query[pair], members
+
+
+def _finish(query, members, hit, count):
+    query, members = query[hit], members[hit]
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(query, minlength=count), out=offsets[1:])
+    return offsets, members
+
+
+def query_circles(grid, snapshot, xs, ys, radii):
+    """
+    Answer many circle queries against a snapshot.
+
+    :return: (offsets, indices) in CSR form, indices into snapshot.objects.
+    """
+    dtype = _coordinate_type(grid)
+    xs = np.asarray(xs, dtype=dtype)
+    ys = np.asarray(ys, dtype=dtype)
+    radii = np.broadcast_to(np.asarray(radii, dtype=dtype), xs.shape)
+    query, members = candidate_pairs(
+        grid, snapshot, xs - radii, ys - radii, xs + radii, ys + radii
+    )
+    dx = snapshot.xs[members] - xs[query]
+    dy = snapshot.ys[members] - ys[query]
+    if grid.wrap:
+        dx = min_image(dx, grid.area.width)
+        dy = min_image(dy, grid.area.height)
+    reach = radii[query]
+    diameters = 2 * float(radii.sum())
+    grid.stats.record_queries(xs.size, diameters, diameters)
+    grid.stats.candidates += int(members.size)
+    return _finish(query, members, dx * dx + dy * dy <= reach * reach, xs.size)
+
+
+def query_areas(grid, snapshot, lefts, tops, rights, bottoms):
+    """
+    Answer many rectangle queries against a snapshot (edges inclusive).
+
+    :return: (offsets, indices) in CSR form, indices into snapshot.objects.
+    """
+    dtype = _coordinate_type(grid)
+    lefts = np.asarray(lefts, dtype=dtype)
+    tops = np.asarray(tops, dtype=dtype)
+    rights = np.asarray(rights, dtype=dtype)
+    bottoms = np.asarray(bottoms, dtype=dtype)
+    query, members = candidate_pairs(grid, snapshot, lefts, tops, rights, bottoms)
+    x = snapshot.xs[members]
+    y = snapshot.ys[members]
+    left, top = lefts[query], tops[query]
+    if grid.wrap:
+        # move each object to its image at or after the rectangle's top-left corner
+        x = left + (x - left) % grid.area.width
+        y = top + (y - top) % grid.area.height
+        hit = (x <= rights[query]) & (y <= bottoms[query])
+    else:
+        hit = (x >= left) & (x <= rights[query]) & (y >= top) & (y <= bottoms[query])
+    grid.stats.record_queries(
+        lefts.size, float((rights - lefts).sum()), float((bottoms - tops).sum())
+    )
+    grid.stats.candidates += int(members.size)
+    return _finish(query, members, hit, lefts.size)
+
+
+def query_shapes(grid, snapshot, shapes: Sequence[Area | Circle]):
+    """
+    Answer a mixed sequence of Areas and Circles.
+
+    The circles and the areas are each answered in one pass, then merged back into
+    the order of shapes.
+
+    :return: (offsets, indices) in CSR form, indices into snapshot.objects.
+    """
+    circles, areas = [], []
+    for index, shape in enumerate(shapes):
+        match shape:
+            case Circle():
+                circles.append(index)
+            case Area():
+                areas.append(index)
+            case _:
+                raise TypeError(f"Cannot query with {shape!r}")
+    parts = []
+    if circles:
+        picked = [shapes[index] for index in circles]
+        parts.append(
+            (
+                circles,
+                query_circles(
+                    grid,
+                    snapshot,
+                    [shape.center.x for shape in picked],
+                    [shape.center.y for shape in picked],
+                    [shape.radius for shape in picked],
+                ),
+            )
+        )
+    if areas:
+        picked = [shapes[index] for index in areas]
+        parts.append(
+            (
+                areas,
+                query_areas(
+                    grid,
+                    snapshot,
+                    [shape.left for shape in picked],
+                    [shape.top for shape in picked],
+                    [shape.right for shape in picked],
+                    [shape.bottom for shape in picked],
+                ),
+            )
+        )
+    if len(parts) == 1:
+        return parts[0][1]
+
+    counts = np.zeros(len(shapes), dtype=np.int64)
+    for order, (offsets, _) in parts:
+        counts[order] = np.diff(offsets)
+    offsets = np.zeros(len(shapes) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    indices = np.empty(int(offsets[-1]), dtype=np.int64)
+    for order, (part_offsets, part_indices) in parts:
+        order = np.asarray(order)
+        target, _ = _expand(offsets[order], np.diff(part_offsets))
+        indices[target] = part_indices
+    return offsets, indices
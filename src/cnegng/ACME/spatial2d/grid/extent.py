@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+from cnegng.ACME.spatial2d.area import Area
+from cnegng.ACME.spatial2d.circle import Circle
+
+
+class ExtentRecord:
+    """
+    Book-keeping for one object registered in the grid with an extent.
+
+    The record, not the object, is what the overlapped cells store, so an object
+    can live in many cells without touching its own attributes.
+
+    Attributes
+    ----------
+    obj : object
+        The registered object.
+    extent : Area | Circle
+        The space the object covers.
+    layer : str
+        The layer the object was registered on.
+    cells : list
+        Every GridCell the extent overlaps.
+    stamps : list
+        Per reader slot, the id of the last query that reported this object.
+    """
+
+    __slots__ = ("obj", "extent", "layer", "cells", "stamps")
+
+    def __init__(self, obj, extent: Area | Circle, layer="default"):
+        self.obj = obj
+        self.extent = extent
+        self.layer = layer
+        self.cells = []
+        self.stamps = []
+
+    def claim(self, stamp) -> bool:
+        """
+        Mark this record as seen by a query.
+
+        Each reader thread writes only its own slot, so concurrent queries do not
+        clobber each other's marks.
+
+        :param stamp: The (slot, value) pair from Grid.next_query_stamp().
+        :return: True the first time a query claims the record, False afterwards.
+        """
+        slot, value = stamp
+        stamps = self.stamps
+        if slot >= len(stamps):
+            stamps.extend([0] * (slot + 1 - len(stamps)))
+        if stamps[slot] == value:
+            return False
+        stamps[slot] = value
+        return True
+
+    def __repr__(self):
+        return f"ExtentRecord(obj={self.obj}, extent={self.extent})"
+
+
+def extent_bounds(extent: Area | Circle) -> Tuple[float, float, float, float]:
+    """
+    The bounding box of an extent.
+
+    :param extent: An Area or a Circle.
+    :return: (left, top, right, bottom)
+    """
+    match extent:
+        case Area():
+            return extent.left, extent.top, extent.right, extent.bottom
+        case Circle():
+            return (
+                extent.center.x - extent.radius,
+                extent.center.y - extent.radius,
+                extent.center.x + extent.radius,
+                extent.center.y + extent.radius,
+            )
+    raise TypeError(f"Unsupported extent {extent!r}, expected an Area or a Circle")
+
+
+def extent_overlaps(extent: Area | Circle, shape: Area | Circle) -> bool:
+    """
+    Check whether an object's extent touches a query shape.
+
+    :param extent: The object's Area or Circle.
+    :param shape: The query Area or Circle.
+    :return: True if the two overlap (touching counts).
+    """
+    match extent, shape:
+        case Area(), Area():
+            return extent.overlaps_with_area(shape)
+        case Area(), Circle():
+            return extent.overlaps_with_circle(shape)
+        case Circle(), Area():
+            return shape.overlaps_with_circle(extent)
+        case Circle(), Circle():
+            return extent.overlaps_with_circle(shape)
+    raise TypeError(f"Cannot test {extent!r} against {shape!r}")
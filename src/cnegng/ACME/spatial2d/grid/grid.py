@@ -1,15 +1,45 @@
 from __future__ import annotations
 
 import copy
+import math
+import os
+import threading
 from collections import defaultdict
-from typing import Generator
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Generator, List, Optional, Sequence
 from dataclasses import dataclass
 
+import numpy as np
+
 from cnegng.ACME.spatial2d.area import Area
 from cnegng.ACME.spatial2d.position import Position
 from cnegng.ACME.spatial2d.circle import Circle
+from cnegng.ACME.spatial2d.polygon import Polygon
+from cnegng.ACME.spatial2d.prediction import times_to_within, velocity_of
+from cnegng.ACME.spatial2d.grid.batch_query import (
+    LayerSnapshot,
+    QueryResults,
+    query_areas,
+    query_circles,
+    query_shapes,
+)
 from cnegng.ACME.spatial2d.grid.collision_query import CollisionQuery
+from cnegng.ACME.spatial2d.grid.extent import (
+    ExtentRecord,
+    extent_bounds,
+    extent_overlaps,
+)
 from cnegng.ACME.spatial2d.grid.object_container import ObjectContainer
+from cnegng.ACME.spatial2d.grid.query_cache import QueryCache, shape_key
+from cnegng.ACME.spatial2d.grid.read_phase import ReadPhaseGuard
+from cnegng.ACME.spatial2d.grid.stats import GridStats
+from cnegng.ACME.spatial2d.grid import torus
+from cnegng.ACME.spatial2d.grid.sweep import (
+    SweptHit,
+    cells_along_path,
+    segment_cells,
+    sweep_contacts,
+)
 
 
 class PositionOutsideGrid(Exception):
@@ -59,7 +89,8 @@ class GridCoord:
     y: int
 
     def clone(self):
-        return copy.deepcopy(self)
+        # the grid is shared, not copied
+        return GridCoord(self.grid, self.x, self.y)
 
     def to_flat_index(self):
         """Convert the grid coordinates to a flat index using the grid's width."""
@@ -72,12 +103,58 @@ class GridCoord:
         )
 
 
+def _integer_area(area: Area) -> Area:
+    edges = (area.top, area.left, area.bottom, area.right)
+    if any(edge != int(edge) for edge in edges):
+        raise ValueError(f"integer_coords needs whole-number edges, got {area}")
+    return Area(
+        top=int(area.top),
+        left=int(area.left),
+        bottom=int(area.bottom),
+        right=int(area.right),
+    )
+
+
+def _integer_cell_size(span, cells: int) -> int:
+    if span % cells:
+        raise ValueError(
+            f"integer_coords needs whole-number cells: {span} does not split "
+            f"into {cells} cells"
+        )
+    return span // cells
+
+
+def _shift_for(size: int):
+    """log2 of size when it is a power of two, else None."""
+    return size.bit_length() - 1 if size & (size - 1) == 0 else None
+
+
 class Grid:
-    def __init__(self, area: Area, grid_size: GridSize):
-        self.area = area.clone()
+    def __init__(
+        self,
+        area: Area,
+        grid_size: GridSize,
+        query_cache_size: int = 256,
+        wrap: bool = False,
+        integer_coords: bool = False,
+    ):
+        """
+        :param area: The space covered by the grid.
+        :param grid_size: Number of cells across and down.
+        :param query_cache_size: Number of results kept by the query cache.
+        :param wrap: Toroidal topology: queries continue across the edges and distances
+            use minimum-image offsets, matching worlds that wrap positions with
+            Area.wrap_within. Query shapes must be smaller than the world.
+        :param integer_coords: Coordinates are integers, such as FixedPoint
+            sub-units. Cells then have whole-number sizes, cell lookup is a shift
+            (power of two cell sizes) or an integer divide, and circle queries
+            compare squared distances in integers, so results are bit-exact.
+        """
+        self.area = _integer_area(area) if integer_coords else area.clone()
+        self.wrap = wrap
         self.grid_size = grid_size.clone()
-        self.cell_width = area.width / grid_size.width
-        self.cell_height = area.height / grid_size.height
+        self.integer_coords = integer_coords
+        self.set_cell_size(*self.cell_size_for(grid_size))
 
         self.cells = [
             [
@@ -93,10 +170,160 @@ class Grid:
         self.query = CollisionQuery(
             self
         )  # Delegate collision queries to CollisionQuery
+        self._extents = {}  # obj -> ExtentRecord for objects registered with an extent
+        # query stamps are handed out per reader thread, see next_query_stamp()
+        self._reader = threading.local()
+        self._reader_slots = 0
+        self._reader_slots_lock = threading.Lock()
+        self.phases = ReadPhaseGuard(on_idle=self._merge_phase_stats)
+        # bumped on every mutation; part of every query cache key
+        self.version = 0
+        self.query_cache = QueryCache(maxsize=query_cache_size)
+        # occupancy and query extents, read by GridTuner; see the stats property
+        self._stats = GridStats()
+        # per-thread GridStats of the open read phase, merged when it closes
+        self._phase_stats = []
+        self._phase_stats_lock = threading.Lock()
+        # an in-progress GridRebuild, told about changes to cells it already scanned
+        self.rebuild = None
+        # layer -> LayerSnapshot used by query_many, retaken when the version moves on
+        self._snapshots = {}
+        self._snapshots_lock = threading.Lock()
 
     def __repr__(self):
         return f"Grid(area={self.area}, grid_size={self.grid_size})"
 
+    def cell_size_for(self, grid_size: GridSize):
+        """(cell_width, cell_height) this grid's area would have at grid_size."""
+        if self.integer_coords:
+            return (
+                _integer_cell_size(self.area.width, grid_size.width),
+                _integer_cell_size(self.area.height, grid_size.height),
+            )
+        return (
+            self.area.width / grid_size.width,
+            self.area.height / grid_size.height,
+        )
+
+    def set_cell_size(self, cell_width, cell_height):
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        if self.integer_coords:
+            # power of two cells are found with a shift instead of a divide
+            self._shift_x = _shift_for(cell_width)
+            self._shift_y = _shift_for(cell_height)
+
+    def bump_version(self):
+        """
+        Marks the grid as changed, invalidating every cached query result.
+
+        Adding, moving and removing objects through the grid does this already; call it
+        after moving objects in place (changing obj.position directly), typically once
+        per tick, or let rebin_many() rebin them and bump it.
+        """
+        with self.phases.write_phase():
+            self.version += 1
+
+    @property
+    def stats(self) -> GridStats:
+        """
+        The GridStats that queries count into.
+
+        Outside read phases this is the grid's shared GridStats. Inside one, each
+        thread gets a GridStats of its own so concurrent queries never write to the
+        same counters; these are merged into the shared one when the last read phase
+        closes, so read the statistics between phases.
+        """
+        if not self.phases.reading:
+            return self._stats
+        reader = self._reader
+        epoch = self.phases.epoch
+        if getattr(reader, "stats_epoch", None) != epoch:
+            reader.stats = GridStats()
+            reader.stats_epoch = epoch
+            with self._phase_stats_lock:
+                self._phase_stats.append(reader.stats)
+        return reader.stats
+
+    def _merge_phase_stats(self):
+        with self._phase_stats_lock:
+            pending, self._phase_stats = self._phase_stats, []
+        for stats in pending:
+            self._stats.merge(stats)
+
+    def read_phase(self):
+        """
+        Context manager opening a read phase: until it closes the grid refuses
+        mutations, so queries may run concurrently from any number of threads.
+
+        .. code-block:: python
+
+            with grid.read_phase():
+                results = list(executor.map(run_query, shapes))
+        """
+        return self.phases.read_phase()
+
+    def write_phase(self):
+        """
+        Context manager holding the grid's write phase, which every mutation takes
+        for itself. Hold it across moving objects in place and bump_version() so no
+        reader opens a read phase halfway through.
+
+        .. code-block:: python
+
+            with grid.write_phase():
+                for obj in movers:
+                    obj.position.add(obj.motion)
+                grid.bump_version()
+        """
+        return self.phases.write_phase()
+
+    def query_batch(
+        self,
+        shapes: Sequence[Area | Circle],
+        layer="default",
+        executor: Optional[Executor] = None,
+        max_workers: Optional[int] = None,
+    ) -> List[tuple]:
+        """
+        Run independent area/circle queries in parallel inside one read phase.
+
+        On a free-threaded (no-GIL) build the queries scale with the number of
+        workers; with the GIL they still give correct results.
+
+        :param shapes: Areas and Circles to query.
+        :param layer: The layer to query.
+        :param executor: Executor to run on; a ThreadPoolExecutor is created if omitted.
+        :param max_workers: Worker count for the executor created when none is given,
+            also used to split the shapes into chunks (defaults to the CPU count).
+        :return: One tuple of objects per shape, in order.
+        """
+
+        def run(chunk):
+            results = []
+            for shape in chunk:
+                if isinstance(shape, Circle):
+                    results.append(tuple(self.objects_in_circle(shape, layer)))
+                else:
+                    results.append(tuple(self.objects_in_area(shape, layer)))
+            return results
+
+        owns_executor = executor is None
+        if owns_executor:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            workers = max_workers or os.cpu_count() or 1
+            chunk_size = max(1, len(shapes) // (workers * 4))
+            chunks = [
+                shapes[index : index + chunk_size]
+                for index in range(0, len(shapes), chunk_size)
+            ]
+            with self.read_phase():
+                return [result for part in executor.map(run, chunks) for result in part]
+        finally:
+            if owns_executor:
+                executor.shutdown()
+
     def _area_for_cell(self, grid_coord):
         """
         Calculate the area covered by the cell at the given grid coordinates.
@@ -141,6 +368,269 @@ class Grid:
         cell = self.cell_at(self.to_coords(coords))
         cell.add_to_cell(obj, layer=layer)
 
+    def add_many(self, objects, layer="default", xs=None, ys=None):
+        """
+        Adds many point objects at once, each to the cell add_to_cell() would use.
+
+        The cells of all positions are worked out with array operations, every cell
+        takes its newcomers in one go and the version is bumped once, so a crowd
+        arriving together costs little more than a loop over its cells.
+
+        :param objects: The objects to add.
+        :param layer: The layer to add them to.
+        :param xs: Their x coordinates; read from each obj.position by default.
+        :param ys: Their y coordinates; read from each obj.position by default.
+        :raises ValueError: If an object already has a cell or lies outside the grid.
+        """
+        with self.phases.write_phase():
+            objects = list(objects)
+            if not objects:
+                return
+            if any(getattr(obj, "owning_cell", None) is not None for obj in objects):
+                raise ValueError("Cannot add objects that already have an owner.")
+            if xs is None or ys is None:
+                xs = [obj.position.x for obj in objects]
+                ys = [obj.position.y for obj in objects]
+            cols, rows = self._cells_of_many(xs, ys)
+            width, height = self.grid_size.width, self.grid_size.height
+            outside = (cols < 0) | (cols >= width) | (rows < 0) | (rows >= height)
+            if outside.any():
+                raise ValueError(
+                    f"{int(np.count_nonzero(outside))} objects lie outside the grid"
+                )
+            self._adopt_into_cells(objects, rows * width + cols, layer)
+            self.bump_version()
+
+    def rebin_many(self, objects, layer="default", xs=None, ys=None) -> int:
+        """
+        Moves point objects that were moved in place into the cells they now lie in.
+
+        Like add_many(), the cells are worked out with array operations; only the
+        objects whose cell changed are moved, and the version is bumped once.
+
+        :param objects: Objects already in the grid, in the given layer.
+        :param layer: Their layer.
+        :param xs: Their x coordinates; read from each obj.position by default.
+        :param ys: Their y coordinates; read from each obj.position by default.
+        :return: The number of objects that changed cells.
+        :raises ValueError: If an object is not in the grid or lies outside it.
+        """
+        with self.phases.write_phase():
+            objects = list(objects)
+            if not objects:
+                return 0
+            owners = [getattr(obj, "owning_cell", None) for obj in objects]
+            if None in owners:
+                raise ValueError("Cannot rebin objects that are not in the grid.")
+            if xs is None or ys is None:
+                xs = [obj.position.x for obj in objects]
+                ys = [obj.position.y for obj in objects]
+            cols, rows = self._cells_of_many(xs, ys)
+            width, height = self.grid_size.width, self.grid_size.height
+            outside = (cols < 0) | (cols >= width) | (rows < 0) | (rows >= height)
+            if outside.any():
+                raise ValueError(
+                    f"{int(np.count_nonzero(outside))} objects lie outside the grid"
+                )
+            flat = rows * width + cols
+            flat_of = {
+                id(cell): cell.grid_coord.to_flat_index() for cell in set(owners)
+            }
+            current = np.fromiter(
+                map(flat_of.__getitem__, map(id, owners)), np.int64, len(objects)
+            )
+            moved = np.flatnonzero(flat != current)
+            if moved.size == 0:
+                self.bump_version()
+                return 0
+            leaving = [objects[index] for index in moved.tolist()]
+            for obj in leaving:
+                cell = obj.owning_cell
+                cell.object_container.remove(obj, layer=layer)
+                if self.rebuild is not None:
+                    self.rebuild.mark_dirty(cell)
+            self._adopt_into_cells(leaving, flat[moved], layer)
+            self.bump_version()
+            return int(moved.size)
+
+    def _adopt_into_cells(self, objects, flat, layer):
+        """Give every cell its objects in one go; flat holds each object's cell."""
+        width = self.grid_size.width
+        order = np.argsort(flat, kind="stable")
+        cells, starts = np.unique(flat[order], return_index=True)
+        ends = starts[1:].tolist() + [len(objects)]
+        order = order.tolist()
+        for flat_cell, begin, end in zip(cells.tolist(), starts.tolist(), ends):
+            row, col = divmod(flat_cell, width)
+            cell = self.cells[row][col]
+            cell.object_container.adopt_all(
+                [objects[index] for index in order[begin:end]], layer=layer
+            )
+            if self.rebuild is not None:
+                self.rebuild.mark_dirty(cell)
+
+    def _cells_of_many(self, xs, ys):
+        """Unclamped cell columns and rows of many positions, as to_coords()."""
+        if self.integer_coords:
+            cols, rows = self._integer_cell(
+                np.asarray(xs, dtype=np.int64), np.asarray(ys, dtype=np.int64)
+            )
+        elif self.wrap:
+            cols = np.floor(np.asarray(xs, dtype=float) / self.cell_width)
+            rows = np.floor(np.asarray(ys, dtype=float) / self.cell_height)
+        else:
+            cols = np.trunc(
+                np.asarray(xs, dtype=float) / (self.area.width / self.grid_size.width)
+            )
+            rows = np.trunc(
+                np.asarray(ys, dtype=float) / (self.area.height / self.grid_size.height)
+            )
+        cols = np.asarray(cols).astype(np.int64)
+        rows = np.asarray(rows).astype(np.int64)
+        if self.wrap:
+            cols %= self.grid_size.width
+            rows %= self.grid_size.height
+        return cols, rows
+
+    def add_with_extent(self, obj, extent: Area | Circle, layer="default"):
+        """
+        Adds an object that covers space (a bounding box or a radius) to every cell it overlaps.
+
+        Queries report the object once when any part of its extent touches the query
+        shape, so callers no longer need to pad their shapes by the largest object size.
+
+        :param obj: Object to be added.
+        :param extent: An Area or Circle describing the space the object covers.
+        :param layer: The layer to add the object to.
+        :raises ValueError: If the object is already registered with an extent.
+        """
+        with self.phases.write_phase():
+            if obj in self._extents:
+                raise ValueError(f"Cannot add object {obj}. It already has an extent.")
+            record = ExtentRecord(obj, extent, layer)
+            self._extents[obj] = record
+            for cell in self._cells_for_extent(extent):
+                cell.extent_container.add(record, layer=layer)
+                record.cells.append(cell)
+            self.bump_version()
+
+    def move_extent(self, obj, extent: Area | Circle):
+        """
+        Updates the extent of an object added with add_with_extent().
+
+        Only the cells the object enters or leaves are touched.
+
+        :param obj: The registered object.
+        :param extent: Its new Area or Circle.
+        """
+        with self.phases.write_phase():
+            record = self._extents[obj]
+            new_cells = list(self._cells_for_extent(extent))
+            old_cells = set(record.cells)
+            for cell in old_cells.difference(new_cells):
+                cell.extent_container.remove(record, layer=record.layer)
+            for cell in new_cells:
+                if cell not in old_cells:
+                    cell.extent_container.add(record, layer=record.layer)
+            record.extent = extent
+            record.cells = new_cells
+            self.bump_version()
+
+    def remove_extent(self, obj):
+        """
+        Removes an object added with add_with_extent() from every cell it was in.
+
+        :param obj: The registered object.
+        """
+        with self.phases.write_phase():
+            record = self._extents.pop(obj, None)
+            if record is None:
+                return
+            for cell in record.cells:
+                cell.extent_container.remove(record, layer=record.layer)
+            record.cells = []
+            self.bump_version()
+
+    def extent_of(self, obj):
+        """
+        :return: The Area or Circle an object was registered with, or None.
+        """
+        record = self._extents.get(obj)
+        return None if record is None else record.extent
+
+    def _cell_span(self, left, top, right, bottom):
+        """Clamped (min_x, max_x, min_y, max_y) range of cells covering a bounding box."""
+        return (
+            max(0, int(left // self.cell_width)),
+            min(self.grid_size.width - 1, int(right // self.cell_width)),
+            max(0, int(top // self.cell_height)),
+            min(self.grid_size.height - 1, int(bottom // self.cell_height)),
+        )
+
+    def _cells_for_extent(self, extent):
+        if self.wrap:
+            seen = set()
+            for cell, shift_x, shift_y in self._cell_images(*extent_bounds(extent)):
+                if cell not in seen and extent_overlaps(
+                    torus.translate(extent, -shift_x, -shift_y), cell.area
+                ):
+                    seen.add(cell)
+                    yield cell
+            return
+        min_x, max_x, min_y, max_y = self._cell_span(*extent_bounds(extent))
+        for y in range(min_y, max_y + 1):
+            for x in range(min_x, max_x + 1):
+                cell = self.cells[y][x]
+                if extent_overlaps(extent, cell.area):
+                    yield cell
+
+    def _cell_images(self, left, top, right, bottom):
+        """
+        Wrap mode: yields (cell, shift_x, shift_y) for every cell under a bounding box
+        that may hang over the edges, where the shift moves the cell onto the box.
+        Each cell is visited at most once.
+        """
+        width, height = self.grid_size.width, self.grid_size.height
+        min_x = int(left // self.cell_width)
+        max_x = min(int(right // self.cell_width), min_x + width - 1)
+        min_y = int(top // self.cell_height)
+        max_y = min(int(bottom // self.cell_height), min_y + height - 1)
+        for y in range(min_y, max_y + 1):
+            row = self.cells[y % height]
+            shift_y = (y // height) * self.area.height
+            for x in range(min_x, max_x + 1):
+                yield row[x % width], (x // width) * self.area.width, shift_y
+
+    def distance(self, a: Position, b: Position) -> float:
+        """
+        Distance between two positions, using minimum-image offsets in wrap mode.
+        """
+        if self.wrap:
+            return torus.torus_distance(a, b, self.area)
+        return a.distance(b)
+
+    def next_query_stamp(self) -> tuple:
+        """
+        Hands out a fresh id for a query, used to report each object with an extent once.
+
+        Objects with an extent sit in several cells; instead of collecting results in a
+        set, a query marks each record it reports with its stamp and skips records that
+        already carry it. Every thread gets its own slot in the records, so concurrent
+        queries do not interfere, but two lazy queries on one thread must not be
+        interleaved.
+
+        :return: A (slot, value) pair for ExtentRecord.claim().
+        """
+        reader = self._reader
+        try:
+            reader.stamp += 1
+        except AttributeError:
+            with self._reader_slots_lock:
+                reader.slot = self._reader_slots
+                self._reader_slots += 1
+            reader.stamp = 1
+        return reader.slot, reader.stamp
+
     def to_coords(self, global_coords: GlobalCoord | Position) -> GridCoord:
         """
         Converts GlobalCoords to GridCoords based on the grid's area and dimensions.
@@ -152,19 +642,46 @@ class Grid:
                 global_coords = GlobalCoord(x=global_coords.x, y=global_coords.y)
             case GlobalCoord():  # Match based on the GlobalCoord class
                 pass  # Already a GlobalCoord
+        if self.integer_coords:
+            x, y = self._integer_cell(global_coords.x, global_coords.y)
+            if self.wrap:
+                x %= self.grid_size.width
+                y %= self.grid_size.height
+            return GridCoord(grid=self, x=x, y=y)
+        if self.wrap:
+            x = math.floor(global_coords.x / self.cell_width) % self.grid_size.width
+            y = math.floor(global_coords.y / self.cell_height) % self.grid_size.height
+            return GridCoord(grid=self, x=x, y=y)
         x = int(global_coords.x / (self.area.width / self.grid_size.width))
         y = int(global_coords.y / (self.area.height / self.grid_size.height))
         return GridCoord(grid=self, x=x, y=y)
 
+    def _integer_cell(self, x: int, y: int):
+        """Unclamped cell column and row of integer coordinates."""
+        if self._shift_x is None:
+            col = x // self.cell_width
+        else:
+            col = x >> self._shift_x
+        if self._shift_y is None:
+            row = y // self.cell_height
+        else:
+            row = y >> self._shift_y
+        return col, row
+
     def all_objects(self, layer=None):
         if layer is None:
             for row in self.cells:
                 for cell in row:
                     yield from cell.all_members()
+            for record in list(self._extents.values()):
+                yield record.obj
         else:
             for row in self.cells:
                 for cell in row:
                     yield from cell.all_members(layer=layer)
+            for record in list(self._extents.values()):
+                if record.layer == layer:
+                    yield record.obj
 
     def cells_in_area(self, area):
         """
@@ -173,6 +690,23 @@ class Grid:
         :param area: Area object representing the region to check.
         :return: Generator yielding all GridCells that overlap with the given area.
         """
+        if self.wrap:
+            for cell, shift_x, shift_y in self._cell_images(
+                area.left, area.top, area.right, area.bottom
+            ):
+                if cell.area.overlap(torus.translate(area, -shift_x, -shift_y)):
+                    yield cell
+            return
+        if self.integer_coords:
+            min_x, max_x, min_y, max_y = self._cell_span(
+                area.left, area.top, area.right, area.bottom
+            )
+            for y in range(min_y, max_y + 1):
+                for x in range(min_x, max_x + 1):
+                    cell = self.cells[y][x]
+                    if cell.area.overlap(area) is not None:
+                        yield cell
+            return
         # Determine grid coordinates range for the area
         min_x = max(0, int(area.left / (self.area.width / self.grid_size.width)))
         max_x = min(
@@ -194,21 +728,33 @@ class Grid:
                         yield cell
 
     def cells_in_circle(self, circle: Circle) -> Generator["GridCell", None, None]:
+        if self.wrap:
+            for cell, shift_x, shift_y in self._cell_images(
+                circle.center.x - circle.radius,
+                circle.center.y - circle.radius,
+                circle.center.x + circle.radius,
+                circle.center.y + circle.radius,
+            ):
+                if cell.area.overlaps_with_circle(
+                    torus.translate(circle, -shift_x, -shift_y)
+                ):
+                    yield cell
+            return
         # Calculate the bounding box of the circle
         min_x = max(0, int((circle.center.x - circle.radius) // self.cell_width))
         max_x = min(
-            self.grid_size.width,
+            self.grid_size.width - 1,
             int((circle.center.x + circle.radius) // self.cell_width),
         )
         min_y = max(0, int((circle.center.y - circle.radius) // self.cell_height))
         max_y = min(
-            self.grid_size.height,
+            self.grid_size.height - 1,
             int((circle.center.y + circle.radius) // self.cell_height),
         )
 
         # Iterate over the cells within the bounding box
-        for y in range(min_y, max_y):
-            for x in range(min_x, max_x):
+        for y in range(min_y, max_y + 1):
+            for x in range(min_x, max_x + 1):
                 grid_coord = GridCoord(grid=self, x=x, y=y)
                 cell_area = self._area_for_cell(grid_coord)
 
@@ -217,12 +763,592 @@ class Grid:
                     yield self.cells[y][x]
 
     def objects_in_area(self, area: Area, layer="default"):
+        stamp = self.next_query_stamp()
+        stats = self.stats
+        stats.record_query(area.width, area.height)
+        if self.wrap:
+            for cell in self.cells_in_area(area):
+                stats.candidates += cell.object_container.size(layer)
+                for obj in cell.object_container.get_all(layer):
+                    if torus.area_contains(area, obj.position, self.area):
+                        yield obj
+                yield from cell.extents_overlapping(area, layer, stamp, world=self.area)
+            return
         for cell in self.cells_in_area(area):
+            stats.candidates += cell.object_container.size(layer)
             yield from cell.objects_in_area(area, layer)
+            yield from cell.extents_overlapping(area, layer, stamp)
 
     def objects_in_circle(self, circle: Circle, layer="default"):
+        stamp = self.next_query_stamp()
+        stats = self.stats
+        stats.record_query(2 * circle.radius, 2 * circle.radius)
+        if self.wrap:
+            for cell in self.cells_in_circle(circle):
+                stats.candidates += cell.object_container.size(layer)
+                for obj in cell.object_container.get_all(layer):
+                    if torus.circle_contains(circle, obj.position, self.area):
+                        yield obj
+                yield from cell.extents_overlapping(
+                    circle, layer, stamp, world=self.area
+                )
+            return
+        if self.integer_coords:
+            x, y = circle.center.x, circle.center.y
+            reach = circle.radius * circle.radius
+            for cell in self.cells_in_circle(circle):
+                stats.candidates += cell.object_container.size(layer)
+                for obj in cell.object_container.get_all(layer):
+                    dx = obj.position.x - x
+                    dy = obj.position.y - y
+                    if dx * dx + dy * dy <= reach:
+                        yield obj
+                yield from cell.extents_overlapping(circle, layer, stamp)
+            return
         for cell in self.cells_in_circle(circle):
+            stats.candidates += cell.object_container.size(layer)
             yield from cell.objects_in_circle(circle, layer)
+            yield from cell.extents_overlapping(circle, layer, stamp)
+
+    def classify_cells(self, circle: Circle, margin: int = 0):
+        """
+        Sorts every cell by how it lies against a circle, in one batch.
+
+        :param circle: The circle, in world coordinates (not wrapped in wrap mode).
+        :param margin: Grow every cell by this many cells on each side first, so
+            that objects up to that far from their cell are classified with it.
+        :return: (inside, outside) boolean arrays indexed [row, col]; cells that are
+            neither straddle the circle's edge.
+        """
+        cx, cy, r2 = circle.center.x, circle.center.y, circle.radius**2
+        grow_x, grow_y = margin * self.cell_width, margin * self.cell_height
+        lefts = self.area.left + np.arange(self.grid_size.width) * self.cell_width
+        tops = self.area.top + np.arange(self.grid_size.height) * self.cell_height
+        rights = lefts + (self.cell_width + grow_x)
+        bottoms = tops + (self.cell_height + grow_y)
+        lefts = lefts - grow_x
+        tops = tops - grow_y
+        near_x = np.maximum(np.maximum(lefts - cx, cx - rights), 0)
+        near_y = np.maximum(np.maximum(tops - cy, cy - bottoms), 0)
+        far_x = np.maximum(np.abs(lefts - cx), np.abs(rights - cx))
+        far_y = np.maximum(np.abs(tops - cy), np.abs(bottoms - cy))
+        inside = far_y[:, None] ** 2 + far_x[None, :] ** 2 <= r2
+        outside = near_y[:, None] ** 2 + near_x[None, :] ** 2 > r2
+        return inside, outside
+
+    def objects_outside_circle(self, circle: Circle, layer="default") -> list:
+        """
+        The point objects of a layer outside a circle, such as a safe zone.
+
+        Cells wholly inside the circle are skipped and cells wholly outside it are
+        taken wholesale, so only the cells near the circle's edge test their
+        objects one by one. Objects moved in place stay in their old cell until
+        they are rebinned, so that band reaches one cell past the edge on both
+        sides: an object that has drifted up to a cell from its cell is still
+        classified by its real position. Objects registered with an extent are not
+        included.
+
+        :param circle: The circle, in world coordinates (not wrapped in wrap mode).
+        :param layer: The layer to search.
+        :return: A list of objects.
+        """
+        inside, outside = self.classify_cells(circle, margin=1)
+        found = []
+        cells = self.cells
+        for row, col in np.argwhere(outside).tolist():
+            found.extend(cells[row][col].object_container.iter_layer(layer))
+        boundary = np.argwhere(~(inside | outside)).tolist()
+        x, y, r2 = circle.center.x, circle.center.y, circle.radius**2
+        stats = self.stats
+        for row, col in boundary:
+            container = cells[row][col].object_container
+            stats.candidates += container.size(layer)
+            for obj in container.iter_layer(layer):
+                dx = obj.position.x - x
+                dy = obj.position.y - y
+                if dx * dx + dy * dy > r2:
+                    found.append(obj)
+        return found
+
+    def cells_in_polygon(self, polygon: Polygon):
+        """
+        Classifies the cells under a polygon's bounding box.
+
+        Cells crossed by an edge are boundary cells. No edge passes through the
+        others, so each lies wholly inside or wholly outside and its centre decides
+        which; the centres are tested in one batch. Outside cells are dropped.
+
+        The polygon is taken in world coordinates and is not wrapped in wrap mode.
+
+        :param polygon: The Polygon to classify against.
+        :return: (inside, boundary), two lists of GridCells.
+        """
+        bounds = polygon.bounds
+        min_x, max_x, min_y, max_y = self._cell_span(
+            bounds.left, bounds.top, bounds.right, bounds.bottom
+        )
+        if min_x > max_x or min_y > max_y:
+            return [], []
+        edge_cells = set()
+        for start, end in polygon.edges():
+            for col, row, _, _ in segment_cells(
+                start,
+                end,
+                self.cell_width,
+                self.cell_height,
+                self.grid_size.width,
+                self.grid_size.height,
+            ):
+                edge_cells.add((col, row))
+
+        boundary, unknown = [], []
+        for y in range(min_y, max_y + 1):
+            for x in range(min_x, max_x + 1):
+                if (x, y) in edge_cells:
+                    boundary.append(self.cells[y][x])
+                else:
+                    unknown.append(self.cells[y][x])
+        if not unknown:
+            return [], boundary
+        centres_x = [cell.area.left + self.cell_width / 2 for cell in unknown]
+        centres_y = [cell.area.top + self.cell_height / 2 for cell in unknown]
+        inside = polygon.contains_points(centres_x, centres_y)
+        return [cell for cell, hit in zip(unknown, inside.tolist()) if hit], boundary
+
+    def objects_in_polygon(self, polygon: Polygon, layer="default"):
+        """
+        Yields the point objects inside a polygon.
+
+        Objects in cells wholly inside the polygon are taken without testing; only
+        objects in boundary cells are tested, all of them in one batched call.
+        Extents are not considered.
+
+        :param polygon: The Polygon zone.
+        :param layer: The layer to search.
+        :return: Generator of objects.
+        """
+        bounds = polygon.bounds
+        stats = self.stats
+        stats.record_query(bounds.width, bounds.height)
+        inside, boundary = self.cells_in_polygon(polygon)
+        for cell in inside:
+            yield from cell.object_container.get_all(layer)
+        candidates = []
+        for cell in boundary:
+            candidates.extend(cell.object_container.iter_layer(layer))
+        stats.candidates += len(candidates)
+        if not candidates:
+            return
+        hits = polygon.contains_positions([obj.position for obj in candidates])
+        for obj, hit in zip(candidates, hits.tolist()):
+            if hit:
+                yield obj
+
+    def objects_entering_circle(
+        self,
+        circle: Circle,
+        within: float,
+        max_speed: float,
+        layer="default",
+        include_inside: bool = False,
+    ) -> List[tuple]:
+        """
+        Objects that will enter a circle within the next ``within`` seconds.
+
+        Positions are extrapolated linearly from each object's ``motion`` (objects
+        without one stand still). Nothing moving at most max_speed can arrive from
+        further than ``max_speed * within`` beyond the edge, so only that swept
+        circle is looked up in the grid; the entry times of its members are then
+        solved in one batch.
+
+        :param circle: The circle to watch.
+        :param within: Look-ahead in seconds.
+        :param max_speed: Upper bound on the speed of the objects in the layer.
+        :param layer: The layer to search.
+        :param include_inside: Also report objects already inside, at time 0.
+        :return: (object, seconds until entry) pairs, soonest first.
+        """
+        return self._predict_entries(
+            circle.center,
+            (0.0, 0.0),
+            circle.radius,
+            within,
+            max_speed,
+            layer,
+            None,
+            include_inside,
+        )
+
+    def objects_approaching(
+        self,
+        obj,
+        reach: float,
+        within: float,
+        max_speed: float,
+        layer="default",
+        include_inside: bool = False,
+    ) -> List[tuple]:
+        """
+        Objects that will come within reach of a moving object within ``within``
+        seconds; see objects_entering_circle().
+
+        :param obj: The object to watch; it needs a position and may have a motion.
+        :param reach: Distance that counts as close.
+        :param within: Look-ahead in seconds.
+        :param max_speed: Upper bound on the speed of the objects in the layer.
+        :param layer: The layer to search.
+        :param include_inside: Also report objects already within reach, at time 0.
+        :return: (object, seconds until within reach) pairs, soonest first.
+        """
+        velocity = velocity_of(obj)
+        own_speed = math.hypot(*velocity)
+        return self._predict_entries(
+            obj.position,
+            velocity,
+            reach,
+            within,
+            max_speed + own_speed,
+            layer,
+            obj,
+            include_inside,
+        )
+
+    def _predict_entries(
+        self,
+        center,
+        velocity,
+        reach,
+        within,
+        closing_speed,
+        layer,
+        exclude,
+        include_inside,
+    ):
+        swept = Circle(center, reach + closing_speed * within)
+        candidates = [
+            obj for obj in self.objects_in_circle(swept, layer) if obj is not exclude
+        ]
+        if not candidates:
+            return []
+        count = len(candidates)
+        dx = np.fromiter((obj.position.x for obj in candidates), float, count)
+        dy = np.fromiter((obj.position.y for obj in candidates), float, count)
+        dx -= center.x
+        dy -= center.y
+        if self.wrap:
+            width, height = self.area.width, self.area.height
+            dx = (dx + width / 2) % width - width / 2
+            dy = (dy + height / 2) % height - height / 2
+        velocities = np.array([velocity_of(obj) for obj in candidates], dtype=float)
+        times = times_to_within(
+            dx,
+            dy,
+            velocities[:, 0] - velocity[0],
+            velocities[:, 1] - velocity[1],
+            reach,
+        )
+        keep = times <= within
+        if not include_inside:
+            keep &= times > 0
+        picked = np.flatnonzero(keep)
+        picked = picked[np.argsort(times[picked], kind="stable")]
+        return [(candidates[index], float(times[index])) for index in picked.tolist()]
+
+    def nearest(
+        self, position: Position, layer="default", max_distance: float = math.inf
+    ):
+        """
+        Find the point object closest to position.
+
+        Cells are searched in rings around the position's cell, stopping as soon as no
+        unvisited ring can hold anything closer. In wrap mode the search continues
+        across the edges and distances use minimum-image offsets.
+
+        :param position: Where to search from.
+        :param layer: The layer to search.
+        :param max_distance: Ignore objects further away than this.
+        :return: (object, distance), or (None, max_distance) if nothing was found.
+        """
+        width, height = self.grid_size.width, self.grid_size.height
+        col = math.floor(position.x / self.cell_width)
+        row = math.floor(position.y / self.cell_height)
+        if not self.wrap:
+            col = min(width - 1, max(0, col))
+            row = min(height - 1, max(0, row))
+        max_ring = max(width, height)
+        if self.wrap:
+            max_ring = max(width, height) // 2 + 1
+        best, best_distance = None, max_distance
+        visited = set()
+        for ring in range(max_ring + 1):
+            if ring > 0:
+                # everything in this ring lies outside the block of rings already searched
+                inner = ring - 1
+                bound = min(
+                    position.x - (col - inner) * self.cell_width,
+                    (col + inner + 1) * self.cell_width - position.x,
+                    position.y - (row - inner) * self.cell_height,
+                    (row + inner + 1) * self.cell_height - position.y,
+                )
+                if bound > best_distance:
+                    break
+            for x, y in _ring_cells(col, row, ring):
+                if self.wrap:
+                    x, y = x % width, y % height
+                elif not (0 <= x < width and 0 <= y < height):
+                    continue
+                if (x, y) in visited:
+                    continue
+                visited.add((x, y))
+                for obj in self.cells[y][x].object_container.get_all(layer):
+                    distance = self.distance(position, obj.position)
+                    if distance <= best_distance:
+                        best, best_distance = obj, distance
+        return best, best_distance
+
+    def pairs_within(self, radius: float, layer="default"):
+        """
+        Yields each unordered pair of point objects no further than radius apart.
+
+        Every cell is compared with itself and with the neighbours ahead of it, so a
+        pair is tested once. In wrap mode pairs straddling an edge are found too.
+
+        :param radius: Maximum distance between the two objects.
+        :param layer: The layer to search.
+        :return: Generator of (a, b) tuples.
+        """
+        width, height = self.grid_size.width, self.grid_size.height
+        reach_x = max(1, math.ceil(radius / self.cell_width))
+        reach_y = max(1, math.ceil(radius / self.cell_height))
+        offsets = [
+            (dx, dy)
+            for dy in range(0, reach_y + 1)
+            for dx in range(-reach_x, reach_x + 1)
+            if dy > 0 or dx > 0
+        ]
+
+        def neighbours(x, y):
+            if not self.wrap:
+                for dx, dy in offsets:
+                    if 0 <= x + dx < width and 0 <= y + dy < height:
+                        yield x + dx, y + dy
+                return
+            # on a torus the forward offsets can wrap back onto earlier cells, so use
+            # the symmetric neighbourhood and only pair with cells later in the grid
+            cells = {
+                ((x + dx) % width, (y + dy) % height)
+                for dy in range(-reach_y, reach_y + 1)
+                for dx in range(-reach_x, reach_x + 1)
+            }
+            for nx, ny in cells:
+                if (ny, nx) > (y, x):
+                    yield nx, ny
+
+        members = [
+            [list(cell.object_container.get_all(layer)) for cell in row]
+            for row in self.cells
+        ]
+        radius_sq = radius * radius
+        if self.wrap:
+
+            def distance_sq(a, b):
+                dx = torus.min_image(a.x - b.x, self.area.width)
+                dy = torus.min_image(a.y - b.y, self.area.height)
+                return dx * dx + dy * dy
+
+        else:
+
+            def distance_sq(a, b):
+                return (a.x - b.x) ** 2 + (a.y - b.y) ** 2
+
+        for y in range(height):
+            for x in range(width):
+                here = members[y][x]
+                if not here:
+                    continue
+                for index, a in enumerate(here):
+                    for b in here[index + 1 :]:
+                        if distance_sq(a.position, b.position) <= radius_sq:
+                            yield a, b
+                for nx, ny in neighbours(x, y):
+                    there = members[ny][nx]
+                    for a in here:
+                        for b in there:
+                            if distance_sq(a.position, b.position) <= radius_sq:
+                                yield a, b
+
+    def layer_snapshot(self, layer="default") -> LayerSnapshot:
+        """
+        The point objects of a layer packed into arrays, reused until the grid version
+        changes. Like the query cache, this relies on bump_version() being called
+        after objects are moved in place.
+        """
+        snapshot = self._snapshots.get(layer)
+        if snapshot is not None and snapshot.version == self.version:
+            return snapshot
+        # readers in a read phase may all find the snapshot stale at once; one
+        # builds it and the others wait for it
+        with self._snapshots_lock:
+            snapshot = self._snapshots.get(layer)
+            if snapshot is None or snapshot.version != self.version:
+                snapshot = LayerSnapshot(self, layer)
+                self._snapshots[layer] = snapshot
+            return snapshot
+
+    def query_many(
+        self, shapes: Sequence[Area | Circle], layer="default"
+    ) -> QueryResults:
+        """
+        Answer many area/circle queries in one vectorised pass.
+
+        Each query is expanded into the cells under its bounding box and those into
+        candidate objects, and all candidates are tested at once; per query this
+        avoids the Python overhead of objects_in_circle/objects_in_area, which
+        dominates for small shapes. Only point objects are considered.
+
+        .. code-block:: python
+
+            results = grid.query_many([Circle(agent.position, 50) for agent in agents])
+            for index, agent in enumerate(agents):
+                neighbours = results[index]
+
+        :param shapes: Areas and Circles, in any mix.
+        :param layer: The layer to query.
+        :return: QueryResults holding CSR offsets and indices into its objects list.
+        """
+        snapshot = self.layer_snapshot(layer)
+        offsets, indices = query_shapes(self, snapshot, shapes)
+        return QueryResults(offsets, indices, snapshot.objects)
+
+    def query_circles(self, xs, ys, radii, layer="default") -> QueryResults:
+        """
+        query_many for circles given as arrays of centres and radii.
+
+        :param xs: Centre x coordinates.
+        :param ys: Centre y coordinates.
+        :param radii: Radii, one per circle or a single shared value.
+        :param layer: The layer to query.
+        """
+        snapshot = self.layer_snapshot(layer)
+        offsets, indices = query_circles(self, snapshot, xs, ys, radii)
+        return QueryResults(offsets, indices, snapshot.objects)
+
+    def query_areas(
+        self, lefts, tops, rights, bottoms, layer="default"
+    ) -> QueryResults:
+        """
+        query_many for rectangles given as arrays of edges.
+
+        :param layer: The layer to query.
+        """
+        snapshot = self.layer_snapshot(layer)
+        offsets, indices = query_areas(self, snapshot, lefts, tops, rights, bottoms)
+        return QueryResults(offsets, indices, snapshot.objects)
+
+    def cached_objects_in_area(self, area: Area, layer="default") -> tuple:
+        """
+        objects_in_area() through the query cache.
+
+        Repeating an identical query while the grid version is unchanged costs a
+        dictionary lookup. See bump_version() for objects moved in place.
+
+        :return: A tuple of the objects in the area.
+        """
+        return self.query_cache.get(
+            (shape_key(area), layer, self.version),
+            lambda: self.objects_in_area(area, layer),
+        )
+
+    def cached_objects_in_circle(self, circle: Circle, layer="default") -> tuple:
+        """
+        objects_in_circle() through the query cache.
+
+        :return: A tuple of the objects in the circle.
+        """
+        return self.query_cache.get(
+            (shape_key(circle), layer, self.version),
+            lambda: self.objects_in_circle(circle, layer),
+        )
+
+    def cells_along_path(
+        self, start: Position, end: Position, radius: float = 0.0
+    ) -> Generator["GridCell", None, None]:
+        """
+        Yields, in path order, the GridCells touched by a circle swept from start to end.
+
+        Only the cells the swept capsule actually crosses are visited, so a fast
+        mover costs cells proportional to the distance it travels.
+
+        :param start: Centre of the circle at the start of the movement.
+        :param end: Centre of the circle at the end of the movement.
+        :param radius: Radius of the swept circle; 0 walks the bare segment.
+        """
+        for cell, _ in cells_along_path(self, start, end, radius):
+            yield cell
+
+    def sweep(
+        self,
+        start: Position,
+        end: Position,
+        dt: float = 1.0,
+        radius: float = 0.0,
+        layer="default",
+        object_radius: float = 0.0,
+        ignore=None,
+    ) -> List[SweptHit]:
+        """
+        Continuous collision query: every object touched by a point or circle moving
+        from start to end over dt seconds, ordered by time of contact.
+
+        Unlike a point-in-area test at the end position this cannot tunnel through
+        objects, however many cells the mover covers in one frame.
+
+        :param start: Centre of the moving shape at the start of the frame.
+        :param end: Centre of the moving shape at the end of the frame.
+        :param dt: Length of the frame in seconds; SweptHit.time is scaled by it.
+        :param radius: Radius of the moving shape, 0 for a point.
+        :param layer: The layer to test against.
+        :param object_radius: Radius given to the objects in the layer.
+        :param ignore: An object to leave out, usually the mover itself.
+        :return: A list of SweptHit, earliest first.
+        """
+        return sweep_contacts(
+            self, start, end, dt, radius, layer, object_radius, ignore
+        )
+
+    def first_contact(
+        self,
+        start: Position,
+        end: Position,
+        dt: float = 1.0,
+        radius: float = 0.0,
+        layer="default",
+        object_radius: float = 0.0,
+        ignore=None,
+    ) -> Optional[SweptHit]:
+        """
+        Like sweep(), but only reports the earliest contact and stops walking cells
+        as soon as no later cell could beat it.
+
+        :return: The earliest SweptHit, or None if the path is clear.
+        """
+        hits = sweep_contacts(
+            self, start, end, dt, radius, layer, object_radius, ignore, first_only=True
+        )
+        return hits[0] if hits else None
+
+
+def _ring_cells(col, row, ring):
+    """Cell coordinates on the square ring at Chebyshev distance ring from (col, row)."""
+    if ring == 0:
+        yield col, row
+        return
+    for x in range(col - ring, col + ring + 1):
+        yield x, row - ring
+        yield x, row + ring
+    for y in range(row - ring + 1, row + ring):
+        yield col - ring, y
+        yield col + ring, y
 
 
 class GridCell:
@@ -233,6 +1359,8 @@ class GridCell:
         self.object_container = ObjectContainer(
             owner=self, owner_attr_name="owning_cell"
         )
+        # ExtentRecords of objects overlapping this cell; shared with other cells
+        self.extent_container = ObjectContainer(owner=self, owner_attr_name=None)
 
     def overlaps_with_circle(self, circle: "Circle") -> bool:
         """Check if the GridCell overlaps with a Circle."""
@@ -254,11 +1382,37 @@ class GridCell:
             if area.contains(obj.position):
                 yield obj
 
+    def extents_overlapping(
+        self, shape: "Area | Circle", layer, stamp: tuple, world: "Area" = None
+    ):
+        """
+        Yield objects with an extent touching shape, skipping ones already stamped.
+
+        :param world: For wrapping grids, the world area; any wrapped image of the
+            shape then counts.
+        """
+        for record in self.extent_container.iter_layer(layer):
+            if not record.claim(stamp):
+                continue
+            if world is None:
+                if extent_overlaps(record.extent, shape):
+                    yield record.obj
+            elif torus.wrapped_overlaps(record.extent, shape, world):
+                yield record.obj
+
     def add_to_cell(self, object, layer="default"):
-        self.object_container.add(object, layer=layer)
+        with self.grid.phases.write_phase():
+            self.object_container.add(object, layer=layer)
+            self.grid.bump_version()
+            if self.grid.rebuild is not None:
+                self.grid.rebuild.mark_dirty(self)
 
     def remove(self, object, layer="default"):
-        self.object_container.remove(object, layer=layer)
+        with self.grid.phases.write_phase():
+            self.object_container.remove(object, layer=layer)
+            self.grid.bump_version()
+            if self.grid.rebuild is not None:
+                self.grid.rebuild.mark_dirty(self)
 
     def all_members(self, layer=None):
         return self.object_container.get_all(layer=layer)
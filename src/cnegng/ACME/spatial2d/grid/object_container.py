@@ -6,6 +6,8 @@ class ObjectContainer:
 
         :param owner: The owner of this container.
         :param owner_attr_name: The name of the attribute in each object for tracking ownership.
+            Pass None for a container that does not track ownership, so the same object can be
+            held by several containers at once.
         """
         self._layers = {}  # Dictionary to store objects by layers
         self.owner = owner
@@ -20,11 +22,12 @@ class ObjectContainer:
         :param layer: The layer to add the object to.
         :raises ValueError: If the object already has a non-None owner.
         """
-        if getattr(obj, self.owner_attr_name, None) is not None:
-            raise ValueError(f"Cannot add object {obj}. It already has an owner.")
+        if self.owner_attr_name is not None:
+            if getattr(obj, self.owner_attr_name, None) is not None:
+                raise ValueError(f"Cannot add object {obj}. It already has an owner.")
 
-        # Set the object's owner attribute to the container's owner
-        setattr(obj, self.owner_attr_name, self.owner)
+            # Set the object's owner attribute to the container's owner
+            setattr(obj, self.owner_attr_name, self.owner)
 
         # Add object to the specified layer
         if layer not in self._layers:
@@ -32,6 +35,22 @@ class ObjectContainer:
 
         self._layers[layer].add(obj)
 
+    def adopt_all(self, objects, layer="default"):
+        """
+        Take over objects that are moving here from another container, in bulk.
+
+        Unlike add(), existing owners are overwritten instead of raising, so this is
+        only for code that is retiring the objects' previous containers.
+
+        :param objects: Iterable of objects to add.
+        :param layer: The layer to add them to.
+        """
+        objects = list(objects)
+        if self.owner_attr_name is not None:
+            for obj in objects:
+                setattr(obj, self.owner_attr_name, self.owner)
+        self._layers.setdefault(layer, set()).update(objects)
+
     def remove(self, obj, layer="default"):
         """
         Remove an object from a specific layer in the container and clear its owner attribute.
@@ -43,7 +62,8 @@ class ObjectContainer:
         if layer in self._layers and obj in self._layers[layer]:
             self._layers[layer].remove(obj)
             # Reset the object's owner attribute to None
-            setattr(obj, self.owner_attr_name, None)
+            if self.owner_attr_name is not None:
+                setattr(obj, self.owner_attr_name, None)
 
     def contains(self, obj, layer=None):
         """
@@ -75,13 +95,15 @@ class ObjectContainer:
         :param layer: The layer to clear. If None, clear all layers.
         """
         if layer is not None:
-            for obj in self._layers.get(layer, []):
-                setattr(obj, self.owner_attr_name, None)
+            if self.owner_attr_name is not None:
+                for obj in self._layers.get(layer, []):
+                    setattr(obj, self.owner_attr_name, None)
             self._layers[layer] = set()
         else:
-            for objects in self._layers.values():
-                for obj in objects:
-                    setattr(obj, self.owner_attr_name, None)
+            if self.owner_attr_name is not None:
+                for objects in self._layers.values():
+                    for obj in objects:
+                        setattr(obj, self.owner_attr_name, None)
             self._layers.clear()
 
     def get_all(self, layer=None):
@@ -100,5 +122,15 @@ class ObjectContainer:
             all_objects.update(objects)
         return all_objects
 
+    def iter_layer(self, layer):
+        """
+        Iterate the objects of one layer without copying them.
+
+        The container must not be modified while the iteration is running.
+
+        :param layer: The layer to iterate.
+        """
+        return iter(self._layers.get(layer, ()))
+
     def layers(self):
         return self._layers.keys()
@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, Tuple
+
+from cnegng.ACME.spatial2d.area import Area
+from cnegng.ACME.spatial2d.circle import Circle
+
+
+def shape_key(shape: Area | Circle) -> Tuple:
+    """
+    A hashable description of a query shape; equal shapes give equal keys.
+
+    :param shape: An Area or a Circle.
+    """
+    match shape:
+        case Area():
+            return ("area", shape.top, shape.left, shape.bottom, shape.right)
+        case Circle():
+            return ("circle", shape.center.x, shape.center.y, shape.radius)
+    raise TypeError(f"Cannot build a cache key for {shape!r}")
+
+
+class QueryCache:
+    """
+    A bounded LRU of query results.
+
+    Keys include the grid version, so a result can never be served after the grid
+    changed; stale entries simply fall off the end of the LRU. The bookkeeping is
+    locked so concurrent readers can share one cache; queries run outside the lock.
+
+    Attributes
+    ----------
+    maxsize : int
+        The number of results kept. 0 disables caching.
+    hits : int
+        Lookups answered from the cache.
+    misses : int
+        Lookups that had to run the query.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, compute: Callable[[], Iterable]) -> tuple:
+        """
+        Return the cached result for key, running compute() on a miss.
+
+        :param key: Hashable key, including the grid version.
+        :param compute: Callable producing the query results.
+        :return: The results as a tuple.
+        """
+        with self._lock:
+            try:
+                result = self._entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+
+        result = tuple(compute())
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = result
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        """Drop every cached result and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return (
+            f"QueryCache(size={len(self)}/{self.maxsize}, "
+            f"hits={self.hits}, misses={self.misses})"
+        )
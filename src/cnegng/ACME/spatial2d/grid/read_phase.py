@@ -0,0 +1,129 @@
+import threading
+from contextlib import contextmanager
+
+
+class GridPhaseError(Exception):
+    """Raised when a grid is mutated while a read phase is open, or read mid-write."""
+
+    pass
+
+
+class _WritePhase:
+    """Context manager returned by ReadPhaseGuard.write_phase(); mutations take it
+    often enough that a generator based one is noticeably slower."""
+
+    def __init__(self, guard):
+        self.guard = guard
+
+    def __enter__(self):
+        self.guard._begin_write()
+
+    def __exit__(self, *exc_info):
+        self.guard._end_write()
+
+
+class ReadPhaseGuard:
+    """
+    Splits a tick into a single-writer phase and read phases.
+
+    While any read phase is open the grid is immutable, so any number of threads may
+    query it without locks; mutations raise GridPhaseError instead of racing. Every
+    mutation runs inside a write phase, which only one thread holds at a time and
+    which read phases opened from other threads wait out, so a reader never walks
+    cells that are being changed. Each read phase that starts from an idle grid
+    opens a new epoch.
+
+    Attributes
+    ----------
+    epoch : int
+        Number of read phases opened so far.
+    on_idle : callable or None
+        Called when the last open read phase closes, before another can open.
+    """
+
+    def __init__(self, on_idle=None):
+        self.epoch = 0
+        self.on_idle = on_idle
+        self._readers = 0
+        # the thread holding the write phase, and how deeply it has nested it
+        self._writer = None
+        self._writes = 0
+        self._lock = threading.Condition()
+        self._write_phase = _WritePhase(self)
+
+    @contextmanager
+    def read_phase(self):
+        """
+        Context manager for a read phase. Read phases may nest and overlap; one
+        opened while another thread writes waits for the write phase to end.
+
+        :return: The epoch of the phase.
+        :raises GridPhaseError: If this thread holds the write phase.
+        """
+        with self._lock:
+            if self._writer == threading.get_ident():
+                raise GridPhaseError("Read phase opened during a write phase")
+            while self._writes:
+                self._lock.wait()
+            if self._readers == 0:
+                self.epoch += 1
+            self._readers += 1
+            epoch = self.epoch
+        try:
+            yield epoch
+        finally:
+            with self._lock:
+                self._readers -= 1
+                if self._readers == 0:
+                    if self.on_idle is not None:
+                        self.on_idle()
+                    self._lock.notify_all()
+
+    def write_phase(self):
+        """
+        Context manager for a write phase. The thread holding it may nest it;
+        other threads wait for it to end before writing or opening a read phase.
+
+        :raises GridPhaseError: If a read phase is open.
+        """
+        return self._write_phase
+
+    def _begin_write(self):
+        me = threading.get_ident()
+        if self._writer == me:
+            # nobody else touches the count while this thread holds the phase
+            self._writes += 1
+            return
+        with self._lock:
+            while self._writes:
+                self._lock.wait()
+            self._check_no_readers()
+            self._writer = me
+            self._writes = 1
+
+    def _end_write(self):
+        if self._writes > 1:
+            self._writes -= 1
+            return
+        with self._lock:
+            self._writes = 0
+            self._writer = None
+            self._lock.notify_all()
+
+    @property
+    def reading(self) -> bool:
+        """True while a read phase is open."""
+        return self._readers > 0
+
+    def check_writable(self):
+        """
+        :raises GridPhaseError: If a read phase is open.
+        """
+        with self._lock:
+            self._check_no_readers()
+
+    def _check_no_readers(self):
+        if self._readers:
+            raise GridPhaseError(
+                f"Grid was mutated during read phase (epoch {self.epoch})"
+            )
@@ -0,0 +1,67 @@
+class GridStats:
+    """
+    Running totals describing how a grid is queried.
+
+    The grid adds to these from its area and circle queries; GridTuner reads them to
+    pick a resolution. Updates are not locked: during a read phase each thread
+    counts into a GridStats of its own, which the grid merges into its shared one
+    when the phase closes (see Grid.stats).
+
+    Attributes
+    ----------
+    queries : int
+        Number of area and circle queries run.
+    candidates : int
+        Objects examined by those queries (members of every visited cell).
+    extent_width : float
+        Sum of the query shapes' widths.
+    extent_height : float
+        Sum of the query shapes' heights.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new measurement window."""
+        self.queries = 0
+        self.candidates = 0
+        self.extent_width = 0.0
+        self.extent_height = 0.0
+
+    def record_query(self, width: float, height: float) -> None:
+        """Count one query with the given bounding box size."""
+        self.queries += 1
+        self.extent_width += width
+        self.extent_height += height
+
+    def record_queries(
+        self, count: int, total_width: float, total_height: float
+    ) -> None:
+        """Count a batch of queries given the summed sizes of their bounding boxes."""
+        self.queries += count
+        self.extent_width += total_width
+        self.extent_height += total_height
+
+    def merge(self, other: "GridStats") -> None:
+        """Add another window's totals to these."""
+        self.queries += other.queries
+        self.candidates += other.candidates
+        self.extent_width += other.extent_width
+        self.extent_height += other.extent_height
+
+    def mean_candidates(self) -> float:
+        """Average number of objects examined per query."""
+        return self.candidates / self.queries if self.queries else 0.0
+
+    def mean_extent(self):
+        """Average (width, height) of the query shapes."""
+        if not self.queries:
+            return 0.0, 0.0
+        return self.extent_width / self.queries, self.extent_height / self.queries
+
+    def __repr__(self):
+        return (
+            f"GridStats(queries={self.queries}, "
+            f"mean_candidates={self.mean_candidates():.1f})"
+        )
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+from cnegng.ACME.spatial2d.area import Area
+from cnegng.ACME.spatial2d.circle import Circle
+from cnegng.ACME.spatial2d.position import Position
+
+
+@dataclass
+class SweptHit:
+    """
+    The first moment a swept point or circle touches an object in the grid.
+
+    :param obj: The object that was touched.
+    :param time: Seconds after the start of the sweep at which contact happens.
+    :param fraction: The same moment expressed as a fraction (0..1) of the path.
+    :param position: Where the centre of the swept shape is at the moment of contact.
+    """
+
+    obj: object
+    time: float
+    fraction: float
+    position: Position
+
+
+def contact_fraction(
+    start: Position, dx: float, dy: float, target: Position, reach: float
+) -> Optional[float]:
+    """
+    Solve for the first fraction t in [0, 1] at which ``start + t * (dx, dy)``
+    comes within ``reach`` of ``target``.
+
+    :param start: Where the swept centre begins.
+    :param dx: Total x displacement over the sweep.
+    :param dy: Total y displacement over the sweep.
+    :param target: The point being tested against.
+    :param reach: Contact distance (swept radius plus target radius).
+    :return: The contact fraction, or None if there is no contact along the path.
+    """
+    fx = start.x - target.x
+    fy = start.y - target.y
+    c = fx * fx + fy * fy - reach * reach
+    if c <= 0:
+        return 0.0  # already touching at the start of the sweep
+    a = dx * dx + dy * dy
+    if a == 0:
+        return None
+    b = 2 * (fx * dx + fy * dy)
+    discriminant = b * b - 4 * a * c
+    if discriminant < 0:
+        return None
+    t = (-b - math.sqrt(discriminant)) / (2 * a)
+    if 0.0 <= t <= 1.0:
+        return t
+    return None
+
+
+def extent_contact_fraction(
+    start: Position, dx: float, dy: float, extent: Area | Circle, radius: float
+) -> Optional[float]:
+    """
+    Like contact_fraction(), against an object's Area or Circle extent.
+
+    A circle sweeping into a box touches it when its centre enters the box grown by
+    the radius with rounded corners: two grown slabs plus a circle at each corner.
+    """
+    if isinstance(extent, Circle):
+        return contact_fraction(start, dx, dy, extent.center, radius + extent.radius)
+    candidates = []
+    for left, top, right, bottom in (
+        (extent.left - radius, extent.top, extent.right + radius, extent.bottom),
+        (extent.left, extent.top - radius, extent.right, extent.bottom + radius),
+    ):
+        clipped = _clip_to_box(start, dx, dy, left, top, right, bottom)
+        if clipped is not None:
+            candidates.append(clipped[0])
+    if radius > 0:
+        for corner_x in (extent.left, extent.right):
+            for corner_y in (extent.top, extent.bottom):
+                t = contact_fraction(
+                    start, dx, dy, Position(corner_x, corner_y), radius
+                )
+                if t is not None:
+                    candidates.append(t)
+    return min(candidates) if candidates else None
+
+
+def _clip_to_box(
+    start: Position, dx: float, dy: float, left, top, right, bottom
+) -> Optional[Tuple[float, float]]:
+    """Liang-Barsky clip of the parametric segment against a box, as (t_min, t_max)."""
+    t_min, t_max = 0.0, 1.0
+    for p, q in (
+        (-dx, start.x - left),
+        (dx, right - start.x),
+        (-dy, start.y - top),
+        (dy, bottom - start.y),
+    ):
+        if p == 0:
+            if q < 0:
+                return None
+            continue
+        t = q / p
+        if p < 0:
+            t_min = max(t_min, t)
+        else:
+            t_max = min(t_max, t)
+        if t_min > t_max:
+            return None
+    return t_min, t_max
+
+
+def _segment_rect_distance_sq(ax, ay, bx, by, area) -> float:
+    """Squared distance between the segment a-b and an axis aligned Area."""
+    if _clip_to_box(
+        Position(ax, ay), bx - ax, by - ay, area.left, area.top, area.right, area.bottom
+    ):
+        return 0.0
+
+    def point_rect(px, py):
+        cx = max(area.left, min(px, area.right))
+        cy = max(area.top, min(py, area.bottom))
+        return (px - cx) ** 2 + (py - cy) ** 2
+
+    def point_segment(px, py):
+        sx, sy = bx - ax, by - ay
+        length_sq = sx * sx + sy * sy
+        t = 0.0
+        if length_sq > 0:
+            t = max(0.0, min(1.0, ((px - ax) * sx + (py - ay) * sy) / length_sq))
+        return (ax + t * sx - px) ** 2 + (ay + t * sy - py) ** 2
+
+    return min(
+        point_rect(ax, ay),
+        point_rect(bx, by),
+        point_segment(area.left, area.top),
+        point_segment(area.right, area.top),
+        point_segment(area.left, area.bottom),
+        point_segment(area.right, area.bottom),
+    )
+
+
+def segment_cells(
+    start: Position,
+    end: Position,
+    cell_width: float,
+    cell_height: float,
+    cols: int,
+    rows: int,
+) -> Iterator[Tuple[int, int, float, float]]:
+    """
+    Walk the cells crossed by the segment start-end, in order (Amanatides & Woo).
+
+    The cells form a cols x rows lattice anchored at the origin; the segment is
+    clipped to that lattice first, so only cells inside it are visited.
+
+    :param start: Segment start.
+    :param end: Segment end.
+    :param cell_width: Width of one cell.
+    :param cell_height: Height of one cell.
+    :param cols: Number of columns in the lattice.
+    :param rows: Number of rows in the lattice.
+    :return: Generator of (col, row, t_enter, t_exit) with t as a fraction of the segment.
+    """
+    dx = end.x - start.x
+    dy = end.y - start.y
+    clipped = _clip_to_box(
+        start, dx, dy, 0.0, 0.0, cols * cell_width, rows * cell_height
+    )
+    if clipped is None:
+        return
+    t, t_end = clipped
+
+    col = min(cols - 1, max(0, int((start.x + t * dx) / cell_width)))
+    row = min(rows - 1, max(0, int((start.y + t * dy) / cell_height)))
+
+    def axis_setup(origin, delta, index, size):
+        if delta > 0:
+            return 1, ((index + 1) * size - origin) / delta, size / delta
+        if delta < 0:
+            return -1, (index * size - origin) / delta, -size / delta
+        return 0, math.inf, math.inf
+
+    step_x, next_x, delta_x = axis_setup(start.x, dx, col, cell_width)
+    step_y, next_y, delta_y = axis_setup(start.y, dy, row, cell_height)
+
+    while True:
+        t_exit = min(next_x, next_y, t_end)
+        yield col, row, t, t_exit
+        if t_exit >= t_end:
+            return
+        if next_x < next_y:
+            col += step_x
+            t, next_x = next_x, next_x + delta_x
+        else:
+            row += step_y
+            t, next_y = next_y, next_y + delta_y
+        if not (0 <= col < cols and 0 <= row < rows):
+            return
+
+
+def cells_along_path(grid, start: Position, end: Position, radius: float = 0.0):
+    """
+    Yield every cell touched by a circle of ``radius`` swept from start to end.
+
+    Cells are yielded in path order, each with the path fraction at which the
+    centre entered the cell they were found from. Once a contact at or before
+    that fraction is known, no later cell can produce an earlier one.
+
+    :return: Generator of (GridCell, t_enter).
+    """
+    dx = end.x - start.x
+    dy = end.y - start.y
+    cols, rows = grid.grid_size.width, grid.grid_size.height
+    reach_x = math.ceil(radius / grid.cell_width) if radius > 0 else 0
+    reach_y = math.ceil(radius / grid.cell_height) if radius > 0 else 0
+    radius_sq = radius * radius
+    visited = set()
+
+    # a wide circle can touch the grid while its centre never enters it, so walk
+    # the centre line through a lattice padded by the radius on every side
+    pad_x = reach_x * grid.cell_width
+    pad_y = reach_y * grid.cell_height
+    for col, row, t_enter, t_exit in segment_cells(
+        Position(start.x + pad_x, start.y + pad_y),
+        Position(end.x + pad_x, end.y + pad_y),
+        grid.cell_width,
+        grid.cell_height,
+        cols + 2 * reach_x,
+        rows + 2 * reach_y,
+    ):
+        col -= reach_x
+        row -= reach_y
+        ax, ay = start.x + t_enter * dx, start.y + t_enter * dy
+        bx, by = start.x + t_exit * dx, start.y + t_exit * dy
+        for y in range(max(0, row - reach_y), min(rows, row + reach_y + 1)):
+            for x in range(max(0, col - reach_x), min(cols, col + reach_x + 1)):
+                if (x, y) in visited:
+                    continue
+                cell = grid.cells[y][x]
+                if (x, y) != (col, row) and (
+                    _segment_rect_distance_sq(ax, ay, bx, by, cell.area) > radius_sq
+                ):
+                    continue
+                visited.add((x, y))
+                yield cell, t_enter
+
+
+def sweep_contacts(
+    grid,
+    start: Position,
+    end: Position,
+    dt: float = 1.0,
+    radius: float = 0.0,
+    layer="default",
+    object_radius: float = 0.0,
+    ignore=None,
+    first_only: bool = False,
+) -> List[SweptHit]:
+    """
+    Find the objects a point or circle touches while moving from start to end over dt.
+
+    :param grid: The Grid to query.
+    :param start: Centre of the moving shape at the beginning of the step.
+    :param end: Centre of the moving shape at the end of the step.
+    :param dt: Duration of the step in seconds, used to report contact times.
+    :param radius: Radius of the moving shape; 0 sweeps a point.
+    :param layer: Grid layer to test against.
+    :param object_radius: Radius given to the point objects stored in the grid;
+        objects added with an extent use their own Area or Circle instead.
+    :param ignore: An object to skip, usually the mover itself.
+    :param first_only: Stop as soon as the earliest contact is certain.
+    :return: SweptHits ordered by contact time.
+    """
+    dx = end.x - start.x
+    dy = end.y - start.y
+    reach = radius + object_radius
+    hits = []
+    best = math.inf
+    stamp = grid.next_query_stamp()
+    for cell, t_enter in cells_along_path(grid, start, end, reach):
+        if first_only and best <= t_enter:
+            break
+        for obj in cell.object_container.get_all(layer):
+            if obj is ignore:
+                continue
+            t = contact_fraction(start, dx, dy, obj.position, reach)
+            if t is not None:
+                hits.append((t, obj))
+                best = min(best, t)
+        for record in cell.extent_container.iter_layer(layer):
+            if record.obj is ignore or not record.claim(stamp):
+                continue
+            t = extent_contact_fraction(start, dx, dy, record.extent, radius)
+            if t is not None:
+                hits.append((t, record.obj))
+                best = min(best, t)
+    hits.sort(key=lambda hit: hit[0])
+    if first_only:
+        hits = hits[:1]
+    return [
+        SweptHit(
+            obj=obj,
+            time=t * dt,
+            fraction=t,
+            position=Position(start.x + t * dx, start.y + t * dy),
+        )
+        for t, obj in hits
+    ]
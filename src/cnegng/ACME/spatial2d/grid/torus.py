@@ -0,0 +1,87 @@
+import math
+
+from cnegng.ACME.spatial2d.area import Area
+from cnegng.ACME.spatial2d.circle import Circle
+from cnegng.ACME.spatial2d.position import Position
+from cnegng.ACME.spatial2d.grid.extent import extent_bounds, extent_overlaps
+
+
+def min_image(delta: float, size: float) -> float:
+    """
+    The shortest signed offset equivalent to delta on a ring of the given size.
+
+    Works elementwise on numpy arrays too.
+
+    :param delta: Raw coordinate difference, or an array of them.
+    :param size: Width (or height) of the wrapping world.
+    :return: An offset in [-size / 2, size / 2).
+    """
+    integral = isinstance(delta, int) or getattr(delta, "dtype", None) == "int64"
+    if integral and isinstance(size, int):
+        # stay in integers so fixed-point coordinates keep exact offsets
+        return (delta + size // 2) % size - size // 2
+    return (delta + size / 2) % size - size / 2
+
+
+def torus_distance(a: Position, b: Position, world: Area) -> float:
+    """Distance between two positions using minimum-image offsets."""
+    return math.hypot(
+        min_image(a.x - b.x, world.width), min_image(a.y - b.y, world.height)
+    )
+
+
+def area_contains(area: Area, position: Position, world: Area) -> bool:
+    """
+    Check if some wrapped image of position lies inside area.
+
+    The area may hang over the edges of the world; it must be smaller than the world.
+    """
+    x = area.left + (position.x - area.left) % world.width
+    y = area.top + (position.y - area.top) % world.height
+    return x <= area.right and y <= area.bottom
+
+
+def circle_contains(circle: Circle, position: Position, world: Area) -> bool:
+    """Check if position is within the circle, measured with minimum-image offsets."""
+    dx = min_image(position.x - circle.center.x, world.width)
+    dy = min_image(position.y - circle.center.y, world.height)
+    return dx * dx + dy * dy <= circle.radius * circle.radius
+
+
+def translate(shape: Area | Circle, dx: float, dy: float) -> Area | Circle:
+    """A copy of an Area or Circle moved by (dx, dy)."""
+    match shape:
+        case Area():
+            return Area(
+                top=shape.top + dy,
+                left=shape.left + dx,
+                bottom=shape.bottom + dy,
+                right=shape.right + dx,
+            )
+        case Circle():
+            return Circle(
+                Position(shape.center.x + dx, shape.center.y + dy), shape.radius
+            )
+    raise TypeError(f"Cannot translate {shape!r}")
+
+
+def wrapped_overlaps(extent: Area | Circle, shape: Area | Circle, world: Area) -> bool:
+    """
+    Check whether an extent touches any wrapped image of a query shape.
+
+    Only the images whose bounding box reaches the extent's are tested in full.
+    """
+    e_left, e_top, e_right, e_bottom = extent_bounds(extent)
+    s_left, s_top, s_right, s_bottom = extent_bounds(shape)
+    for shift_y in (0.0, -world.height, world.height):
+        if s_bottom + shift_y < e_top or s_top + shift_y > e_bottom:
+            continue
+        for shift_x in (0.0, -world.width, world.width):
+            if s_right + shift_x < e_left or s_left + shift_x > e_right:
+                continue
+            image = (
+                shape if shift_x == shift_y == 0 else translate(shape, shift_x, shift_y)
+            )
+            if extent_overlaps(extent, image):
+                return True
+    return False
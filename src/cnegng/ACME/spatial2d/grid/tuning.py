@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+from cnegng.ACME.spatial2d.area import Area
+from cnegng.ACME.spatial2d.grid.grid import Grid, GridCell, GridCoord, GridSize
+
+
+class GridRebuild:
+    """
+    Moves a Grid to a new resolution over several frames.
+
+    Each step() does a bounded slice of work, so no single frame pays for the whole
+    rebuild:
+
+    1. build the new cells, ``rows_per_step`` rows at a time;
+    2. work out which new cell every object belongs to, ``cells_per_step`` old cells
+       at a time (old cells changed after being scanned are rescanned at the end);
+    3. swap the new cells in and hand the objects over in bulk.
+
+    Until the last step the grid keeps answering queries from its old cells.
+    """
+
+    def __init__(
+        self,
+        grid: Grid,
+        grid_size: GridSize,
+        rows_per_step: int = 8,
+        cells_per_step: int = 64,
+    ):
+        if grid.rebuild is not None:
+            raise ValueError(f"{grid} is already being rebuilt")
+        self.grid = grid
+        self.grid_size = grid_size.clone()
+        self.rows_per_step = rows_per_step
+        self.cells_per_step = cells_per_step
+        self.cell_width, self.cell_height = grid.cell_size_for(grid_size)
+        self.done = False
+        self._rows = []
+        self._old_cells = [cell for row in grid.cells for cell in row]
+        self._next_old = 0
+        self._staged = {}  # old cell -> {(new col, new row, layer): [objects]}
+        self._dirty = set()
+        grid.rebuild = self
+
+    def __repr__(self):
+        return f"GridRebuild({self.grid_size}, done={self.done})"
+
+    def mark_dirty(self, cell: GridCell):
+        """Called by the grid when an already scanned cell gains or loses an object."""
+        if cell in self._staged:
+            self._dirty.add(cell)
+
+    def step(self) -> bool:
+        """
+        Do one slice of the rebuild.
+
+        :return: True once the grid has switched to the new resolution.
+        """
+        if self.done:
+            return True
+        if len(self._rows) < self.grid_size.height:
+            self._build_rows()
+        elif self._next_old < len(self._old_cells):
+            end = self._next_old + self.cells_per_step
+            for cell in self._old_cells[self._next_old : end]:
+                self._stage(cell)
+            self._next_old = end
+        else:
+            self._commit()
+        return self.done
+
+    def finish(self):
+        """Run the remaining steps immediately."""
+        while not self.step():
+            pass
+
+    def _build_rows(self):
+        grid = self.grid
+        end = min(self.grid_size.height, len(self._rows) + self.rows_per_step)
+        for row in range(len(self._rows), end):
+            top = grid.area.top + row * self.cell_height
+            self._rows.append(
+                [
+                    GridCell(
+                        area=Area(
+                            top=top,
+                            left=grid.area.left + col * self.cell_width,
+                            bottom=top + self.cell_height,
+                            right=grid.area.left + (col + 1) * self.cell_width,
+                        ),
+                        grid_coord=GridCoord(grid=grid, x=col, y=row),
+                        grid=grid,
+                    )
+                    for col in range(self.grid_size.width)
+                ]
+            )
+
+    def _stage(self, cell: GridCell):
+        width, height = self.grid_size.width, self.grid_size.height
+        buckets = {}
+        container = cell.object_container
+        for layer in container.layers():
+            for obj in container.iter_layer(layer):
+                if self.grid.integer_coords:
+                    col = obj.position.x // self.cell_width
+                    row = obj.position.y // self.cell_height
+                else:
+                    col = math.floor(obj.position.x / self.cell_width)
+                    row = math.floor(obj.position.y / self.cell_height)
+                if self.grid.wrap:
+                    col, row = col % width, row % height
+                else:
+                    col = min(width - 1, max(0, col))
+                    row = min(height - 1, max(0, row))
+                key = (col, row, layer)
+                if key in buckets:
+                    buckets[key].append(obj)
+                else:
+                    buckets[key] = [obj]
+        self._staged[cell] = buckets
+
+    def _commit(self):
+        grid = self.grid
+        with grid.phases.write_phase():
+            for cell in self._dirty:
+                self._stage(cell)
+
+            grid.grid_size = self.grid_size
+            grid.set_cell_size(self.cell_width, self.cell_height)
+            grid.cells = self._rows
+            for buckets in self._staged.values():
+                for (col, row, layer), objects in buckets.items():
+                    grid.cells[row][col].object_container.adopt_all(objects, layer)
+            for record in grid._extents.values():
+                record.cells = list(grid._cells_for_extent(record.extent))
+                for cell in record.cells:
+                    cell.extent_container.add(record, layer=record.layer)
+
+            grid.rebuild = None
+            grid.bump_version()
+            grid.stats.reset()
+            self.done = True
+
+
+class GridTuner:
+    """
+    Keeps a Grid's resolution matched to how it is used.
+
+    The grid records how many objects each query examines and how large query
+    shapes are. For a query of size w x h over objects at density d, a cell size s
+    examines about ``d * (w + s) * (h + s)`` objects; the tuner solves that for the
+    cell size giving ``target_candidates`` and, when it differs enough from the
+    current one, rebuilds the grid over the next few frames.
+
+    .. code-block:: python
+
+        tuner = GridTuner(grid)
+        # every few seconds
+        tuner.maybe_rebuild()
+        # every frame
+        tuner.step()
+    """
+
+    def __init__(
+        self,
+        grid: Grid,
+        target_candidates: float = 64,
+        tolerance: float = 0.25,
+        min_queries: int = 32,
+        max_cells: int = 256,
+        rows_per_step: int = 8,
+        cells_per_step: int = 64,
+    ):
+        """
+        :param grid: The grid to tune.
+        :param target_candidates: Desired mean number of objects examined per query.
+        :param tolerance: Relative change in cell count needed before rebuilding.
+        :param min_queries: Queries to observe before recommending anything.
+        :param max_cells: Upper bound on cells along either axis.
+        :param rows_per_step: Passed to GridRebuild.
+        :param cells_per_step: Passed to GridRebuild.
+        """
+        self.grid = grid
+        self.target_candidates = target_candidates
+        self.tolerance = tolerance
+        self.min_queries = min_queries
+        self.max_cells = max_cells
+        self.rows_per_step = rows_per_step
+        self.cells_per_step = cells_per_step
+        self.rebuild: Optional[GridRebuild] = None
+
+    def population(self) -> int:
+        """Number of point objects in the grid."""
+        return sum(
+            cell.object_container.size() for row in self.grid.cells for cell in row
+        )
+
+    def recommend(self) -> Optional[GridSize]:
+        """
+        Suggest a resolution from the statistics gathered so far.
+
+        :return: The recommended GridSize, or None without enough data.
+        """
+        stats = self.grid.stats
+        population = self.population()
+        if stats.queries < self.min_queries or population == 0:
+            return None
+        area = self.grid.area
+        density = population / (area.width * area.height)
+        query_width, query_height = stats.mean_extent()
+        # solve density * (w + s) * (h + s) == target for the cell size s
+        spread = query_width - query_height
+        root = math.sqrt(spread * spread + 4 * self.target_candidates / density)
+        cell_size = (root - query_width - query_height) / 2
+        if cell_size <= 0:
+            # the query shapes alone hold more than the target; let each query
+            # cover about 4 x 4 cells so trimming the overlap stays worthwhile
+            cell_size = math.sqrt(query_width * query_height) / 4 or area.width
+        return GridSize(
+            width=self._clamp(area.width, area.width / cell_size),
+            height=self._clamp(area.height, area.height / cell_size),
+        )
+
+    def _clamp(self, span, cells: float) -> int:
+        cells = int(min(self.max_cells, max(1, round(cells))))
+        if self.grid.integer_coords:
+            # cells must have whole-number sizes: take the nearest count that fits
+            cells = min(
+                (n for n in range(1, self.max_cells + 1) if span % n == 0),
+                key=lambda n: abs(n - cells),
+            )
+        return cells
+
+    def maybe_rebuild(self) -> bool:
+        """
+        Start a rebuild if the recommendation differs enough from the current size.
+
+        Statistics are reset either way, so each call judges a fresh window.
+
+        :return: True if a rebuild was started.
+        """
+        if self.rebuild is not None:
+            return False
+        recommended = self.recommend()
+        self.grid.stats.reset()
+        if recommended is None:
+            return False
+        current = self.grid.grid_size
+        change = abs(
+            recommended.width * recommended.height - current.width * current.height
+        ) / (current.width * current.height)
+        if change <= self.tolerance:
+            return False
+        self.rebuild = GridRebuild(
+            self.grid,
+            recommended,
+            rows_per_step=self.rows_per_step,
+            cells_per_step=self.cells_per_step,
+        )
+        return True
+
+    def step(self) -> None:
+        """Advance a running rebuild by one slice; call once per frame."""
+        if self.rebuild is not None and self.rebuild.step():
+            self.rebuild = None
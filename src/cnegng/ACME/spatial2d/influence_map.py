@@ -0,0 +1,219 @@
+import math
+
+import numpy as np
+
+from cnegng.ACME.spatial2d.area import Area
+from cnegng.ACME.spatial2d.position import Position
+
+
+class InfluenceMap:
+    """
+    A scalar field over a rectangular world, one value per cell, kept in a NumPy
+    array (``values[row, col]``).
+
+    Typical uses are threat, loot value or player density: stamp sources in every
+    tick, let old influence decay and spread it with diffusion steps, then sample
+    it wherever an AI needs a number.
+
+    .. code-block:: python
+
+        threat = InfluenceMap.for_grid(grid)
+        threat.decay(dt, half_life=2.0)
+        threat.stamp_many(xs, ys, strengths, radius=30_000)
+        threat.diffuse(rate=0.2)
+        danger = threat.sample_many(critter_xs, critter_ys)
+
+    Attributes
+    ----------
+    area : Area
+        The world the map covers.
+    values : numpy.ndarray
+        The field, shape (rows, cols).
+    wrap : bool
+        Whether diffusion and stamping wrap around the edges.
+    """
+
+    def __init__(
+        self, area: Area, cols: int, rows: int, wrap: bool = False, dtype=np.float32
+    ):
+        """
+        :param area: The world the map covers.
+        :param cols: Number of cells across.
+        :param rows: Number of cells down.
+        :param wrap: Treat the world as a torus.
+        :param dtype: NumPy dtype of the values.
+        """
+        self.area = area.clone()
+        self.cols = cols
+        self.rows = rows
+        self.wrap = wrap
+        self.cell_width = area.width / cols
+        self.cell_height = area.height / rows
+        self.values = np.zeros((rows, cols), dtype=dtype)
+
+    @classmethod
+    def for_grid(cls, grid, **kwargs) -> "InfluenceMap":
+        """An InfluenceMap with the same area, resolution and topology as a Grid."""
+        kwargs.setdefault("wrap", grid.wrap)
+        return cls(grid.area, grid.grid_size.width, grid.grid_size.height, **kwargs)
+
+    def __repr__(self):
+        return f"InfluenceMap({self.cols}x{self.rows}, area={self.area})"
+
+    def clear(self) -> None:
+        self.values.fill(0)
+
+    def _cells(self, xs, ys):
+        cols = np.floor((np.asarray(xs) - self.area.left) / self.cell_width)
+        rows = np.floor((np.asarray(ys) - self.area.top) / self.cell_height)
+        cols = cols.astype(np.int64)
+        rows = rows.astype(np.int64)
+        if self.wrap:
+            return cols % self.cols, rows % self.rows
+        return np.clip(cols, 0, self.cols - 1), np.clip(rows, 0, self.rows - 1)
+
+    def cell_of(self, position: Position):
+        """(col, row) of the cell holding position; outside positions are clamped."""
+        cols, rows = self._cells(position.x, position.y)
+        return int(cols), int(rows)
+
+    def cell_center(self, col: int, row: int) -> Position:
+        return Position(
+            self.area.left + (col + 0.5) * self.cell_width,
+            self.area.top + (row + 0.5) * self.cell_height,
+        )
+
+    def stamp(self, position: Position, strength: float, radius: float = 0) -> None:
+        """Add one source; see stamp_many()."""
+        self.stamp_many([position.x], [position.y], [strength], radius)
+
+    def stamp_many(self, xs, ys, strengths, radius: float = 0) -> None:
+        """
+        Add many sources at once.
+
+        With a radius each source adds ``strength * (1 - d / radius)`` to every cell
+        whose centre is within the radius of the source's cell centre; without one
+        it adds strength to its own cell only.
+
+        :param xs: Source x coordinates.
+        :param ys: Source y coordinates.
+        :param strengths: Strength per source, or one shared value.
+        :param radius: Reach of each source, in world units.
+        """
+        cols, rows = self._cells(xs, ys)
+        strengths = np.broadcast_to(
+            np.asarray(strengths, dtype=self.values.dtype), cols.shape
+        )
+        if radius <= 0:
+            np.add.at(self.values, (rows, cols), strengths)
+            return
+        offset_cols, offset_rows, weights = self._kernel(radius)
+        target_cols = cols[:, None] + offset_cols[None, :]
+        target_rows = rows[:, None] + offset_rows[None, :]
+        amounts = strengths[:, None] * weights[None, :]
+        if self.wrap:
+            target_cols %= self.cols
+            target_rows %= self.rows
+        else:
+            inside = (
+                (target_cols >= 0)
+                & (target_cols < self.cols)
+                & (target_rows >= 0)
+                & (target_rows < self.rows)
+            )
+            target_cols = target_cols[inside]
+            target_rows = target_rows[inside]
+            amounts = amounts[inside]
+        np.add.at(self.values, (target_rows, target_cols), amounts)
+
+    def _kernel(self, radius: float):
+        """Cell offsets within radius and their linear falloff weights."""
+        reach_x = int(math.ceil(radius / self.cell_width))
+        reach_y = int(math.ceil(radius / self.cell_height))
+        offset_rows, offset_cols = np.mgrid[
+            -reach_y : reach_y + 1, -reach_x : reach_x + 1
+        ]
+        distance = np.hypot(
+            offset_cols * self.cell_width, offset_rows * self.cell_height
+        )
+        keep = distance <= radius
+        weights = (1 - distance[keep] / radius).astype(self.values.dtype)
+        return offset_cols[keep], offset_rows[keep], weights
+
+    def decay(self, dt: float, half_life: float) -> None:
+        """Exponential decay: after half_life seconds, half of every value is left."""
+        self.values *= self.values.dtype.type(0.5 ** (dt / half_life))
+
+    def diffuse(self, rate: float = 0.25, steps: int = 1) -> None:
+        """
+        Spread values to the four neighbouring cells.
+
+        Each step applies ``v += rate * (sum of neighbours - 4 v) / 4`` to the whole
+        array at once. Without wrap, the edges do not leak: the total is conserved.
+
+        :param rate: How much of the difference to neighbours is exchanged per step,
+            between 0 and 1.
+        :param steps: Number of steps.
+        """
+        values = self.values
+        for _ in range(steps):
+            if self.wrap:
+                neighbours = (
+                    np.roll(values, 1, axis=0)
+                    + np.roll(values, -1, axis=0)
+                    + np.roll(values, 1, axis=1)
+                    + np.roll(values, -1, axis=1)
+                )
+            else:
+                padded = np.pad(values, 1, mode="edge")
+                neighbours = (
+                    padded[:-2, 1:-1]
+                    + padded[2:, 1:-1]
+                    + padded[1:-1, :-2]
+                    + padded[1:-1, 2:]
+                )
+            values += (rate / 4) * (neighbours - 4 * values)
+
+    def sample(self, position: Position, interpolate: bool = False) -> float:
+        """The value at one position; see sample_many()."""
+        return float(self.sample_many([position.x], [position.y], interpolate)[0])
+
+    def sample_many(self, xs, ys, interpolate: bool = False) -> np.ndarray:
+        """
+        Values at many positions.
+
+        :param xs: X coordinates.
+        :param ys: Y coordinates.
+        :param interpolate: Blend the four nearest cell centres bilinearly instead of
+            reading the cell each position falls in.
+        :return: An array of values.
+        """
+        if not interpolate:
+            cols, rows = self._cells(xs, ys)
+            return self.values[rows, cols]
+        gx = (np.asarray(xs, dtype=float) - self.area.left) / self.cell_width - 0.5
+        gy = (np.asarray(ys, dtype=float) - self.area.top) / self.cell_height - 0.5
+        col0 = np.floor(gx).astype(np.int64)
+        row0 = np.floor(gy).astype(np.int64)
+        fx = gx - col0
+        fy = gy - row0
+        col1, row1 = col0 + 1, row0 + 1
+        if self.wrap:
+            col0, col1 = col0 % self.cols, col1 % self.cols
+            row0, row1 = row0 % self.rows, row1 % self.rows
+        else:
+            col0, col1 = np.clip(col0, 0, self.cols - 1), np.clip(
+                col1, 0, self.cols - 1
+            )
+            row0, row1 = np.clip(row0, 0, self.rows - 1), np.clip(
+                row1, 0, self.rows - 1
+            )
+        values = self.values
+        top = values[row0, col0] * (1 - fx) + values[row0, col1] * fx
+        bottom = values[row1, col0] * (1 - fx) + values[row1, col1] * fx
+        return top * (1 - fy) + bottom * fy
+
+    def peak(self):
+        """(centre of the highest cell, its value)."""
+        row, col = np.unravel_index(int(np.argmax(self.values)), self.values.shape)
+        return self.cell_center(int(col), int(row)), float(self.values[row, col])
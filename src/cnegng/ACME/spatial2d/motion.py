@@ -37,6 +37,15 @@ class Motion:
             y=position.y + self.speed * dt * math.sin(self.direction),
         )
 
+    def velocity(self) -> Tuple[float, float]:
+        """
+        The motion as a (vx, vy) vector, in distance per second.
+        """
+        return (
+            self.speed * math.cos(self.direction),
+            self.speed * math.sin(self.direction),
+        )
+
     def x(self, dt: DeltaTime):
         return self.speed * dt * math.cos(self.direction)
 
@@ -0,0 +1,321 @@
+import heapq
+import math
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cnegng.ACME.spatial2d.area import Area
+from cnegng.ACME.spatial2d.circle import Circle
+from cnegng.ACME.spatial2d.position import Position
+
+
+def _ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(start, start + count) for every (start, count)."""
+    first = np.cumsum(counts) - counts
+    return np.repeat(starts - first, counts) + np.arange(int(counts.sum()))
+
+
+def _box_distance_sq(x, y, min_x, min_y, max_x, max_y):
+    """Squared distance from (x, y) to boxes; 0 inside."""
+    dx = np.maximum(np.maximum(min_x - x, x - max_x), 0)
+    dy = np.maximum(np.maximum(min_y - y, y - max_y), 0)
+    return dx * dx + dy * dy
+
+
+class PackedRTree:
+    """
+    An immutable R-tree over static objects, bulk-loaded with Sort-Tile-Recursive.
+
+    Every level is stored as flat coordinate arrays: items first, then the nodes of
+    each level above, up to the single root. Node ``i`` of a level covers the
+    ``node_size`` consecutive entries ``i * node_size ...`` of the level below, so
+    no child pointers are stored. Queries walk the tree a level at a time, testing
+    the whole frontier with one array operation per level.
+
+    Objects need a ``position``; they may also be given an extent (Area or Circle)
+    which is then what queries test against.
+
+    .. code-block:: python
+
+        statics = PackedRTree(chests)
+        nearby = statics.objects_in_circle(Circle(player.position, 5_000))
+
+    Attributes
+    ----------
+    objects : list
+        The indexed objects, in tree order.
+    node_size : int
+        Maximum children per node.
+    node_visits : int
+        Nodes and items examined by the most recent query.
+    """
+
+    def __init__(
+        self,
+        objects: Iterable,
+        extents: Optional[Sequence[Area | Circle | None]] = None,
+        node_size: int = 16,
+    ):
+        """
+        :param objects: The objects to index.
+        :param extents: Optional extent per object (None for point objects).
+        :param node_size: Maximum children per node, at least 2.
+        """
+        if node_size < 2:
+            raise ValueError(f"node_size must be at least 2, got {node_size}")
+        objects = list(objects)
+        if extents is None:
+            extents = [None] * len(objects)
+        elif len(extents) != len(objects):
+            raise ValueError("extents must have one entry per object")
+        self.node_size = node_size
+        self.node_visits = 0
+
+        count = len(objects)
+        boxes = np.empty((count, 4))
+        radius = np.zeros(count)  # > 0 marks a Circle extent
+        for index, (obj, extent) in enumerate(zip(objects, extents)):
+            match extent:
+                case None:
+                    x, y = obj.position.x, obj.position.y
+                    boxes[index] = (x, y, x, y)
+                case Area():
+                    boxes[index] = (
+                        extent.left,
+                        extent.top,
+                        extent.right,
+                        extent.bottom,
+                    )
+                case Circle():
+                    c, r = extent.center, extent.radius
+                    boxes[index] = (c.x - r, c.y - r, c.x + r, c.y + r)
+                    radius[index] = r
+                case _:
+                    raise TypeError(f"Unsupported extent {extent!r}")
+
+        order = self._tile(
+            (boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2
+        )
+        self.objects = [objects[index] for index in order.tolist()]
+        self._radius = radius[order]
+        self._is_circle = self._radius > 0
+
+        # level 0 holds the items; each level above reduces node_size entries to one
+        levels = [boxes[order]]
+        while len(levels[-1]) > 1:
+            below = levels[-1]
+            starts = np.arange(0, len(below), node_size)
+            levels.append(
+                np.column_stack(
+                    [
+                        np.minimum.reduceat(below[:, 0], starts),
+                        np.minimum.reduceat(below[:, 1], starts),
+                        np.maximum.reduceat(below[:, 2], starts),
+                        np.maximum.reduceat(below[:, 3], starts),
+                    ]
+                )
+            )
+        self._level_count = [len(level) for level in levels]
+        self._level_start = np.cumsum([0] + self._level_count[:-1]).tolist()
+        flat = np.concatenate(levels) if count else np.empty((0, 4))
+        self._min_x = np.ascontiguousarray(flat[:, 0])
+        self._min_y = np.ascontiguousarray(flat[:, 1])
+        self._max_x = np.ascontiguousarray(flat[:, 2])
+        self._max_y = np.ascontiguousarray(flat[:, 3])
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __repr__(self):
+        return (
+            f"PackedRTree({len(self)} objects, node_size={self.node_size}, "
+            f"height={len(self._level_count)})"
+        )
+
+    def _tile(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Sort-Tile-Recursive order of the items.
+
+        Items are cut into vertical slices by x, each slice into runs by y, and each
+        run is tiled again, so every aligned block of node_size ** k consecutive
+        items is spatially compact; grouping consecutive entries therefore gives
+        STR nodes on every level.
+        """
+        node_size = self.node_size
+        order = np.arange(xs.size)
+        if xs.size <= node_size:
+            return order[np.lexsort((xs, ys))] if xs.size else order
+        capacity = node_size
+        while capacity * node_size < xs.size:
+            capacity *= node_size
+        result = []
+
+        def tile(indices, capacity):
+            if indices.size <= node_size:
+                result.append(indices[np.argsort(xs[indices], kind="stable")])
+                return
+            groups = math.ceil(indices.size / capacity)
+            slice_size = math.ceil(math.sqrt(groups)) * capacity
+            indices = indices[np.argsort(xs[indices], kind="stable")]
+            for start in range(0, indices.size, slice_size):
+                part = indices[start : start + slice_size]
+                part = part[np.argsort(ys[part], kind="stable")]
+                for chunk in range(0, part.size, capacity):
+                    tile(part[chunk : chunk + capacity], capacity // node_size)
+
+        tile(order, capacity)
+        return np.concatenate(result)
+
+    def _search(self, node_test, item_test) -> List:
+        """Walk the tree top-down, one vectorised test per level."""
+        if not self.objects:
+            self.node_visits = 0
+            return []
+        node_size = self.node_size
+        nodes = np.zeros(1, dtype=np.int64)
+        visits = 0
+        for level in range(len(self._level_count) - 1, 0, -1):
+            visits += nodes.size
+            nodes = nodes[node_test(nodes + self._level_start[level])]
+            starts = nodes * node_size
+            counts = np.minimum(node_size, self._level_count[level - 1] - starts)
+            nodes = _ranges(starts, counts)
+        visits += nodes.size
+        self.node_visits = visits
+        hits = nodes[item_test(nodes)]
+        objects = self.objects
+        return [objects[index] for index in hits.tolist()]
+
+    def objects_in_area(self, area: Area) -> List:
+        """Objects inside the area (points), or overlapping it (extents)."""
+
+        def overlaps(entries):
+            return (
+                (self._min_x[entries] <= area.right)
+                & (self._max_x[entries] >= area.left)
+                & (self._min_y[entries] <= area.bottom)
+                & (self._max_y[entries] >= area.top)
+            )
+
+        def items(entries):
+            hit = overlaps(entries)
+            circles = hit & self._is_circle[entries]
+            if circles.any():
+                # the box test is exact except for Circle extents
+                picked = entries[circles]
+                cx = (self._min_x[picked] + self._max_x[picked]) / 2
+                cy = (self._min_y[picked] + self._max_y[picked]) / 2
+                distance_sq = _box_distance_sq(
+                    cx, cy, area.left, area.top, area.right, area.bottom
+                )
+                hit[circles] = distance_sq <= self._radius[picked] ** 2
+            return hit
+
+        return self._search(overlaps, items)
+
+    def objects_in_circle(self, circle: Circle) -> List:
+        """Objects inside the circle (points), or overlapping it (extents)."""
+        x, y, radius = circle.center.x, circle.center.y, circle.radius
+
+        def near(entries):
+            return (
+                _box_distance_sq(
+                    x,
+                    y,
+                    self._min_x[entries],
+                    self._min_y[entries],
+                    self._max_x[entries],
+                    self._max_y[entries],
+                )
+                <= radius * radius
+            )
+
+        def items(entries):
+            hit = near(entries)
+            circles = hit & self._is_circle[entries]
+            if circles.any():
+                picked = entries[circles]
+                cx = (self._min_x[picked] + self._max_x[picked]) / 2
+                cy = (self._min_y[picked] + self._max_y[picked]) / 2
+                reach = radius + self._radius[picked]
+                hit[circles] = (cx - x) ** 2 + (cy - y) ** 2 <= reach * reach
+            return hit
+
+        return self._search(near, items)
+
+    def _item_distance(self, x, y, entries):
+        distance = np.sqrt(
+            _box_distance_sq(
+                x,
+                y,
+                self._min_x[entries],
+                self._min_y[entries],
+                self._max_x[entries],
+                self._max_y[entries],
+            )
+        )
+        circles = self._is_circle[entries]
+        if circles.any():
+            picked = entries[circles]
+            cx = (self._min_x[picked] + self._max_x[picked]) / 2
+            cy = (self._min_y[picked] + self._max_y[picked]) / 2
+            distance[circles] = np.maximum(
+                np.hypot(cx - x, cy - y) - self._radius[picked], 0
+            )
+        return distance
+
+    def nearest(
+        self, position: Position, count: int = 1, max_distance: float = math.inf
+    ) -> List[Tuple[object, float]]:
+        """
+        The objects closest to position, best-first.
+
+        Distances are to the object's position, or to the edge of its extent (0
+        inside it).
+
+        :param position: Where to search from.
+        :param count: How many objects to return at most.
+        :param max_distance: Ignore objects further away than this.
+        :return: A list of (object, distance), closest first.
+        """
+        found = []
+        if not self.objects:
+            return found
+        x, y = position.x, position.y
+        node_size = self.node_size
+        top = len(self._level_count) - 1
+        heap = [(0.0, top, 0)]
+        visits = 0
+        while heap and len(found) < count:
+            distance, level, index = heapq.heappop(heap)
+            if distance > max_distance:
+                break
+            if level < 0:
+                found.append((self.objects[index], distance))
+                continue
+            visits += 1
+            if level == 0:
+                # an item: queue it again with its exact distance
+                exact = float(self._item_distance(x, y, np.array([index]))[0])
+                heapq.heappush(heap, (exact, -1, index))
+                continue
+            start = index * node_size
+            children = np.arange(
+                start, min(start + node_size, self._level_count[level - 1])
+            )
+            entries = children + self._level_start[level - 1]
+            distances = np.sqrt(
+                _box_distance_sq(
+                    x,
+                    y,
+                    self._min_x[entries],
+                    self._min_y[entries],
+                    self._max_x[entries],
+                    self._max_y[entries],
+                )
+            )
+            for child, child_distance in zip(children.tolist(), distances.tolist()):
+                if child_distance <= max_distance:
+                    heapq.heappush(heap, (child_distance, level - 1, child))
+        self.node_visits = visits
+        return found
@@ -0,0 +1,114 @@
+from typing import Callable, List, Optional, Tuple
+
+from cnegng.ACME.spatial2d.area import Area
+from cnegng.ACME.spatial2d.position import Position
+
+
+def texture_size(obj) -> Tuple[float, float]:
+    """On-screen (width, height) of an object drawn with a pygame Surface ``texture``."""
+    return obj.texture.get_size()
+
+
+class Picker:
+    """
+    Finds the objects drawn under a screen point.
+
+    Objects are drawn the way TinyShapesBase.render() does it: the world position
+    is mapped to the screen with Area.scale_by and the texture's top-left corner
+    is placed there. Picking inverts that mapping, asks the grid only for objects
+    whose position falls in the small world rectangle that a texture placed there
+    could reach the cursor from, and then tests each candidate's own texture
+    rectangle in screen space. Only a few cells are visited, whatever the number
+    of objects.
+
+    .. code-block:: python
+
+        picker = Picker(grid, world, screen, max_size=(24, 24), draw_order=rank.get)
+        sprite = picker.pick(Position(*event.pos))
+
+    Attributes
+    ----------
+    to_screen : Callable[[Position], Position]
+        World to screen mapping, ``world.scale_by(screen)``.
+    to_world : Callable[[Position], Position]
+        Its inverse, ``screen.scale_by(world)``.
+    """
+
+    def __init__(
+        self,
+        grid,
+        world: Area,
+        screen: Area,
+        max_size: Tuple[float, float],
+        size_of: Callable = texture_size,
+        draw_order: Optional[Callable] = None,
+        layer="default",
+    ):
+        """
+        :param grid: The grid holding the drawn objects.
+        :param world: The world area that is shown on screen.
+        :param screen: Where on screen the world is drawn.
+        :param max_size: Largest (width, height) of any texture, in screen pixels.
+        :param size_of: Gives an object's on-screen (width, height).
+        :param draw_order: Gives a sort key per object; larger keys are drawn later,
+            on top. Without it the objects are taken in the order the grid finds them.
+        :param layer: The grid layer to pick from.
+        """
+        self.grid = grid
+        self.world = world.clone()
+        self.screen = screen.clone()
+        self.max_size = max_size
+        self.size_of = size_of
+        self.draw_order = draw_order
+        self.layer = layer
+        self.to_screen = self.world.scale_by(self.screen)
+        self.to_world = self.screen.scale_by(self.world)
+        # world distance covered by one screen pixel
+        self._world_per_pixel_x = self.world.width / self.screen.width
+        self._world_per_pixel_y = self.world.height / self.screen.height
+
+    def __repr__(self):
+        return f"Picker(world={self.world}, screen={self.screen})"
+
+    def screen_to_world(self, point: Position) -> Position:
+        """The world position drawn at a screen point."""
+        return self.to_world(point)
+
+    def pick_all(self, point: Position) -> List:
+        """
+        Every object whose texture covers the screen point, bottom to top.
+
+        :param point: A screen position, such as a mouse event's ``pos``.
+        """
+        world_point = self.to_world(point)
+        max_width, max_height = self.max_size
+        # a texture drawn from position p covers [p, p + size] on screen, so only
+        # positions up to max_size to the left and above the cursor can reach it
+        search = Area(
+            top=world_point.y - max_height * self._world_per_pixel_y,
+            left=world_point.x - max_width * self._world_per_pixel_x,
+            bottom=world_point.y,
+            right=world_point.x,
+        )
+        hits = []
+        for obj in self.grid.objects_in_area(search, self.layer):
+            corner = self.to_screen(obj.position)
+            width, height = self.size_of(obj)
+            if (
+                corner.x <= point.x < corner.x + width
+                and corner.y <= point.y < corner.y + height
+            ):
+                hits.append(obj)
+        if self.draw_order is not None:
+            hits.sort(key=self.draw_order)
+        return hits
+
+    def pick(self, point: Position):
+        """
+        The topmost object under the screen point.
+
+        :param point: A screen position, such as a mouse event's ``pos``.
+        :return: The object, or None if nothing is drawn there.
+        """
+        hits = self.pick_all(point)
+        return hits[-1] if hits else None
@@ -0,0 +1,231 @@
+import math
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from cnegng.ACME.spatial2d.area import Area
+
+
+class PoissonDiskSampler:
+    """
+    Well spaced random points over an Area (Bridson's algorithm, in batches).
+
+    Points keep at least ``radius`` between them, so they cover the area evenly
+    without the clumps of independent uniform picks. A background lattice with
+    cells of ``radius / sqrt(2)`` holds at most one point per cell, which makes the
+    spacing test a look at the few cells around a candidate.
+
+    Bridson grows points out from an active list, trying ``tries`` candidates in
+    the ring between r and 2r around an active point and retiring the point once
+    none fits. Here every active point is expanded at once: all candidates are
+    tested against the lattice with array operations, and candidates that clash
+    with each other are thinned by keeping the earlier one. The area is seeded with
+    a scatter of uniform darts first, so the fronts only have to travel a short
+    way.
+
+    The spacing may vary over the area: ``spacing(xs, ys)`` gives the radius
+    wanted at each point, between ``radius`` and ``max_radius``; two points then
+    keep the larger of their two radii apart.
+
+    .. code-block:: python
+
+        sampler = PoissonDiskSampler(world, radius=4_000, seed=7)
+        xs, ys = sampler.sample()
+
+    Attributes
+    ----------
+    cell_size : float
+        Side of the background lattice cells.
+    """
+
+    def __init__(
+        self,
+        area: Area,
+        radius: float,
+        spacing: Optional[Callable] = None,
+        max_radius: Optional[float] = None,
+        tries: int = 30,
+        seed=None,
+    ):
+        """
+        :param area: Where to place points.
+        :param radius: The minimum distance between points.
+        :param spacing: Optional callable giving the radius at many (xs, ys) at once.
+        :param max_radius: Largest radius spacing() returns; required with spacing.
+        :param tries: Candidates tried around each active point (Bridson's k).
+        :param seed: Seed or numpy Generator for reproducible samples.
+        """
+        if radius <= 0:
+            raise ValueError(f"radius must be positive, got {radius}")
+        if spacing is not None and max_radius is None:
+            raise ValueError("max_radius is required with a spacing function")
+        self.area = area.clone()
+        self.radius = radius
+        self.spacing = spacing
+        self.max_radius = radius if spacing is None else max(radius, max_radius)
+        self.tries = tries
+        self.rng = np.random.default_rng(seed)
+        self.cell_size = radius / math.sqrt(2)
+        self.cols = max(1, math.ceil(area.width / self.cell_size))
+        self.rows = max(1, math.ceil(area.height / self.cell_size))
+        # lattice offsets whose cells can hold a point closer than max_radius
+        reach = math.ceil(self.max_radius / self.cell_size)
+        gaps = {
+            (d_col, d_row): max(abs(d_col) - 1, 0) ** 2 + max(abs(d_row) - 1, 0) ** 2
+            for d_row in range(-reach, reach + 1)
+            for d_col in range(-reach, reach + 1)
+        }
+        limit = (self.max_radius / self.cell_size) ** 2
+        offsets = sorted(
+            (offset for offset, gap in gaps.items() if gap < limit),
+            key=lambda offset: offset[0] ** 2 + offset[1] ** 2,
+        )
+        # the lattice arrays get an empty border of reach cells, so neighbours
+        # are a fixed step away in the flat array and need no bounds checks
+        self._pad = reach
+        self._stride = self.cols + 2 * reach
+        self._steps = [d_row * self._stride + d_col for d_col, d_row in offsets]
+
+    def __repr__(self):
+        return f"PoissonDiskSampler(area={self.area}, radius={self.radius})"
+
+    @staticmethod
+    def radius_for(area: Area, count: int) -> float:
+        """
+        A radius at which a full sample of the area holds at least about count points.
+
+        A filled sample has close to 0.62 points per radius squared.
+        """
+        return math.sqrt(0.6 * area.width * area.height / count)
+
+    def _radii(self, xs, ys):
+        if self.spacing is None:
+            return np.full(xs.shape, float(self.radius))
+        radii = np.asarray(self.spacing(xs, ys), dtype=float)
+        return np.clip(radii, self.radius, self.max_radius)
+
+    def _cells(self, xs, ys):
+        """Flat index of each point's cell in the padded lattice arrays."""
+        col = ((xs - self.area.left) / self.cell_size).astype(np.int64)
+        row = ((ys - self.area.top) / self.cell_size).astype(np.int64)
+        np.clip(col, 0, self.cols - 1, out=col)
+        np.clip(row, 0, self.rows - 1, out=row)
+        return (row + self._pad) * self._stride + (col + self._pad)
+
+    def _clashes(self, xs, ys, radii, cells, owner, px, py, pr, before=None):
+        """
+        Which candidates come too close to a point in the owner lattice.
+
+        Offsets are visited nearest first and candidates already known to clash
+        are dropped as we go, since most clash in the first few cells.
+
+        :param before: Only count points with an index below this, per candidate.
+        """
+        clash = np.zeros(xs.size, dtype=bool)
+        left = np.arange(xs.size)
+        for step in self._steps:
+            other = owner[cells + step]
+            present = other >= 0
+            if before is not None:
+                present &= other < before
+            other = np.where(present, other, 0)
+            dx = px[other] - xs
+            dy = py[other] - ys
+            reach = np.maximum(pr[other], radii)
+            hit = present & (dx * dx + dy * dy < reach * reach)
+            if hit.any():
+                clash[left[hit]] = True
+                keep = ~hit
+                left = left[keep]
+                xs, ys, radii, cells = xs[keep], ys[keep], radii[keep], cells[keep]
+                if before is not None:
+                    before = before[keep]
+        return clash
+
+    def _thin(self, xs, ys, radii, cells, scratch):
+        """Keep candidates that clash with no earlier candidate of the same batch."""
+        # two candidates in one cell always clash; keep the first of each cell
+        _, first = np.unique(cells, return_index=True)
+        first.sort()
+        xs, ys, radii, cells = xs[first], ys[first], radii[first], cells[first]
+        order = np.arange(first.size)
+        scratch[cells] = order
+        clash = self._clashes(xs, ys, radii, cells, scratch, xs, ys, radii, order)
+        scratch[cells] = -1
+        return first[~clash]
+
+    def sample(self, count: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fill the area with points.
+
+        :param count: If given, return this many of the points (or all of them if
+            the area holds fewer), picked at random so they still span the area.
+        :return: (xs, ys) arrays.
+        """
+        area, rng = self.area, self.rng
+        size = self.cols * self.rows
+        padded = self._stride * (self.rows + 2 * self._pad)
+        owner = np.full(padded, -1, dtype=np.int64)
+        scratch = np.full(padded, -1, dtype=np.int64)
+        px = np.empty(size)
+        py = np.empty(size)
+        pr = np.empty(size)
+        total = 0
+
+        def accept(xs, ys, radii, cells):
+            nonlocal total
+            added = np.arange(total, total + xs.size)
+            px[added], py[added], pr[added] = xs, ys, radii
+            owner[cells] = added
+            total += xs.size
+            return added
+
+        # seed with uniform darts, about one per 64 cells, thinned like any batch
+        darts = max(1, size // 64)
+        xs = area.left + rng.random(darts) * area.width
+        ys = area.top + rng.random(darts) * area.height
+        radii = self._radii(xs, ys)
+        cells = self._cells(xs, ys)
+        keep = self._thin(xs, ys, radii, cells, scratch)
+        active = accept(xs[keep], ys[keep], radii[keep], cells[keep])
+
+        # tries are spread over rounds: a few per round, and a point retires once
+        # it has used them all without placing anything
+        per_round = min(self.tries, 6)
+        failures = np.zeros(size, dtype=np.int64)
+        while active.size:
+            parents = np.repeat(active, per_round)
+            angle = rng.random(parents.size) * (2 * math.pi)
+            distance = pr[parents] * (1 + rng.random(parents.size))
+            xs = px[parents] + distance * np.cos(angle)
+            ys = py[parents] + distance * np.sin(angle)
+            inside = (
+                (xs >= area.left)
+                & (xs < area.right)
+                & (ys >= area.top)
+                & (ys < area.bottom)
+            )
+            parents, xs, ys = parents[inside], xs[inside], ys[inside]
+            cells = self._cells(xs, ys)
+            # a candidate in an occupied cell always clashes
+            free = owner[cells] < 0
+            parents, xs, ys, cells = parents[free], xs[free], ys[free], cells[free]
+            radii = self._radii(xs, ys)
+            fits = ~self._clashes(xs, ys, radii, cells, owner, px, py, pr)
+            parents, xs, ys = parents[fits], xs[fits], ys[fits]
+            radii, cells = radii[fits], cells[fits]
+            keep = self._thin(xs, ys, radii, cells, scratch)
+            added = accept(xs[keep], ys[keep], radii[keep], cells[keep])
+
+            placed = np.zeros(size, dtype=bool)
+            placed[parents[keep]] = True
+            idle = active[~placed[active]]
+            failures[idle] += per_round
+            alive = active[placed[active] | (failures[active] < self.tries)]
+            active = np.concatenate([alive, added])
+
+        xs, ys = px[:total].copy(), py[:total].copy()
+        if count is not None and count < total:
+            picked = rng.choice(total, size=count, replace=False)
+            xs, ys = xs[picked], ys[picked]
+        return xs, ys
@@ -0,0 +1,114 @@
+from typing import Sequence
+
+import numpy as np
+
+from cnegng.ACME.spatial2d.area import Area
+from cnegng.ACME.spatial2d.position import Position
+
+
+class Polygon:
+    """
+    A simple polygon (convex or concave) for zone checks.
+
+    The edge table is built once: per edge its start point, end point and the
+    x-per-y slope used by the crossing-number test, all as NumPy arrays so a whole
+    batch of points is tested edge by edge rather than point by point.
+
+    :param points: The corners in order (either winding); the last connects to the first.
+    """
+
+    def __init__(self, points: Sequence[Position]):
+        if len(points) < 3:
+            raise ValueError(f"A Polygon needs at least 3 points, got {len(points)}")
+        self.points = [Position(point.x, point.y) for point in points]
+        self._x0 = np.array([point.x for point in points], dtype=float)
+        self._y0 = np.array([point.y for point in points], dtype=float)
+        self._x1 = np.roll(self._x0, -1)
+        self._y1 = np.roll(self._y0, -1)
+        dy = self._y1 - self._y0
+        # horizontal edges never straddle a scanline, their slope is never used
+        self._x_per_y = np.divide(
+            self._x1 - self._x0, dy, out=np.zeros_like(dy), where=dy != 0
+        )
+        # plain lists are faster than arrays for the single point test
+        self._edges = list(
+            zip(
+                self._x0.tolist(),
+                self._y0.tolist(),
+                self._y1.tolist(),
+                self._x_per_y.tolist(),
+            )
+        )
+        self.bounds = Area(
+            top=float(self._y0.min()),
+            left=float(self._x0.min()),
+            bottom=float(self._y0.max()),
+            right=float(self._x0.max()),
+        )
+
+    def __repr__(self):
+        return f"Polygon({len(self.points)} points, bounds={self.bounds})"
+
+    def __len__(self):
+        return len(self.points)
+
+    def edges(self):
+        """Yield each edge as a (start, end) pair of Positions."""
+        for index, start in enumerate(self.points):
+            yield start, self.points[(index + 1) % len(self.points)]
+
+    def contains_position(self, position: Position) -> bool:
+        """
+        Checks if the position is inside the polygon (crossing-number rule).
+
+        :param position: The position to check.
+        :return: True if the position is inside.
+        """
+        x, y = position.x, position.y
+        bounds = self.bounds
+        if not (bounds.left <= x <= bounds.right and bounds.top <= y <= bounds.bottom):
+            return False
+        inside = False
+        for x0, y0, y1, x_per_y in self._edges:
+            if (y0 > y) != (y1 > y) and x < x0 + (y - y0) * x_per_y:
+                inside = not inside
+        return inside
+
+    def contains_points(self, xs, ys) -> np.ndarray:
+        """
+        Batched point-in-polygon test.
+
+        Points outside the bounding box are rejected up front; the rest are tested
+        against all edges at once, one edge per vectorised step.
+
+        :param xs: Array-like of x coordinates.
+        :param ys: Array-like of y coordinates, same length.
+        :return: A boolean array, True where the point is inside.
+        """
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        bounds = self.bounds
+        result = (
+            (xs >= bounds.left)
+            & (xs <= bounds.right)
+            & (ys >= bounds.top)
+            & (ys <= bounds.bottom)
+        )
+        candidates = np.flatnonzero(result)
+        if candidates.size == 0:
+            return result
+        cx = xs[candidates]
+        cy = ys[candidates]
+        inside = np.zeros(candidates.size, dtype=bool)
+        for x0, y0, y1, x_per_y in self._edges:
+            straddles = (y0 > cy) != (y1 > cy)
+            inside ^= straddles & (cx < x0 + (cy - y0) * x_per_y)
+        result[candidates] = inside
+        return result
+
+    def contains_positions(self, positions: Sequence[Position]) -> np.ndarray:
+        """contains_points() for a sequence of Positions."""
+        count = len(positions)
+        xs = np.fromiter((position.x for position in positions), float, count)
+        ys = np.fromiter((position.y for position in positions), float, count)
+        return self.contains_points(xs, ys)
@@ -0,0 +1,72 @@
+import math
+from typing import Optional
+
+import numpy as np
+
+from cnegng.ACME.spatial2d.circle import Circle
+from cnegng.ACME.spatial2d.motion import Motion
+from cnegng.ACME.spatial2d.position import Position
+
+
+def velocity_of(obj):
+    """(vx, vy) of an object's ``motion``; objects without one are stationary."""
+    motion = getattr(obj, "motion", None)
+    return (0.0, 0.0) if motion is None else motion.velocity()
+
+
+def times_to_within(dx, dy, dvx, dvy, reach) -> np.ndarray:
+    """
+    Earliest times at which relative offsets come within reach, for many pairs.
+
+    Solves ``|d + dv * t| = reach`` for the smallest t >= 0 under linear motion.
+
+    :param dx: Relative x offsets (other minus self).
+    :param dy: Relative y offsets.
+    :param dvx: Relative x velocities.
+    :param dvy: Relative y velocities.
+    :param reach: Distance to get within, per pair or shared.
+    :return: Times; 0 for pairs already within reach, inf for pairs that never get there.
+    """
+    dx = np.asarray(dx, dtype=float)
+    dy = np.asarray(dy, dtype=float)
+    dvx = np.asarray(dvx, dtype=float)
+    dvy = np.asarray(dvy, dtype=float)
+    reach = np.asarray(reach, dtype=float)
+    a = dvx * dvx + dvy * dvy
+    b = dx * dvx + dy * dvy  # half of the linear coefficient
+    c = dx * dx + dy * dy - reach * reach
+    discriminant = b * b - a * c
+    approaching = (a > 0) & (b < 0) & (discriminant >= 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        entry = (-b - np.sqrt(np.maximum(discriminant, 0))) / a
+    times = np.where(approaching, entry, math.inf)
+    return np.where(c <= 0, 0.0, times)
+
+
+def time_to_within(
+    a: Position,
+    motion_a: Optional[Motion],
+    b: Position,
+    motion_b: Optional[Motion],
+    reach: float,
+) -> float:
+    """
+    Time until two moving points come within reach of each other.
+
+    :param a: Position of the first point.
+    :param motion_a: Its Motion, or None if it stands still.
+    :param b: Position of the second point.
+    :param motion_b: Its Motion, or None if it stands still.
+    :param reach: The distance to get within.
+    :return: Seconds from now; 0 if already within reach, inf if it never happens.
+    """
+    vax, vay = (0.0, 0.0) if motion_a is None else motion_a.velocity()
+    vbx, vby = (0.0, 0.0) if motion_b is None else motion_b.velocity()
+    return float(times_to_within(b.x - a.x, b.y - a.y, vbx - vax, vby - vay, reach))
+
+
+def time_to_enter(
+    position: Position, motion: Optional[Motion], circle: Circle
+) -> float:
+    """Time until a moving point enters a fixed circle; see time_to_within()."""
+    return time_to_within(circle.center, None, position, motion, circle.radius)
@@ -0,0 +1,266 @@
+import math
+from typing import Hashable, Iterable, List, Optional
+
+import numpy as np
+
+from cnegng.ACME.spatial2d.area import Area
+from cnegng.ACME.spatial2d.position import Position
+
+
+class VisibilityMap:
+    """
+    Fog of war: which cells of a coarse grid each team can currently see.
+
+    Every observer sees the cells whose centres lie within its sight radius of its
+    own cell's centre. With an ``opaque`` array, a cell is hidden when the line to
+    it passes through an opaque cell; opaque cells themselves can be seen, like a
+    wall you look at.
+
+    Each team keeps a count per cell of the observers that see it, and a bitset
+    packed eight cells to a byte (``bits[team, row, col // 8]``) answering "is this
+    cell visible" for render and AI filtering. Observers remember the cells they
+    stamped, so moving one only takes its old cells off, puts its new ones on and
+    repacks the rows they touch. An observer that stays inside its cell costs
+    nothing at all.
+
+    .. code-block:: python
+
+        fog = VisibilityMap.for_grid(grid, teams=4)
+        fog.add_observer(player, player.team, player.position, radius=40_000)
+        fog.move_many(movers, xs, ys)
+        shown = fog.filter(my_team, grid.objects_in_area(camera))
+
+    Attributes
+    ----------
+    area : Area
+        The world the map covers.
+    counts : numpy.ndarray
+        Observers seeing each cell, shape (teams, rows, cols).
+    bits : numpy.ndarray
+        The visible cells as packed bits, shape (teams, rows, ceil(cols / 8)).
+    opaque : numpy.ndarray or None
+        Cells that block sight, shape (rows, cols).
+    """
+
+    def __init__(
+        self,
+        area: Area,
+        cols: int,
+        rows: int,
+        teams: int = 1,
+        opaque: Optional[np.ndarray] = None,
+    ):
+        """
+        :param area: The world the map covers.
+        :param cols: Number of cells across.
+        :param rows: Number of cells down.
+        :param teams: Number of teams, numbered from 0.
+        :param opaque: Optional bool array (rows, cols) of cells that block sight.
+        """
+        if teams < 1:
+            raise ValueError(f"teams must be at least 1, got {teams}")
+        self.area = area.clone()
+        self.cols = cols
+        self.rows = rows
+        self.teams = teams
+        self.cell_width = area.width / cols
+        self.cell_height = area.height / rows
+        self.counts = np.zeros((teams, rows, cols), dtype=np.uint16)
+        self.bits = np.zeros((teams, rows, -(-cols // 8)), dtype=np.uint8)
+        self.opaque = None
+        self._observers = {}
+        self._kernels = {}
+        if opaque is not None:
+            self.set_opaque(opaque)
+
+    @classmethod
+    def for_grid(cls, grid, **kwargs) -> "VisibilityMap":
+        """A VisibilityMap with the same area and resolution as a Grid."""
+        return cls(grid.area, grid.grid_size.width, grid.grid_size.height, **kwargs)
+
+    def __repr__(self):
+        return (
+            f"VisibilityMap({self.cols}x{self.rows}, teams={self.teams}, "
+            f"observers={len(self._observers)})"
+        )
+
+    def __len__(self):
+        return len(self._observers)
+
+    def _cells(self, xs, ys):
+        cols = np.floor(
+            (np.asarray(xs, dtype=float) - self.area.left) / self.cell_width
+        )
+        rows = np.floor(
+            (np.asarray(ys, dtype=float) - self.area.top) / self.cell_height
+        )
+        cols = np.clip(cols.astype(np.int64), 0, self.cols - 1)
+        rows = np.clip(rows.astype(np.int64), 0, self.rows - 1)
+        return cols, rows
+
+    def _kernel(self, radius):
+        """
+        Cell offsets within radius, and for each the offsets of the cells on the
+        line to it, padded with (0, 0) where the line is shorter.
+        """
+        try:
+            return self._kernels[radius]
+        except KeyError:
+            pass
+        reach_x = int(math.ceil(radius / self.cell_width))
+        reach_y = int(math.ceil(radius / self.cell_height))
+        offset_rows, offset_cols = np.mgrid[
+            -reach_y : reach_y + 1, -reach_x : reach_x + 1
+        ]
+        distance = np.hypot(
+            offset_cols * self.cell_width, offset_rows * self.cell_height
+        )
+        keep = distance <= radius
+        offset_rows = offset_rows[keep]
+        offset_cols = offset_cols[keep]
+        steps = np.maximum(np.abs(offset_rows), np.abs(offset_cols))
+        longest = max(int(steps.max()) - 1, 0)
+        # the k-th cell between the observer and the target, k = 1 .. steps - 1
+        k = np.arange(1, longest + 1)
+        fraction = k[None, :] / np.maximum(steps, 1)[:, None]
+        between = k[None, :] < steps[:, None]
+        line_rows = np.where(between, np.rint(offset_rows[:, None] * fraction), 0)
+        line_cols = np.where(between, np.rint(offset_cols[:, None] * fraction), 0)
+        kernel = (
+            offset_rows,
+            offset_cols,
+            line_rows.astype(np.int64),
+            line_cols.astype(np.int64),
+            between,
+        )
+        self._kernels[radius] = kernel
+        return kernel
+
+    def _sight(self, col, row, radius):
+        """Flat indices of the cells seen from a cell."""
+        offset_rows, offset_cols, line_rows, line_cols, between = self._kernel(radius)
+        rows = row + offset_rows
+        cols = col + offset_cols
+        inside = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+        if self.opaque is not None:
+            along_rows = np.clip(row + line_rows, 0, self.rows - 1)
+            along_cols = np.clip(col + line_cols, 0, self.cols - 1)
+            blocked = (self.opaque[along_rows, along_cols] & between).any(axis=1)
+            inside &= ~blocked
+        return rows[inside] * self.cols + cols[inside]
+
+    def _restamp(self, team, removed, added):
+        """Take some flat cells off a team's counts, put others on, repack their rows."""
+        counts = self.counts[team].reshape(-1)
+        if removed:
+            np.subtract.at(counts, np.concatenate(removed), 1)
+        if added:
+            np.add.at(counts, np.concatenate(added), 1)
+        touched = np.unique(np.concatenate(removed + added) // self.cols)
+        self.bits[team, touched] = np.packbits(self.counts[team, touched] > 0, axis=-1)
+
+    def add_observer(
+        self, key: Hashable, team: int, position: Position, radius: float
+    ) -> None:
+        """
+        Start tracking what an observer sees.
+
+        :param key: Anything hashable naming the observer, e.g. the player object.
+        :param team: The team it sees for.
+        :param position: Where it stands.
+        :param radius: How far it sees, in world units.
+        """
+        if key in self._observers:
+            raise ValueError(f"{key!r} is already an observer")
+        if not 0 <= team < self.teams:
+            raise ValueError(f"team must be between 0 and {self.teams - 1}, got {team}")
+        cols, rows = self._cells(position.x, position.y)
+        col, row = int(cols), int(rows)
+        seen = self._sight(col, row, radius)
+        self._observers[key] = [team, col, row, radius, seen]
+        self._restamp(team, [], [seen])
+
+    def remove_observer(self, key: Hashable) -> None:
+        team, _, _, _, seen = self._observers.pop(key)
+        self._restamp(team, [seen], [])
+
+    def move_observer(self, key: Hashable, position: Position) -> bool:
+        """Move one observer; see move_many()."""
+        return self.move_many([key], [position.x], [position.y]) > 0
+
+    def move_many(self, keys: Iterable[Hashable], xs, ys) -> int:
+        """
+        Move many observers at once.
+
+        Only observers that left their cell are restamped, all of a team's in one
+        go.
+
+        :param keys: The observers.
+        :param xs: Their new x coordinates.
+        :param ys: Their new y coordinates.
+        :return: The number of observers restamped.
+        """
+        keys = list(keys)
+        if not keys:
+            return 0
+        cols, rows = self._cells(xs, ys)
+        removed = [[] for _ in range(self.teams)]
+        added = [[] for _ in range(self.teams)]
+        restamped = 0
+        for key, col, row in zip(keys, cols.tolist(), rows.tolist()):
+            observer = self._observers[key]
+            team, old_col, old_row, radius, seen = observer
+            if col == old_col and row == old_row:
+                continue
+            fresh = self._sight(col, row, radius)
+            removed[team].append(seen)
+            added[team].append(fresh)
+            observer[1:] = [col, row, radius, fresh]
+            restamped += 1
+        for team in range(self.teams):
+            if added[team]:
+                self._restamp(team, removed[team], added[team])
+        return restamped
+
+    def set_opaque(self, opaque: Optional[np.ndarray]) -> None:
+        """Change which cells block sight and restamp every observer."""
+        if opaque is not None:
+            opaque = np.asarray(opaque, dtype=bool)
+            if opaque.shape != (self.rows, self.cols):
+                raise ValueError(
+                    f"opaque must have shape {(self.rows, self.cols)}, got {opaque.shape}"
+                )
+        self.opaque = opaque
+        self.counts.fill(0)
+        for observer in self._observers.values():
+            team, col, row, radius, _ = observer
+            observer[4] = self._sight(col, row, radius)
+            np.add.at(self.counts[team].reshape(-1), observer[4], 1)
+        self.bits = np.packbits(self.counts > 0, axis=-1)
+
+    def visible_many(self, team: int, xs, ys) -> np.ndarray:
+        """
+        Whether a team can see each of many positions.
+
+        :return: A bool array.
+        """
+        cols, rows = self._cells(xs, ys)
+        byte = self.bits[team, rows, cols >> 3]
+        return ((byte >> (7 - (cols & 7))) & 1).astype(bool)
+
+    def visible(self, team: int, position: Position) -> bool:
+        return bool(self.visible_many(team, [position.x], [position.y])[0])
+
+    def filter(self, team: int, objects: Iterable) -> List:
+        """The objects, with a ``position``, that a team can see."""
+        objects = list(objects)
+        if not objects:
+            return []
+        xs = [obj.position.x for obj in objects]
+        ys = [obj.position.y for obj in objects]
+        shown = self.visible_many(team, xs, ys)
+        return [obj for obj, keep in zip(objects, shown.tolist()) if keep]
+
+    def seen(self, team: int) -> np.ndarray:
+        """The visible cells of a team as a bool array (rows, cols)."""
+        return np.unpackbits(self.bits[team], axis=-1, count=self.cols).astype(bool)
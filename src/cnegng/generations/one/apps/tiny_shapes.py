@@ -17,7 +17,6 @@ SHAPE_SIZE = 24  # Size of each sprite
 NUM_SPRITES = 20_000  # Total number of sprites to render
 NUM_TEXTURES = 10_000  # Number of pre-generated textures
 GRAVITY_FORCE = 5000
-GRID_CELLS = 20
 
 
 class TinyShape(TinyShapesBase):
@@ -33,7 +32,12 @@ class TinyShape(TinyShapesBase):
             position=Position(0, 0),
             dimensions=Dimensions(self.COORDINATE_SPACE, self.COORDINATE_SPACE),
         )
-        self.grid = Grid(self.area, grid_size=GridSize(GRID_CELLS, GRID_CELLS))
+        # sprites wrap around the edges of the world, so the grid does too
+        self.grid = Grid(
+            self.area,
+            grid_size=GridSize(self.GRID_CELLS, self.GRID_CELLS),
+            wrap=True,
+        )
         self.selected_textures = {}
         self.selected_objects = set()  # The Annulus
         self.every_few = GridIterator(grid=self.grid, mod_number=2)
@@ -46,6 +50,8 @@ class TinyShape(TinyShapesBase):
             center=Position(self.COORDINATE_SPACE / 2, self.COORDINATE_SPACE / 2),
             radius=100_000,
         )
+        # The rectangular scrolling region
+        self.special_area = Area(100_000, 100_000, 400_000, 400_000)
 
         super().setup_basic_helpers()
 
@@ -120,8 +126,9 @@ class TinyShape(TinyShapesBase):
         self.current_direction.lerp(self.target_direction, dt)
         global_motion_updater = self.current_direction.updater(dt)
         special_motion_updater = self.special_direction.updater(dt)
-        special_area = Area(100_000, 100_000, 400_000, 400_000)
-        # The rectangular scrolling region
+        special_area = self.special_area
+        # every sprite moves in place each frame, so a cached result would never
+        # be reused here
         for sprite in list(self.grid.objects_in_area(special_area)):
             sprite.position = special_motion_updater(sprite.position)
             sprite.position = special_area.wrap_within(sprite.position)
@@ -1,13 +1,16 @@
 import random
 
+import pygame
+
 from cnegng.ACME.spatial2d.grid.grid_iterator import GridIterator
-from cnegng.ACME.spatial2d.grid import GridSize
+from cnegng.ACME.spatial2d.grid import GridSize, GridTuner
 from cnegng.ACME.spatial2d import Grid
 from cnegng.ACME.spatial2d import Area
 from cnegng.ACME.spatial2d import Circle
 from cnegng.ACME.spatial2d import Dimensions
 from cnegng.ACME.spatial2d import Position
 from cnegng.ACME.spatial2d import Motion
+from cnegng.ACME.spatial2d import Picker
 from cnegng.ACME import GameHandler
 from cnegng.generations.one.palette import vibrant, without_red
 from cnegng.generations.one import ShapeTexture
@@ -21,10 +24,15 @@ SHAPE_SIZE = 24  # Size of each sprite
 NUM_SPRITES = 20_000  # Total number of sprites to render
 NUM_TEXTURES = 10_000  # Number of pre-generated textures
 GRAVITY_FORCE = 5000
-GRID_CELLS = 20
+GRID_CELLS = 20  # starting resolution, GridTuner adjusts it while running
+GRID_TUNING_INTERVAL = 5.0  # seconds between resolution checks
+PICK_HIGHLIGHT_COLOR = (255, 255, 255)
+PICK_HIGHLIGHT_WIDTH = 2  # outline drawn around the clicked sprite
 
 
 class TinyShapesBase(GameHandler):
+    pick_layer = "default"  # grid layer the sprites that can be clicked on live in
+
     def __init__(self):
         self.SCREEN_WIDTH = SCREEN_WIDTH
         self.SCREEN_HEIGHT = SCREEN_HEIGHT
@@ -39,13 +47,58 @@ class TinyShapesBase(GameHandler):
         self.setup_basic_helpers()
         self.setup_basic_textures()
         self.setup_basic_sprites()
+        self.setup_picking()
         self.run_initial_timed_events()
 
     def setup_basic_helpers(self):
-        # area is expected to be setup by the time this is called
+        # area and grid are expected to be setup by the time this is called
         self.area_to_screen = self.area.scale_by(
             Area(top=0, left=0, bottom=SCREEN_HEIGHT, right=SCREEN_WIDTH)
         )
+        self.grid_tuner = GridTuner(self.grid)
+        self.timed_event_handler.add_event(GRID_TUNING_INTERVAL, self.tune_grid)
+
+    def setup_picking(self):
+        # sprites are drawn in list order, so later ones are on top
+        self.draw_rank = {sprite: rank for rank, sprite in enumerate(self.sprites)}
+        self.picked_sprite = None
+        self.picker = Picker(
+            self.grid,
+            self.area,
+            Area(top=0, left=0, bottom=SCREEN_HEIGHT, right=SCREEN_WIDTH),
+            max_size=(SHAPE_SIZE, SHAPE_SIZE),
+            draw_order=self.draw_rank.get,
+            layer=self.pick_layer,
+        )
+        self.event_handler.register_pick_handler(self.picker, self.on_pick)
+
+    def on_pick(self, sprite, event):
+        # clicking empty space clears the pick
+        self.picked_sprite = sprite
+
+    def picked_rect(self):
+        """Screen rectangle of the picked sprite's outline, or None."""
+        if self.picked_sprite is None:
+            return None
+        position = self.area_to_screen(self.picked_sprite.position)
+        rect = self.picked_sprite.texture.get_rect(topleft=(position.x, position.y))
+        return rect.inflate(2 * PICK_HIGHLIGHT_WIDTH, 2 * PICK_HIGHLIGHT_WIDTH)
+
+    def draw_pick_highlight(self):
+        rect = self.picked_rect()
+        if rect is not None:
+            pygame.draw.rect(
+                self.surface, PICK_HIGHLIGHT_COLOR, rect, PICK_HIGHLIGHT_WIDTH
+            )
+
+    def tune_grid(self):
+        self.grid_tuner.maybe_rebuild()
+        self.timed_event_handler.add_event(GRID_TUNING_INTERVAL, self.tune_grid)
+
+    def _update(self, dt: float) -> None:
+        super()._update(dt)
+        # spread any resolution change over several frames
+        self.grid_tuner.step()
 
     def setup_basic_textures(self):
         pass
@@ -64,3 +117,4 @@ class TinyShapesBase(GameHandler):
             # what happened to tell, don't ask?
             position = self.area_to_screen(sprite.position)
             self.surface.blit(sprite.texture, (position.x, position.y))
+        self.draw_pick_highlight()
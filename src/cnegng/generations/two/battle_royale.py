@@ -1,20 +1,44 @@
 import random
 from functools import lru_cache
-from cnegng.ACME.spatial2d import Position
 
+import numpy as np
+
+from cnegng.ACME.spatial2d import Area, Position
+from cnegng.ACME.spatial2d.packed_rtree import PackedRTree
+from cnegng.ACME.spatial2d.poisson_disk import PoissonDiskSampler
+
+from cnegng.generations.two.bus_drop import BusDrop
+from cnegng.generations.two.flow_field import FlowFields
+from cnegng.generations.two.hierarchical_path import HierarchicalPathfinder
+from cnegng.generations.two.loot_chest import LootChest
+from cnegng.generations.two.projectiles import ProjectileStore
 from cnegng.generations.two.region import RegionMap
+from cnegng.generations.two.spawn_sampler import (
+    SpawnSampler,
+    fewer_players_when_deadlier,
+    more_loot_when_harder,
+)
 from cnegng.generations.two.name_generators import ElvishNameGenerator
 from cnegng.ACME.spatial2d.dimensions import Dimensions
 
+# how close a projectile must pass a player or critter to hit, in world units;
+# about half a sprite's width when the map is drawn to the screen
+PROJECTILE_HIT_RADIUS = 6_000
+
 
 class BattleRoyale:
-    def __init__(self, dimensions: Dimensions):
+    def __init__(self, dimensions: Dimensions, grid=None):
         self.dimensions = dimensions
+        self.grid = grid  # Grid holding the players and critters, if any
+        self.players = set()  # Players in the map
         self.critters = set()  # Critters in the map
         self.chests = set()  # Chests for loot
         self.consumables = set()  # Consumables like potions
-        self.projectiles = set()  # Projectiles like arrows, bullets, etc.
+        # Arrows, bullets, etc. in flight
+        self.projectiles = ProjectileStore(grid, hit_radius=PROJECTILE_HIT_RADIUS)
+        self.projectile_hits = []  # Hits from the latest update
         self.region_map = RegionMap(100, 100)  # 100x100 grid map for terrain
+        self.static_index = None  # PackedRTree over chests and consumables
 
     @lru_cache(maxsize=None)
     def bus_path(self):
@@ -35,16 +59,124 @@ class BattleRoyale:
 
         return start_pos, end_pos
 
+    def bus_drop(self, players, events, **kwargs):
+        """
+        A BusDrop flying bus_path() that lands the players in self.grid.
+
+        Takes the keyword arguments of BusDrop; call start() on the result.
+        """
+        if self.grid is None:
+            raise ValueError("bus_drop needs a BattleRoyale with a grid")
+        start, end = self.bus_path()
+        self.players.update(players)
+        return BusDrop(self.grid, players, start, end, events, **kwargs)
+
+    @lru_cache(maxsize=None)
+    def loot_spawns(self):
+        """SpawnSampler that puts more loot in harder regions."""
+        return SpawnSampler(self.region_map, more_loot_when_harder)
+
+    @lru_cache(maxsize=None)
+    def player_spawns(self):
+        """SpawnSampler that keeps players out of the deadliest regions."""
+        return SpawnSampler(self.region_map, fewer_players_when_deadlier)
+
+    @lru_cache(maxsize=None)
+    def flow_fields(self):
+        """FlowFields for moving crowds across the map, e.g. towards the zone."""
+        return FlowFields(self.region_map)
+
+    @lru_cache(maxsize=None)
+    def pathfinder(self):
+        """HierarchicalPathfinder for single agents with goals of their own."""
+        return HierarchicalPathfinder(self.region_map)
+
     def _sets_to_update(self):
-        return [self.critters, self.projectiles, self.players]
+        return [self.critters, self.players]
 
     def update(self, dt):
         # Update all game objects like critters, chests, etc.
-        for updateable in self._sets_to_update:
+        for updateable in self._sets_to_update():
             for thing_to_update in updateable:
                 thing_to_update.update(dt)
+        # Projectiles move in one batch, after their targets
+        self.projectile_hits = self.projectiles.step(dt)
         # Update region-specific logic based on events
 
+    def build_static_index(self):
+        """
+        Bulk-load the things that never move into a PackedRTree.
+
+        Call again after placing or removing chests or consumables.
+        """
+        self.static_index = PackedRTree(self.chests | self.consumables)
+        return self.static_index
+
+    def scatter_positions(
+        self, count, radius=None, spacing_by_difficulty=None, seed=None
+    ):
+        """
+        Well spaced positions across the map, from a Poisson-disk sample.
+
+        :param count: How many positions.
+        :param radius: Minimum spacing; by default the largest that fits count.
+        :param spacing_by_difficulty: Optional callable mapping an array of region
+            difficulties to spacing multipliers, e.g. to thin items out in hard
+            regions. The map then holds fewer positions than with plain spacing.
+        :param seed: Seed for a reproducible layout.
+        :return: A list of up to count Positions.
+        """
+        area = Area(
+            top=0, left=0, bottom=self.dimensions.height, right=self.dimensions.width
+        )
+        if radius is None:
+            radius = PoissonDiskSampler.radius_for(area, count)
+        if spacing_by_difficulty is None:
+            sampler = PoissonDiskSampler(area, radius, seed=seed)
+        else:
+            table = self.region_map.difficulties()
+            scales = np.asarray(spacing_by_difficulty(table), dtype=float)
+
+            def spacing(xs, ys):
+                difficulty = self.region_map.difficulty_at_many(xs, ys, table)
+                return radius * np.asarray(spacing_by_difficulty(difficulty))
+
+            sampler = PoissonDiskSampler(
+                area,
+                radius * scales.min(),
+                spacing=spacing,
+                max_radius=radius * scales.max(),
+                seed=seed,
+            )
+        xs, ys = sampler.sample(count)
+        return [Position(x, y) for x, y in zip(xs.tolist(), ys.tolist())]
+
+    def place_chests(self, count, **kwargs):
+        """
+        Scatter count LootChests over the map and re-index the statics.
+
+        Takes the keyword arguments of scatter_positions().
+        """
+        chests = [
+            LootChest(position) for position in self.scatter_positions(count, **kwargs)
+        ]
+        self.chests.update(chests)
+        self.build_static_index()
+        return chests
+
+    def place_consumables(self, count, factory, **kwargs):
+        """
+        Scatter count consumables, made by factory(position), over the map.
+
+        Takes the keyword arguments of scatter_positions().
+        """
+        consumables = [
+            factory(position) for position in self.scatter_positions(count, **kwargs)
+        ]
+        self.consumables.update(consumables)
+        self.build_static_index()
+        return consumables
+
     def spawn_loot(self, chest):
         # Call to loot table to generate loot for the chest
         chest.spawn_loot()
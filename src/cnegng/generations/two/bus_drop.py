@@ -0,0 +1,215 @@
+import math
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from cnegng.ACME.events.timed_event_handler import TimedEventHandler
+from cnegng.ACME.spatial2d import Position
+
+
+class BusDrop:
+    """
+    The battle bus flying its path while the players jump off and glide down.
+
+    Everything about the drop is worked out up front in one pass over arrays:
+    each player's jump time along the flight, where that puts them on the path,
+    the spot they glide to within ``glide_range`` of it and when they touch down.
+    positions_at() reads anyone's position at any moment from those arrays, and
+    move_airborne() puts the players in the air where they are right now.
+
+    After start() the drop runs itself through a TimedEventHandler, ticking every
+    ``tick`` seconds and reading the time from the handler's clock, so late ticks
+    do not slow the bus down: the bus moves on, and the players whose landing time has
+    come are put into the grid together with Grid.add_many(). Landings are
+    sorted by time, so a tick only touches the players landing in it and a big
+    drop spreads its work evenly over the flight.
+
+    .. code-block:: python
+
+        start, end = contest.bus_path()
+        drop = BusDrop(grid, players, start, end, game.timed_event_handler)
+        drop.start()
+
+    Attributes
+    ----------
+    bus_position : Position
+        Where the bus was at the latest tick.
+    elapsed : float
+        Seconds since start(), as of the latest tick.
+    current_time : float
+        Seconds since start() by the handler's clock, which moves every frame.
+    jump_time, land_time : numpy.ndarray
+        Per player, seconds after the start at which they jump and land.
+    jump_x, jump_y, land_x, land_y : numpy.ndarray
+        Per player, where they jump and where they land.
+    landed : int
+        The number of players on the ground.
+    """
+
+    def __init__(
+        self,
+        grid,
+        players: Sequence,
+        start: Position,
+        end: Position,
+        events: TimedEventHandler,
+        flight_time: float = 60.0,
+        glide_range: float = 50_000.0,
+        glide_speed: float = 5_000.0,
+        tick: float = 0.25,
+        layer="player",
+        on_land: Optional[Callable[[List], None]] = None,
+        seed=None,
+    ):
+        """
+        :param grid: The grid to land the players in.
+        :param players: The players on the bus; each gets its position set on landing.
+        :param start: Where the bus starts.
+        :param end: Where the bus leaves the map.
+        :param events: The handler that schedules the ticks.
+        :param flight_time: Seconds the bus takes from start to end.
+        :param glide_range: Furthest a player glides from their jump point.
+        :param glide_speed: Glide speed over the ground, in units per second.
+        :param tick: Seconds between ticks.
+        :param layer: The grid layer to land players in.
+        :param on_land: Called once per tick with the players who just landed.
+        :param seed: Seed or numpy Generator for jump times and landing spots.
+        """
+        if flight_time <= 0:
+            raise ValueError(f"flight_time must be positive, got {flight_time}")
+        self.grid = grid
+        self.players = list(players)
+        self.start_position = start.clone()
+        self.end_position = end.clone()
+        self.events = events
+        self.flight_time = flight_time
+        self.glide_range = glide_range
+        self.glide_speed = glide_speed
+        self.tick = tick
+        self.layer = layer
+        self.on_land = on_land
+        self.rng = np.random.default_rng(seed)
+        self.elapsed = 0.0
+        self._started_at = 0.0
+        self.running = False
+        self.landed = 0
+        self._plan()
+
+    def __repr__(self):
+        return f"BusDrop({self.landed}/{len(self.players)} landed)"
+
+    def _plan(self):
+        count = len(self.players)
+        rng = self.rng
+        start, end = self.start_position, self.end_position
+        self.jump_time = np.sort(rng.random(count)) * self.flight_time
+        along = self.jump_time / self.flight_time
+        self.jump_x = start.x + (end.x - start.x) * along
+        self.jump_y = start.y + (end.y - start.y) * along
+        # a uniform spot in the disc around the jump point, kept on the map
+        angle = rng.random(count) * (2 * math.pi)
+        reach = self.glide_range * np.sqrt(rng.random(count))
+        area = self.grid.area
+        # stop just short of the far edges, which belong to no cell
+        right = np.nextafter(float(area.right), float(area.left))
+        bottom = np.nextafter(float(area.bottom), float(area.top))
+        self.land_x = np.clip(self.jump_x + np.cos(angle) * reach, area.left, right)
+        self.land_y = np.clip(self.jump_y + np.sin(angle) * reach, area.top, bottom)
+        glide = np.hypot(self.land_x - self.jump_x, self.land_y - self.jump_y)
+        self.land_time = self.jump_time + glide / self.glide_speed
+        # players in landing order, so each tick takes the next run of them
+        self._landing_order = np.argsort(self.land_time, kind="stable")
+
+    @property
+    def bus_position(self) -> Position:
+        return self.bus_position_at(self.elapsed)
+
+    @property
+    def current_time(self) -> float:
+        if not self.running:
+            return self.elapsed
+        return self.events.current_time - self._started_at
+
+    def bus_position_at(self, time: float) -> Position:
+        """Where the bus is a number of seconds after start()."""
+        along = min(max(time, 0.0) / self.flight_time, 1.0)
+        start, end = self.start_position, self.end_position
+        return Position(
+            start.x + (end.x - start.x) * along, start.y + (end.y - start.y) * along
+        )
+
+    def finished(self) -> bool:
+        return self.landed == len(self.players)
+
+    def start(self) -> None:
+        """Start the flight and schedule the ticks."""
+        self.running = True
+        self._started_at = self.events.current_time
+        self.events.add_event(self.tick, self._tick)
+
+    def stop(self) -> None:
+        """Stop ticking; already scheduled events do nothing."""
+        self.running = False
+
+    def positions_at(self, time: float):
+        """
+        Where every player is at a moment of the drop.
+
+        :param time: Seconds after start().
+        :return: (xs, ys, airborne): positions, and whether each player has jumped
+            but not yet landed. Players still on the bus are at the bus.
+        """
+        along = min(time / self.flight_time, 1.0)
+        start, end = self.start_position, self.end_position
+        bus_x = start.x + (end.x - start.x) * along
+        bus_y = start.y + (end.y - start.y) * along
+        with np.errstate(divide="ignore", invalid="ignore"):
+            glided = (time - self.jump_time) / (self.land_time - self.jump_time)
+        glided = np.nan_to_num(glided, nan=1.0, posinf=1.0, neginf=0.0).clip(0, 1)
+        xs = self.jump_x + (self.land_x - self.jump_x) * glided
+        ys = self.jump_y + (self.land_y - self.jump_y) * glided
+        on_bus = time < self.jump_time
+        xs[on_bus] = bus_x
+        ys[on_bus] = bus_y
+        airborne = ~on_bus & (time < self.land_time)
+        return xs, ys, airborne
+
+    def move_airborne(self, time: Optional[float] = None) -> np.ndarray:
+        """
+        Set the positions of the players gliding down, and only those.
+
+        :param time: Seconds after start(); current_time by default.
+        :return: The indices into players of the players moved.
+        """
+        if time is None:
+            time = self.current_time
+        xs, ys, airborne = self.positions_at(time)
+        moved = np.flatnonzero(airborne)
+        players = self.players
+        for index, x, y in zip(moved.tolist(), xs[moved].tolist(), ys[moved].tolist()):
+            players[index].position = Position(x, y)
+        return moved
+
+    def _tick(self):
+        if not self.running:
+            return
+        self.elapsed = self.events.current_time - self._started_at
+        self._land_due()
+        if not self.finished():
+            self.events.add_event(self.tick, self._tick)
+
+    def _land_due(self):
+        order = self._landing_order
+        due = int(np.searchsorted(self.land_time[order], self.elapsed, side="right"))
+        if due <= self.landed:
+            return
+        picked = order[self.landed : due]
+        xs = self.land_x[picked]
+        ys = self.land_y[picked]
+        players = [self.players[index] for index in picked.tolist()]
+        for player, x, y in zip(players, xs.tolist(), ys.tolist()):
+            player.position = Position(x, y)
+        self.grid.add_many(players, layer=self.layer, xs=xs, ys=ys)
+        self.landed = due
+        if self.on_land is not None:
+            self.on_land(players)
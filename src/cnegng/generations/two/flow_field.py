@@ -0,0 +1,284 @@
+import heapq
+import math
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from cnegng.ACME.spatial2d import Position
+from cnegng.generations.two.region import RegionMap
+
+# (dx, dy, length) of the eight moves between neighbouring regions
+MOVES = [
+    (dx, dy, math.hypot(dx, dy)) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy
+]
+
+
+def cost_by_difficulty(difficulty):
+    """Travel cost per region crossed: the region's difficulty."""
+    return np.asarray(difficulty, dtype=float)
+
+
+class FlowField:
+    """
+    The way to one goal region from every region of a RegionMap.
+
+    Dijkstra runs once outwards from the goal over the regions, moving to any of
+    the eight neighbours; a move costs its length times the mean cost of the two
+    regions, and diagonal moves may not cut the corner of an impassable region.
+    That gives the integration field, the cheapest cost to the goal from
+    each region, and for each region the neighbour the cheapest route goes
+    through. The directions to those neighbours are kept as two arrays, so any
+    number of agents look theirs up with one indexing step.
+
+    .. code-block:: python
+
+        field = FlowField(region_map.difficulties(), goal=(50, 50))
+        dx, dy = field.directions(xs, ys)
+        xs, ys = field.step(xs, ys, speed=300, dt=dt)
+
+    Attributes
+    ----------
+    goal : Tuple[int, int]
+        The (x, y) region everything flows to.
+    integration : numpy.ndarray
+        Cost to the goal from each region, indexed [x, y]; inf if unreachable.
+    direction_x, direction_y : numpy.ndarray
+        Unit direction towards the next region on the way, indexed [x, y]; zero
+        at the goal and in unreachable regions.
+    """
+
+    def __init__(
+        self,
+        costs: np.ndarray,
+        goal: Tuple[int, int],
+        region_size: float = RegionMap.REGION_SIZE,
+    ):
+        """
+        :param costs: Cost of crossing each region, indexed [x, y]; inf is impassable.
+        :param goal: The (x, y) region to head for.
+        :param region_size: World units covered by a region along each axis.
+        """
+        costs = np.asarray(costs, dtype=float)
+        width, height = costs.shape
+        goal_x, goal_y = goal
+        if not (0 <= goal_x < width and 0 <= goal_y < height):
+            raise ValueError(f"goal {goal} is outside the {width}x{height} map")
+        if (costs < 0).any():
+            raise ValueError("costs must not be negative")
+        self.goal = (int(goal_x), int(goal_y))
+        self.region_size = region_size
+        self.width = width
+        self.height = height
+        self.integration, parent = self._integrate(costs)
+        self.direction_x, self.direction_y = self._directions(parent)
+
+    def __repr__(self):
+        return f"FlowField(goal={self.goal}, {self.width}x{self.height})"
+
+    def _integrate(self, costs):
+        width, height = self.width, self.height
+        cost = costs.ravel().tolist()
+        total = [math.inf] * len(cost)
+        parent = [-1] * len(cost)
+        start = self.goal[0] * height + self.goal[1]
+        total[start] = 0.0
+        queue = [(0.0, start)]
+        while queue:
+            so_far, cell = heapq.heappop(queue)
+            if so_far > total[cell]:
+                continue
+            x, y = divmod(cell, height)
+            here = cost[cell]
+            for dx, dy, length in MOVES:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                neighbour = nx * height + ny
+                # no cutting the corner of an impassable region on a diagonal
+                if (
+                    dx
+                    and dy
+                    and (
+                        cost[nx * height + y] == math.inf
+                        or cost[x * height + ny] == math.inf
+                    )
+                ):
+                    continue
+                candidate = so_far + length * (here + cost[neighbour]) * 0.5
+                if candidate < total[neighbour]:
+                    total[neighbour] = candidate
+                    parent[neighbour] = cell
+                    heapq.heappush(queue, (candidate, neighbour))
+        return (
+            np.array(total).reshape(width, height),
+            np.array(parent, dtype=np.int64).reshape(width, height),
+        )
+
+    def _directions(self, parent):
+        xs, ys = np.indices(parent.shape)
+        next_x, next_y = np.divmod(parent, self.height)
+        has_next = parent >= 0
+        dx = np.where(has_next, next_x - xs, 0).astype(float)
+        dy = np.where(has_next, next_y - ys, 0).astype(float)
+        length = np.hypot(dx, dy)
+        np.divide(dx, length, out=dx, where=length > 0)
+        np.divide(dy, length, out=dy, where=length > 0)
+        return dx, dy
+
+    def goal_center(self) -> Position:
+        """The middle of the goal region, in world units."""
+        return Position(
+            (self.goal[0] + 0.5) * self.region_size,
+            (self.goal[1] + 0.5) * self.region_size,
+        )
+
+    def regions_of(self, xs, ys) -> Tuple[np.ndarray, np.ndarray]:
+        """The (x, y) region of many world positions, clamped to the map."""
+        grid_x = (np.asarray(xs, dtype=float) // self.region_size).astype(np.int64)
+        grid_y = (np.asarray(ys, dtype=float) // self.region_size).astype(np.int64)
+        np.clip(grid_x, 0, self.width - 1, out=grid_x)
+        np.clip(grid_y, 0, self.height - 1, out=grid_y)
+        return grid_x, grid_y
+
+    def directions(
+        self, xs, ys, target: Optional[Position] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The unit direction to move in from many world positions at once.
+
+        Agents already in the goal region head straight for target, by default
+        the middle of the goal region.
+
+        :return: (dx, dy) arrays.
+        """
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        grid_x, grid_y = self.regions_of(xs, ys)
+        dx = self.direction_x[grid_x, grid_y]
+        dy = self.direction_y[grid_x, grid_y]
+        arrived = (grid_x == self.goal[0]) & (grid_y == self.goal[1])
+        if arrived.any():
+            if target is None:
+                target = self.goal_center()
+            to_x = target.x - xs[arrived]
+            to_y = target.y - ys[arrived]
+            length = np.hypot(to_x, to_y)
+            np.divide(to_x, length, out=to_x, where=length > 0)
+            np.divide(to_y, length, out=to_y, where=length > 0)
+            dx[arrived] = np.where(length > 0, to_x, 0)
+            dy[arrived] = np.where(length > 0, to_y, 0)
+        return dx, dy
+
+    def step(
+        self, xs, ys, speed, dt: float, target: Optional[Position] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Move many agents along the field.
+
+        :param speed: World units per second, one for all or an array per agent.
+        :param dt: Seconds to move for.
+        :param target: Where to stop inside the goal region; see directions().
+        :return: The new (xs, ys) arrays.
+        """
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        if target is None:
+            target = self.goal_center()
+        dx, dy = self.directions(xs, ys, target)
+        distance = np.broadcast_to(np.asarray(speed, dtype=float) * dt, xs.shape)
+        # inside the goal region, stop at the target rather than walk past it
+        grid_x, grid_y = self.regions_of(xs, ys)
+        arrived = (grid_x == self.goal[0]) & (grid_y == self.goal[1])
+        left = np.hypot(target.x - xs, target.y - ys)
+        distance = np.where(arrived, np.minimum(distance, left), distance)
+        return xs + dx * distance, ys + dy * distance
+
+    def cost_from(self, xs, ys) -> np.ndarray:
+        """Integration cost to the goal from many world positions."""
+        grid_x, grid_y = self.regions_of(xs, ys)
+        return self.integration[grid_x, grid_y]
+
+
+class FlowFields:
+    """
+    FlowFields over one RegionMap, computed once per goal region and kept in an LRU.
+
+    Every goal inside the same region shares that region's field. The region costs
+    are read from the map when this is made; after difficulties change, refresh()
+    reads them again and drops the fields computed from the old ones.
+
+    .. code-block:: python
+
+        fields = FlowFields(region_map)
+        xs, ys = fields.field_to(zone.circle.center).step(xs, ys, 300, dt)
+
+    Attributes
+    ----------
+    maxsize : int
+        The number of fields kept.
+    hits : int
+        Requests answered with a cached field.
+    misses : int
+        Requests that had to compute a field.
+    """
+
+    def __init__(
+        self,
+        region_map: RegionMap,
+        cost_for_difficulty: Callable = cost_by_difficulty,
+        maxsize: int = 16,
+    ):
+        """
+        :param region_map: The map to move over.
+        :param cost_for_difficulty: Maps an array of difficulties to crossing costs.
+        :param maxsize: The number of fields kept.
+        """
+        self.region_map = region_map
+        self.cost_for_difficulty = cost_for_difficulty
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._fields = OrderedDict()
+        self.refresh()
+
+    def __repr__(self):
+        return f"FlowFields({len(self._fields)} cached)"
+
+    def refresh(self) -> None:
+        """Re-read the region costs and drop every cached field."""
+        difficulties = self.region_map.difficulties()
+        self.costs = np.broadcast_to(
+            np.asarray(self.cost_for_difficulty(difficulties), dtype=float),
+            difficulties.shape,
+        )
+        self._fields.clear()
+
+    def region_of(self, position: Position) -> Tuple[int, int]:
+        size = self.region_map.REGION_SIZE
+        width, height = self.costs.shape
+        return (
+            min(max(0, int(position.x // size)), width - 1),
+            min(max(0, int(position.y // size)), height - 1),
+        )
+
+    def field_to(self, goal: Position) -> FlowField:
+        """The field leading to the region holding the goal position."""
+        return self.field_to_region(self.region_of(goal))
+
+    def field_to_region(self, region: Tuple[int, int]) -> FlowField:
+        """The field leading to an (x, y) region."""
+        try:
+            field = self._fields[region]
+        except KeyError:
+            self.misses += 1
+        else:
+            self._fields.move_to_end(region)
+            self.hits += 1
+            return field
+        field = FlowField(self.costs, region, self.region_map.REGION_SIZE)
+        if self.maxsize > 0:
+            self._fields[region] = field
+            if len(self._fields) > self.maxsize:
+                self._fields.popitem(last=False)
+        return field
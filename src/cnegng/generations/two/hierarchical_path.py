@@ -0,0 +1,584 @@
+import heapq
+import math
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from cnegng.ACME.spatial2d import Position
+from cnegng.generations.two.flow_field import MOVES, cost_by_difficulty
+from cnegng.generations.two.region import RegionMap
+
+Region = Tuple[int, int]
+
+# an opening along a border gets an entrance for every this many regions
+ENTRANCE_SPACING = 4
+
+
+@dataclass
+class _CachedPath:
+    """
+    A planned path: the abstract nodes it visits and the refined step between
+    each two. A step is (kind, cost, regions); kind says how it was found:
+    "link" across a border, "edge" between two nodes of a cluster, "start" out
+    of the start's cluster search, "goal" into the goal's. Those two searches
+    are kept as well, as (cost, regions) per node they reached.
+    """
+
+    total: float
+    nodes: List[Region]
+    steps: list
+    route: Tuple[Region, ...]
+    from_start: dict
+    to_goal: dict
+
+
+class HierarchicalPathfinder:
+    """
+    Paths between single regions of a RegionMap, HPA* style.
+
+    The map is cut into square clusters of ``cluster_size`` regions. Where two
+    clusters meet, the passable region pairs across the border give entrances:
+    the cheapest pair out of every ENTRANCE_SPACING along an opening. The
+    regions of those pairs are the nodes of an abstract graph, joined across
+    borders by a single step and, inside every cluster, by the cheapest path
+    between each two of its nodes, found once up front.
+
+    A query links the start and goal into the graph with one search inside their
+    own clusters, runs A* over the abstract graph, and strings the stored
+    in-cluster paths together. Moves and costs are those of FlowField: eight
+    neighbours, length times the mean cost of the two regions, no corner
+    cutting. Paths come out close to, but not always exactly, the cheapest.
+
+    Paths are kept in an LRU as the abstract nodes they visit and the refined
+    steps between them. When difficulties change, update_regions() rebuilds
+    only the clusters holding the changed regions and the borders around them,
+    then repairs the cached paths: steps inside changed clusters are refined
+    again, and a path is planned afresh only when an entrance it used is gone or
+    it may no longer be the cheapest.
+
+    .. code-block:: python
+
+        paths = HierarchicalPathfinder(region_map)
+        route = paths.find_path((3, 4), (88, 61))
+        region_map.map[40][40].difficulty = 9
+        paths.update_regions([(40, 40)])
+
+    Attributes
+    ----------
+    costs : numpy.ndarray
+        Cost of crossing each region, indexed [x, y]; inf is impassable.
+    hits : int
+        Queries answered from the cache.
+    misses : int
+        Queries that had to search.
+    """
+
+    def __init__(
+        self,
+        region_map: RegionMap,
+        cluster_size: int = 10,
+        cost_for_difficulty: Callable = cost_by_difficulty,
+        cache_size: int = 256,
+    ):
+        """
+        :param region_map: The map to find paths over.
+        :param cluster_size: Regions along each side of a cluster.
+        :param cost_for_difficulty: Maps an array of difficulties to crossing costs.
+        :param cache_size: The number of paths kept.
+        """
+        if cluster_size < 1:
+            raise ValueError(f"cluster_size must be at least 1, got {cluster_size}")
+        self.region_map = region_map
+        self.cluster_size = cluster_size
+        self.cost_for_difficulty = cost_for_difficulty
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self.refresh()
+
+    def __repr__(self):
+        return (
+            f"HierarchicalPathfinder({self.width}x{self.height}, "
+            f"cluster_size={self.cluster_size})"
+        )
+
+    def _costs_for(self, difficulties):
+        costs = np.asarray(self.cost_for_difficulty(difficulties), dtype=float)
+        return np.broadcast_to(costs, np.shape(difficulties))
+
+    def refresh(self) -> None:
+        """Re-read every region and rebuild the whole abstract graph."""
+        self.costs = np.array(self._costs_for(self.region_map.difficulties()))
+        if (self.costs < 0).any():
+            raise ValueError("costs must not be negative")
+        self.width, self.height = self.costs.shape
+        self._cost = self.costs.tolist()
+        self.clusters_x = -(-self.width // self.cluster_size)
+        self.clusters_y = -(-self.height // self.cluster_size)
+        self._entrances = {}
+        self._links = defaultdict(dict)
+        self._edges = {}
+        for border in self._all_borders():
+            self._set_entrances(border, self._find_entrances(border))
+        for cx in range(self.clusters_x):
+            for cy in range(self.clusters_y):
+                self._connect_cluster((cx, cy))
+        self._cache.clear()
+
+    def cluster_of(self, region: Region) -> Tuple[int, int]:
+        return region[0] // self.cluster_size, region[1] // self.cluster_size
+
+    def _bounds(self, cluster):
+        cx, cy = cluster
+        size = self.cluster_size
+        return (
+            cx * size,
+            cy * size,
+            min((cx + 1) * size, self.width),
+            min((cy + 1) * size, self.height),
+        )
+
+    def _all_borders(self):
+        for cx in range(self.clusters_x):
+            for cy in range(self.clusters_y):
+                if cx + 1 < self.clusters_x:
+                    yield (cx, cy), (cx + 1, cy)
+                if cy + 1 < self.clusters_y:
+                    yield (cx, cy), (cx, cy + 1)
+
+    def _borders_of(self, cluster):
+        cx, cy = cluster
+        if cx > 0:
+            yield (cx - 1, cy), cluster
+        if cy > 0:
+            yield (cx, cy - 1), cluster
+        if cx + 1 < self.clusters_x:
+            yield cluster, (cx + 1, cy)
+        if cy + 1 < self.clusters_y:
+            yield cluster, (cx, cy + 1)
+
+    def _find_entrances(self, border):
+        """The region pairs that cross a border, one or two per opening."""
+        first, second = border
+        x0, y0, x1, y1 = self._bounds(first)
+        if second[0] != first[0]:
+            pairs = [((x1 - 1, y), (x1, y)) for y in range(y0, y1)]
+        else:
+            pairs = [((x, y1 - 1), (x, y1)) for x in range(x0, x1)]
+        cost = self._cost
+        entrances = []
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None:
+                (ax, ay), (bx, by) = pair
+                if cost[ax][ay] < math.inf and cost[bx][by] < math.inf:
+                    run.append(pair)
+                    continue
+            # an entrance at the cheapest crossing of every stretch of the run,
+            # nearest the middle of the stretch on a tie
+            for begin in range(0, len(run), ENTRANCE_SPACING):
+                stretch = run[begin : begin + ENTRANCE_SPACING]
+                middle = (len(stretch) - 1) / 2
+                best = min(
+                    range(len(stretch)),
+                    key=lambda index: (
+                        cost[stretch[index][0][0]][stretch[index][0][1]]
+                        + cost[stretch[index][1][0]][stretch[index][1][1]],
+                        abs(index - middle),
+                    ),
+                )
+                entrances.append(stretch[best])
+            run = []
+        return entrances
+
+    def _set_entrances(self, border, entrances):
+        for a, b in self._entrances.get(border, []):
+            self._links[a].pop(b, None)
+            self._links[b].pop(a, None)
+        self._entrances[border] = entrances
+        cost = self._cost
+        for a, b in entrances:
+            step = (cost[a[0]][a[1]] + cost[b[0]][b[1]]) * 0.5
+            self._links[a][b] = step
+            self._links[b][a] = step
+
+    def _nodes_of(self, cluster):
+        nodes = set()
+        for border in self._borders_of(cluster):
+            for pair in self._entrances[border]:
+                nodes.update(
+                    region for region in pair if self.cluster_of(region) == cluster
+                )
+        return nodes
+
+    def _connect_cluster(self, cluster):
+        """Find the cheapest path between every two nodes inside a cluster."""
+        nodes = self._nodes_of(cluster)
+        bounds = self._bounds(cluster)
+        edges = {}
+        for node in nodes:
+            others = nodes - {node}
+            dist, parent = self._search(node, bounds, others)
+            edges[node] = {
+                other: (dist[other], self._walk_back(parent, other))
+                for other in others
+                if other in dist
+            }
+        self._edges[cluster] = edges
+
+    def _search(self, source, bounds, targets=None):
+        """
+        Dijkstra from source without leaving bounds.
+
+        :param targets: Stop once all of these are settled.
+        :return: (dist, parent) dicts over the regions reached.
+        """
+        x0, y0, x1, y1 = bounds
+        cost = self._cost
+        dist = {source: 0.0}
+        parent = {source: None}
+        left = set(targets) if targets is not None else None
+        if left is not None and not left:
+            return dist, parent
+        queue = [(0.0, source)]
+        while queue:
+            so_far, region = heapq.heappop(queue)
+            if so_far > dist[region]:
+                continue
+            if left is not None:
+                left.discard(region)
+                if not left:
+                    break
+            x, y = region
+            here = cost[x][y]
+            for dx, dy, length in MOVES:
+                nx, ny = x + dx, y + dy
+                if not (x0 <= nx < x1 and y0 <= ny < y1):
+                    continue
+                there = cost[nx][ny]
+                if there == math.inf:
+                    continue
+                if dx and dy and (cost[nx][y] == math.inf or cost[x][ny] == math.inf):
+                    continue
+                candidate = so_far + length * (here + there) * 0.5
+                neighbour = (nx, ny)
+                if candidate < dist.get(neighbour, math.inf):
+                    dist[neighbour] = candidate
+                    parent[neighbour] = region
+                    heapq.heappush(queue, (candidate, neighbour))
+        return dist, parent
+
+    @staticmethod
+    def _walk_back(parent, region):
+        path = []
+        while region is not None:
+            path.append(region)
+            region = parent[region]
+        path.reverse()
+        return path
+
+    def _heuristic(self, region, goal, scale):
+        dx = abs(region[0] - goal[0])
+        dy = abs(region[1] - goal[1])
+        return scale * (max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy))
+
+    def _plan(self, start, goal):
+        cost = self._cost
+        if cost[start[0]][start[1]] == math.inf or cost[goal[0]][goal[1]] == math.inf:
+            return None
+        if start == goal:
+            return _CachedPath(0.0, [start], [], (start,), {}, {})
+        return self._abstract_search(
+            start, goal, self._start_links(start, goal), self._goal_links(goal)
+        )
+
+    def _start_links(self, start, goal):
+        """The way from start to every node of its cluster, and to a goal there."""
+        start_cluster = self.cluster_of(start)
+        nodes = self._nodes_of(start_cluster)
+        targets = nodes | {goal} if self.cluster_of(goal) == start_cluster else nodes
+        dist, parent = self._search(start, self._bounds(start_cluster), targets)
+        return {
+            region: (dist[region], self._walk_back(parent, region))
+            for region in targets
+            if region in dist and region != start
+        }
+
+    def _goal_links(self, goal):
+        """The way to goal from every node of its cluster."""
+        goal_cluster = self.cluster_of(goal)
+        nodes = self._nodes_of(goal_cluster)
+        dist, parent = self._search(goal, self._bounds(goal_cluster), nodes)
+        to_goal = {}
+        for region in nodes:
+            if region in dist:
+                path = self._walk_back(parent, region)
+                path.reverse()
+                to_goal[region] = (dist[region], path)
+        return to_goal
+
+    def _abstract_search(self, start, goal, from_start, to_goal):
+        """A* over the abstract graph, with start and goal linked in by the given ways."""
+        scale = float(self.costs.min())
+        best = {start: 0.0}
+        came_from = {start: None}
+        queue = [(self._heuristic(start, goal, scale), 0.0, start)]
+        while queue:
+            _, so_far, node = heapq.heappop(queue)
+            if node == goal:
+                break
+            if so_far > best[node]:
+                continue
+            if node == start:
+                moves = [(other, "start", step) for other, step in from_start.items()]
+            else:
+                edges = self._edges[self.cluster_of(node)].get(node, {})
+                moves = [(other, "edge", step) for other, step in edges.items()]
+            moves.extend(
+                (other, "link", (step, [node, other]))
+                for other, step in self._links[node].items()
+            )
+            if node in to_goal:
+                moves.append((goal, "goal", to_goal[node]))
+            for other, kind, (step, path) in moves:
+                candidate = so_far + step
+                if candidate < best.get(other, math.inf):
+                    best[other] = candidate
+                    came_from[other] = (node, (kind, step, path))
+                    heapq.heappush(
+                        queue,
+                        (
+                            candidate + self._heuristic(other, goal, scale),
+                            candidate,
+                            other,
+                        ),
+                    )
+        if goal not in came_from:
+            return None
+
+        nodes = [goal]
+        steps = []
+        while came_from[nodes[-1]] is not None:
+            node, step = came_from[nodes[-1]]
+            nodes.append(node)
+            steps.append(step)
+        nodes.reverse()
+        steps.reverse()
+        return self._cached_path(nodes, steps, from_start, to_goal)
+
+    @staticmethod
+    def _cached_path(nodes, steps, from_start, to_goal):
+        """String the refined steps between the nodes together."""
+        total = 0.0
+        route = [nodes[0]]
+        for _, cost, path in steps:
+            total += cost
+            route.extend(path[1:])
+        return _CachedPath(total, nodes, steps, tuple(route), from_start, to_goal)
+
+    def find_path(self, start: Region, goal: Region) -> Optional[List[Region]]:
+        """
+        A cheap path between two regions.
+
+        :param start: The (x, y) region to start from.
+        :param goal: The (x, y) region to reach.
+        :return: The regions along the way, start and goal included, or None if
+            the goal cannot be reached.
+        """
+        start = (int(start[0]), int(start[1]))
+        goal = (int(goal[0]), int(goal[1]))
+        for x, y in (start, goal):
+            if not (0 <= x < self.width and 0 <= y < self.height):
+                raise ValueError(f"region {(x, y)} is outside the map")
+        key = (start, goal)
+        try:
+            entry = self._cache[key]
+        except KeyError:
+            self.misses += 1
+        else:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return None if entry is None else list(entry.route)
+        entry = self._plan(start, goal)
+        if self.cache_size > 0:
+            self._cache[key] = entry
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return None if entry is None else list(entry.route)
+
+    def find_waypoints(
+        self, start: Position, goal: Position
+    ) -> Optional[List[Position]]:
+        """
+        A path between two world positions, as the middles of the regions on it.
+
+        The last waypoint is the goal itself.
+        """
+        size = self.region_map.REGION_SIZE
+        route = self.find_path(self.region_of(start), self.region_of(goal))
+        if route is None:
+            return None
+        waypoints = [Position((x + 0.5) * size, (y + 0.5) * size) for x, y in route]
+        waypoints[-1] = goal.clone()
+        return waypoints
+
+    def region_of(self, position: Position) -> Region:
+        size = self.region_map.REGION_SIZE
+        return (
+            min(max(0, int(position.x // size)), self.width - 1),
+            min(max(0, int(position.y // size)), self.height - 1),
+        )
+
+    def path_cost(self, path: Iterable[Region]) -> float:
+        """What walking a path costs."""
+        cost = self._cost
+        path = list(path)
+        return sum(
+            math.hypot(bx - ax, by - ay) * (cost[ax][ay] + cost[bx][by]) * 0.5
+            for (ax, ay), (bx, by) in zip(path, path[1:])
+        )
+
+    def update_regions(self, regions: Iterable[Region]) -> int:
+        """
+        Pick up difficulty changes in some regions.
+
+        The clusters holding regions whose cost changed are reconnected, their
+        borders are searched for entrances again, and neighbouring clusters whose
+        entrances moved are reconnected too. Cached paths are then repaired
+        rather than planned from scratch: a path starting or ending in a
+        reconnected cluster searches that cluster again, every path keeps its
+        abstract nodes, and its steps are re-read from the new graph. Only when
+        an entrance it used is gone, or when a cheaper way may have opened, is
+        the A* over the abstract graph run again, reusing the path's own start
+        and goal searches. Either way the result is what a fresh query would
+        find.
+
+        :param regions: The (x, y) regions whose difficulty changed.
+        :return: The number of cached paths whose route changed.
+        """
+        regions = list(regions)
+        if not regions:
+            return 0
+        difficulties = np.array(
+            [self.region_map.map[x][y].difficulty for x, y in regions]
+        )
+        costs = self._costs_for(difficulties)
+        if (costs < 0).any():
+            raise ValueError("costs must not be negative")
+        dirty = set()
+        # clusters through which some path may now be cheaper than before
+        cheaper = set()
+        for (x, y), cost in zip(regions, costs.tolist()):
+            if self._cost[x][y] != cost:
+                if cost < self._cost[x][y]:
+                    cheaper.add(self.cluster_of((x, y)))
+                self._cost[x][y] = cost
+                self.costs[x, y] = cost
+                dirty.add(self.cluster_of((x, y)))
+        if not dirty:
+            return 0
+
+        reconnect = set(dirty)
+        borders = {border for cluster in dirty for border in self._borders_of(cluster)}
+        for border in borders:
+            entrances = self._find_entrances(border)
+            if entrances != self._entrances[border]:
+                # a new entrance may open a cheaper way
+                reconnect.update(border)
+                cheaper.update(border)
+            self._set_entrances(border, entrances)
+        for cluster in reconnect:
+            self._connect_cluster(cluster)
+
+        # how cheaply every node now reaches the clusters that may have got cheaper
+        near = self._distances_to(cheaper)
+        changed = 0
+        for key, entry in list(self._cache.items()):
+            if entry is None:
+                # only a cheaper way can make the goal reachable
+                repaired = self._plan(*key) if cheaper else None
+            else:
+                repaired = self._repair(entry, reconnect, cheaper, near)
+            if (repaired is None) != (entry is None) or (
+                repaired is not None and repaired.route != entry.route
+            ):
+                changed += 1
+            self._cache[key] = repaired
+        return changed
+
+    def _repair(self, entry: _CachedPath, reconnect, cheaper, near):
+        """
+        A cached path over the current graph.
+
+        :return: The repaired path, or None if the goal can no longer be reached.
+        """
+        start, goal = entry.nodes[0], entry.nodes[-1]
+        cost = self._cost
+        if cost[start[0]][start[1]] == math.inf or cost[goal[0]][goal[1]] == math.inf:
+            return None
+        if start == goal:
+            return entry
+        from_start, to_goal = entry.from_start, entry.to_goal
+        if self.cluster_of(start) in reconnect:
+            from_start = self._start_links(start, goal)
+        if self.cluster_of(goal) in reconnect:
+            to_goal = self._goal_links(goal)
+
+        # the same nodes, with every step read again from the new graph
+        steps = []
+        for kind, _, path in entry.steps:
+            a, b = path[0], path[-1]
+            if kind == "link":
+                step = self._links[a].get(b)
+                step = None if step is None else (step, path)
+            elif kind == "edge":
+                step = self._edges[self.cluster_of(a)].get(a, {}).get(b)
+            elif kind == "start":
+                step = from_start.get(b)
+            else:
+                step = to_goal.get(a)
+            if step is None:
+                # an entrance it used is gone
+                break
+            steps.append((kind,) + step)
+        else:
+            repaired = self._cached_path(entry.nodes, steps, from_start, to_goal)
+            # other ways cost at least what they did, unless they pass a cheaper
+            # cluster, and those cost at least the way to it and on from it
+            through = self._reach(start, from_start, cheaper, near) + self._reach(
+                goal, to_goal, cheaper, near
+            )
+            if repaired.total <= entry.total and repaired.total <= through:
+                return repaired
+        return self._abstract_search(start, goal, from_start, to_goal)
+
+    def _distances_to(self, clusters):
+        """The cost from every abstract node to the nearest node of the clusters."""
+        dist = {node: 0.0 for cluster in clusters for node in self._nodes_of(cluster)}
+        queue = [(0.0, node) for node in dist]
+        while queue:
+            so_far, node = heapq.heappop(queue)
+            if so_far > dist[node]:
+                continue
+            edges = self._edges[self.cluster_of(node)].get(node, {})
+            moves = [(other, step) for other, (step, _) in edges.items()]
+            moves.extend(self._links[node].items())
+            for other, step in moves:
+                candidate = so_far + step
+                if candidate < dist.get(other, math.inf):
+                    dist[other] = candidate
+                    heapq.heappush(queue, (candidate, other))
+        return dist
+
+    def _reach(self, end, links, clusters, near):
+        """What getting from a path's end to the clusters costs at least."""
+        if self.cluster_of(end) in clusters:
+            return 0.0
+        # out through a node of its own cluster, or it is a node itself
+        return min(
+            [near.get(end, math.inf)]
+            + [step + near.get(node, math.inf) for node, (step, _) in links.items()]
+        )
@@ -1,24 +1,30 @@
+import math
+
+import numpy as np
 import pygame
 from functools import lru_cache
 
 from cnegng.generations.two.region import RegionMap
 from cnegng.generations.two.log_widget import LogWidget
 from cnegng.generations.two.battle_royale import BattleRoyale
+from cnegng.generations.two.safe_zone import SafeZone, STANDARD_PHASES
 from cnegng.generations.one.base.tiny_shapes_base import TinyShapesBase
+from cnegng.ACME.particles import ParticleSystem
 from cnegng.ACME.spatial2d.grid import GridSize
 from cnegng.ACME.spatial2d import Grid
 from cnegng.ACME.spatial2d import Area
 from cnegng.ACME.spatial2d import Dimensions
-from cnegng.ACME.spatial2d import Position, Motion
+from cnegng.ACME.spatial2d import Position, Motion, Circle
 from cnegng.generations.one.palette import vibrant, without_red
 from cnegng.generations.one import ShapeTexture
 from cnegng.generations.two.sprite import Sprite
 from cnegng.generations.two.name_generators import ElvishNameGenerator
 
 SHAPE_SIZE = 24  # Size of each sprite
-GRID_CELLS = 20
 NUM_PLAYERS = 100
 BUS_DRIVER_NAME = "Vallen Liaandor"
+STORM_SPARKS_PER_SECOND = 3000
+MINIMAP = Area(top=400, left=0, bottom=900, right=500)
 
 
 class DuplicateName(Exception):
@@ -85,6 +91,8 @@ class CachedDifficultyRenderer:
 
 
 class MyBattleRoyale(TinyShapesBase):
+    pick_layer = "player"
+
     def setup_basic_helpers(self):
         self.logger = LogWidget(10, 10, 780, 200, player_lookup=self)
         self.logger("Reticulating Splines")
@@ -95,8 +103,10 @@ class MyBattleRoyale(TinyShapesBase):
             position=Position(0, 0),
             dimensions=Dimensions(self.COORDINATE_SPACE, self.COORDINATE_SPACE),
         )
-        self.grid = Grid(self.area, grid_size=GridSize(GRID_CELLS, GRID_CELLS))
-        self.contest = BattleRoyale(self.area.dimensions)
+        self.grid = Grid(
+            self.area, grid_size=GridSize(self.GRID_CELLS, self.GRID_CELLS)
+        )
+        self.contest = BattleRoyale(self.area.dimensions, grid=self.grid)
         self.players_by_name = {}
         super().setup_basic_helpers()
         # area is expected to be setup by the time this is called
@@ -104,10 +114,9 @@ class MyBattleRoyale(TinyShapesBase):
         # if you have time to read this comment you have time to fix it
         # no questions please I'm a very important man and so very busy
         # ^^^ --- sarcasm
-        self.area_to_minimap = self.area.scale_by(
-            Area(top=400, left=0, bottom=900, right=500)
-        )
+        self.area_to_minimap = self.area.scale_by(MINIMAP)
         self._dashed_flashy_line_color = 0
+        self.particles = ParticleSystem(20_000, drag=1.0)
 
     @lru_cache(maxsize=None)
     def difficulty_renderer(self):
@@ -116,6 +125,60 @@ class MyBattleRoyale(TinyShapesBase):
     def player_for_name(self, player_name):
         return self.players_by_name[player_name]
 
+    def run_initial_timed_events(self):
+        center = self.COORDINATE_SPACE / 2
+        self.safe_zone = SafeZone(
+            self.grid,
+            Circle(Position(center, center), self.COORDINATE_SPACE * 0.7),
+            STANDARD_PHASES,
+            self.timed_event_handler,
+            layer="player",
+        )
+        self.safe_zone.start()
+        self.bus_drop = self.contest.bus_drop(self.sprites, self.timed_event_handler)
+        # everyone on the bus shares one position that moves with it
+        self.bus_seat = Position(0, 0)
+        for sprite in self.sprites:
+            sprite.position = self.bus_seat
+        self.bus_drop.start()
+
+    def update(self, dt: float) -> None:
+        self.emit_storm_sparks(dt)
+        self.particles.update(dt)
+        self.follow_bus_drop()
+
+    def follow_bus_drop(self):
+        # players still in the air are drawn where the drop says they are
+        if self.bus_drop.finished():
+            return
+        now = self.bus_drop.current_time
+        bus = self.bus_drop.bus_position_at(now)
+        self.battle_bus.position = bus
+        self.bus_seat.x, self.bus_seat.y = bus.x, bus.y
+        self.bus_drop.move_airborne(now)
+
+    def emit_storm_sparks(self, dt):
+        # sparks drift outwards from the edge of the safe zone
+        circle = self.safe_zone.circle
+        count = int(STORM_SPARKS_PER_SECOND * dt)
+        if count == 0 or circle.radius <= 0:
+            return
+        angle = self.particles.rng.random(count) * (2 * math.pi)
+        speed = circle.radius * 0.05
+        self.particles.emit(
+            circle.center.x + np.cos(angle) * circle.radius,
+            circle.center.y + np.sin(angle) * circle.radius,
+            np.cos(angle) * speed,
+            np.sin(angle) * speed,
+            1.5,
+            PURPLE,
+        )
+
+    def on_pick(self, sprite, event):
+        super().on_pick(sprite, event)
+        if sprite is not None:
+            self.logger("picked {player:", sprite.name, "}")
+
     def setup_basic_textures(self):
         pass
 
@@ -144,8 +207,7 @@ class MyBattleRoyale(TinyShapesBase):
                 texture=self.textures[name],
                 motion=Motion(direction=0, speed=0),
             )
-
-            self.grid.add_to_cell(obj=sprite, coords=sprite.position, layer="player")
+            # the bus drop puts players into the grid as they land
             self.players_by_name[sprite.name] = sprite
             self.players.add(sprite)
             self.sprites.append(sprite)
@@ -154,10 +216,13 @@ class MyBattleRoyale(TinyShapesBase):
         self.frame_no += 1
         self.draw_background()
         self.draw_players()
+        self.draw_pick_highlight()
         self.logger.draw(self.surface)
         self.difficulty_renderer().render(self.surface, Position(860, 0))
         self.draw_bus_path()
         self.draw_minimap_player_dots()
+        self.draw_safe_zone()
+        self.particles.render(self.surface, self.area, MINIMAP)
         self.draw_bus()
 
     def draw_players(self) -> None:
@@ -194,6 +259,20 @@ class MyBattleRoyale(TinyShapesBase):
                 pygame.Rect(x * 5, y * 5 + 400, 3, 3),
             )
 
+    def draw_safe_zone(self):
+        circle = self.safe_zone.circle
+        center = self.area_to_minimap(circle.center)
+        edge = self.area_to_minimap(
+            Position(circle.center.x + circle.radius, circle.center.y)
+        )
+        pygame.draw.circle(
+            self.surface,
+            WHITE,
+            (center.x, center.y),
+            max(1, edge.x - center.x),
+            width=1,
+        )
+
     def draw_minimap_player_dots(self):
         for player in self.players:
             area_coords = self.area_to_minimap(player.position)
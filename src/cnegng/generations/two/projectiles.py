@@ -0,0 +1,289 @@
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import numpy as np
+
+from cnegng.ACME.spatial2d import Position
+
+
+@dataclass
+class ProjectileHit:
+    """
+    A projectile striking something in the grid.
+
+    :param target: The object that was hit.
+    :param owner: Whoever fired the projectile.
+    :param damage: The projectile's damage.
+    :param time: Seconds into the step at which it struck.
+    :param position: Where the projectile was when it struck.
+    """
+
+    target: object
+    owner: object
+    damage: float
+    time: float
+    position: Position
+
+
+class ProjectileStore:
+    """
+    Every projectile in flight, held as arrays rather than one object each.
+
+    step() moves all of them at once and finds hits with swept tests: the box
+    around each projectile's path for the step goes to Grid.query_areas() for
+    every target layer in one call, and each candidate is tested against the
+    path in a single array expression, so a bullet cannot pass through a player
+    between frames. A projectile stops at its earliest hit and never hits whoever
+    fired it. Spent projectiles, hit or expired or off the map, are removed by
+    packing the survivors to the front of the arrays.
+
+    Like the grid's other batch queries, targets are seen at the positions of the
+    grid's layer snapshot; see Grid.bump_version() for objects moved in place.
+
+    .. code-block:: python
+
+        bullets = ProjectileStore(grid, layers=("player", "critter"))
+        bullets.fire(gun.position, vx, vy, ttl=2.0, owner=player, damage=12)
+        for hit in bullets.step(dt):
+            hit.target.take_damage(hit.damage)
+
+    Attributes
+    ----------
+    x, y, vx, vy : numpy.ndarray
+        Position and velocity of each projectile, first ``len(self)`` entries.
+    ttl : numpy.ndarray
+        Seconds each projectile has left.
+    damage : numpy.ndarray
+        Damage each projectile deals.
+    owner : numpy.ndarray
+        Object array of whoever fired each projectile.
+    """
+
+    _COLUMNS = ("x", "y", "vx", "vy", "ttl", "damage", "owner")
+
+    def __init__(
+        self,
+        grid=None,
+        layers: Sequence = ("player", "critter"),
+        hit_radius: float = 1.0,
+        capacity: int = 1024,
+    ):
+        """
+        :param grid: The grid holding the targets; without one nothing is ever hit.
+        :param layers: The grid layers that projectiles can hit.
+        :param hit_radius: Contact distance between a projectile and a target.
+            Targets are points, so it must be positive; size it to the targets.
+        :param capacity: Initial number of slots; the arrays grow as needed.
+        """
+        if hit_radius <= 0:
+            raise ValueError(f"hit_radius must be positive, got {hit_radius}")
+        self.grid = grid
+        self.layers = tuple(layers)
+        self.hit_radius = hit_radius
+        self.count = 0
+        capacity = max(1, capacity)
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.ttl = np.zeros(capacity)
+        self.damage = np.zeros(capacity)
+        self.owner = np.empty(capacity, dtype=object)
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return f"ProjectileStore({self.count} in flight, layers={self.layers})"
+
+    def _reserve(self, extra):
+        needed = self.count + extra
+        capacity = self.x.size
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in self._COLUMNS:
+            old = getattr(self, name)
+            grown = np.empty(capacity, dtype=old.dtype)
+            grown[: self.count] = old[: self.count]
+            setattr(self, name, grown)
+
+    def fire(
+        self, position: Position, vx: float, vy: float, ttl: float, owner=None, damage=0
+    ) -> None:
+        """Launch one projectile; see fire_many()."""
+        self.fire_many([position.x], [position.y], vx, vy, ttl, [owner], damage)
+
+    def fire_many(self, xs, ys, vxs, vys, ttls, owners=None, damage=0) -> None:
+        """
+        Launch many projectiles at once.
+
+        Apart from xs and ys, each argument takes one value per projectile or a
+        single shared value.
+
+        :param xs: Start x coordinates.
+        :param ys: Start y coordinates.
+        :param vxs: X velocities, in units per second.
+        :param vys: Y velocities, in units per second.
+        :param ttls: Seconds before each projectile expires.
+        :param owners: Whoever fired each projectile, a list the length of xs.
+        :param damage: Damage each projectile deals.
+        """
+        xs = np.asarray(xs, dtype=float)
+        count = xs.size
+        if count == 0:
+            return
+        self._reserve(count)
+        new = slice(self.count, self.count + count)
+        self.x[new] = xs
+        self.y[new] = ys
+        self.vx[new] = vxs
+        self.vy[new] = vys
+        self.ttl[new] = ttls
+        self.damage[new] = damage
+        owner = self.owner[new]
+        if owners is None:
+            owner.fill(None)
+        else:
+            owner[:] = list(owners)
+        self.count += count
+
+    def clear(self) -> None:
+        self.owner[: self.count] = None
+        self.count = 0
+
+    def step(self, dt: float) -> List[ProjectileHit]:
+        """
+        Move every projectile, resolve hits and drop the spent ones.
+
+        :param dt: Seconds to advance.
+        :return: The hits of this step, one at most per projectile.
+        """
+        count = self.count
+        if count == 0:
+            return []
+        x, y = self.x[:count], self.y[:count]
+        dx, dy = self.vx[:count] * dt, self.vy[:count] * dt
+        # a projectile expiring during the step only flies for the time it has left
+        flight = np.clip(self.ttl[:count] / dt, 0, 1) if dt > 0 else np.ones(count)
+        dx *= flight
+        dy *= flight
+
+        hits = []
+        spent = self.ttl[:count] <= dt
+        if self.grid is not None and self.layers:
+            struck, fraction, targets = self._sweep(x, y, dx, dy)
+            spent[struck] = True
+            for index, t, target in zip(struck.tolist(), fraction.tolist(), targets):
+                hits.append(
+                    ProjectileHit(
+                        target=target,
+                        owner=self.owner[index],
+                        damage=float(self.damage[index]),
+                        time=t * flight[index] * dt,
+                        position=Position(
+                            float(x[index] + t * dx[index]),
+                            float(y[index] + t * dy[index]),
+                        ),
+                    )
+                )
+        x += dx
+        y += dy
+        self.ttl[:count] -= dt
+        if self.grid is not None:
+            area = self.grid.area
+            if self.grid.wrap:
+                x[:] = area.left + (x - area.left) % area.width
+                y[:] = area.top + (y - area.top) % area.height
+            else:
+                spent |= (
+                    (x < area.left)
+                    | (x >= area.right)
+                    | (y < area.top)
+                    | (y >= area.bottom)
+                )
+        if spent.any():
+            self._compact(~spent)
+        return hits
+
+    def _sweep(self, x, y, dx, dy):
+        """
+        Earliest contact of each projectile's path with the target layers.
+
+        :return: (projectile indices, path fractions, targets) of the hits.
+        """
+        grid = self.grid
+        reach = self.hit_radius
+        end_x, end_y = x + dx, y + dy
+        lefts = np.minimum(x, end_x) - reach
+        rights = np.maximum(x, end_x) + reach
+        tops = np.minimum(y, end_y) - reach
+        bottoms = np.maximum(y, end_y) + reach
+
+        found_projectile, found_fraction, found_target = [], [], []
+        for layer in self.layers:
+            results = grid.query_areas(lefts, tops, rights, bottoms, layer)
+            if results.indices.size == 0:
+                continue
+            snapshot = grid.layer_snapshot(layer)
+            projectile = np.repeat(np.arange(x.size), results.counts())
+            member = results.indices
+            fx = x[projectile] - snapshot.xs[member]
+            fy = y[projectile] - snapshot.ys[member]
+            if grid.wrap:
+                width, height = grid.area.width, grid.area.height
+                fx = (fx + width / 2) % width - width / 2
+                fy = (fy + height / 2) % height - height / 2
+            px, py = dx[projectile], dy[projectile]
+            # first t in [0, 1] with |f + t p| <= reach
+            a = px * px + py * py
+            b = 2 * (fx * px + fy * py)
+            c = fx * fx + fy * fy - reach * reach
+            discriminant = b * b - 4 * a * c
+            root = np.sqrt(np.maximum(discriminant, 0))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t = np.where(a > 0, (-b - root) / (2 * a), np.inf)
+            touching = c <= 0
+            t = np.where(touching, 0.0, t)
+            hit = touching | ((discriminant >= 0) & (t >= 0) & (t <= 1))
+            if not hit.any():
+                continue
+            projectile, member, t = projectile[hit], member[hit], t[hit]
+            objects = results.objects
+            targets = [objects[index] for index in member.tolist()]
+            owners = self.owner[projectile].tolist()
+            not_own = np.fromiter(
+                (target is not owner for target, owner in zip(targets, owners)),
+                dtype=bool,
+                count=len(targets),
+            )
+            found_projectile.append(projectile[not_own])
+            found_fraction.append(t[not_own])
+            found_target.extend(
+                target for target, keep in zip(targets, not_own.tolist()) if keep
+            )
+
+        if not found_projectile:
+            return np.zeros(0, dtype=np.int64), np.zeros(0), []
+        projectile = np.concatenate(found_projectile)
+        fraction = np.concatenate(found_fraction)
+        # the earliest hit of each projectile
+        order = np.lexsort((fraction, projectile))
+        _, first = np.unique(projectile[order], return_index=True)
+        picked = order[first]
+        return (
+            projectile[picked],
+            fraction[picked],
+            [found_target[index] for index in picked.tolist()],
+        )
+
+    def _compact(self, keep):
+        """Pack the projectiles to keep into the front of the arrays."""
+        count = self.count
+        survivors = int(np.count_nonzero(keep))
+        for name in self._COLUMNS:
+            column = getattr(self, name)
+            column[:survivors] = column[:count][keep]
+        self.owner[survivors:count] = None
+        self.count = survivors
@@ -1,10 +1,17 @@
 import random
 from collections import defaultdict
 
+import numpy as np
+
+from cnegng.ACME.spatial2d.area import Area
+from cnegng.ACME.spatial2d.influence_map import InfluenceMap
+from cnegng.ACME.spatial2d.visibility import VisibilityMap
 from cnegng.generations.two.terrain import Terrain
 
 
 class RegionMap:
+    REGION_SIZE = 10000  # world units covered by one region along each axis
+
     def __init__(self, width, height):
         self.width = width
         self.height = height
@@ -97,10 +104,70 @@ class RegionMap:
     def terrain_at(self, position):
         # Return the terrain at a given (x, y) position
         x, y = position
-        grid_x = min(max(0, int(x / 10000)), self.width - 1)
-        grid_y = min(max(0, int(y / 10000)), self.height - 1)
+        grid_x = min(max(0, int(x / self.REGION_SIZE)), self.width - 1)
+        grid_y = min(max(0, int(y / self.REGION_SIZE)), self.height - 1)
         return self.map[grid_x][grid_y]
 
+    def difficulties(self):
+        """Difficulty of every region as an array indexed [x, y], like self.map."""
+        return np.array(
+            [[region.difficulty for region in column] for column in self.map]
+        )
+
+    def difficulty_at_many(self, xs, ys, table=None):
+        """
+        Difficulty at many world positions at once, clamped like terrain_at.
+
+        :param table: A difficulties() array to reuse across calls.
+        """
+        if table is None:
+            table = self.difficulties()
+        grid_x = np.clip(
+            (np.asarray(xs) / self.REGION_SIZE).astype(np.int64), 0, self.width - 1
+        )
+        grid_y = np.clip(
+            (np.asarray(ys) / self.REGION_SIZE).astype(np.int64), 0, self.height - 1
+        )
+        return table[grid_x, grid_y]
+
+    def influence_map(self, **kwargs):
+        """
+        An InfluenceMap with one cell per region.
+
+        Note the map's values are indexed [y, x] while self.map is indexed [x][y].
+        """
+        area = Area(
+            top=0,
+            left=0,
+            bottom=self.height * self.REGION_SIZE,
+            right=self.width * self.REGION_SIZE,
+        )
+        return InfluenceMap(area, self.width, self.height, **kwargs)
+
+    def visibility_map(self, teams=1, blocking=()):
+        """
+        A VisibilityMap with one cell per region.
+
+        :param teams: Number of teams.
+        :param blocking: Terrain types that block sight, e.g. ("forest",).
+        """
+        area = Area(
+            top=0,
+            left=0,
+            bottom=self.height * self.REGION_SIZE,
+            right=self.width * self.REGION_SIZE,
+        )
+        opaque = None
+        if blocking:
+            # the map's cells are indexed [row, col], i.e. [y, x]
+            opaque = np.array(
+                [
+                    [region.terrain_type in blocking for region in column]
+                    for column in self.map
+                ]
+            ).T
+        return VisibilityMap(area, self.width, self.height, teams=teams, opaque=opaque)
+
     def all_regions(self):
         """Generator to iterate over all regions in the map."""
         for grid_x in range(self.width):
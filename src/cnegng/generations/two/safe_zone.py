@@ -0,0 +1,188 @@
+import math
+import random
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+
+from cnegng.ACME.events.timed_event_handler import TimedEventHandler
+from cnegng.ACME.spatial2d import Circle, Position
+
+
+@dataclass
+class ZonePhase:
+    """
+    One step of the zone closing in.
+
+    :param wait: Seconds the zone holds still before this phase's shrink.
+    :param shrink_time: Seconds the shrink takes.
+    :param radius: Radius of the zone once the shrink is done.
+    :param damage_per_second: Damage to everyone outside during this phase.
+    """
+
+    wait: float
+    shrink_time: float
+    radius: float
+    damage_per_second: float
+
+
+# a match on the 1,000,000 unit map, about ten minutes to the last circle
+STANDARD_PHASES = [
+    ZonePhase(wait=60, shrink_time=60, radius=350_000, damage_per_second=1),
+    ZonePhase(wait=45, shrink_time=45, radius=180_000, damage_per_second=2),
+    ZonePhase(wait=40, shrink_time=40, radius=90_000, damage_per_second=5),
+    ZonePhase(wait=30, shrink_time=30, radius=40_000, damage_per_second=10),
+    ZonePhase(wait=20, shrink_time=30, radius=0, damage_per_second=20),
+]
+
+
+class SafeZone:
+    """
+    A circle that shrinks in phases and hurts everyone outside it.
+
+    The zone drives itself through a TimedEventHandler: after start() it ticks
+    every ``tick`` seconds, moving the circle along the current shrink and
+    applying damage. Each phase shrinks towards a random circle that fits inside
+    the current one.
+
+    Finding who is outside uses Grid.objects_outside_circle(), which skips the
+    cells inside the circle and takes the cells outside it wholesale, so a tick
+    costs about as much as the cells on the zone's edge. The damage of a tick goes
+    out in one call to ``apply_damage(objects, amount)``; by default it is added
+    up in ``damage_taken``.
+
+    .. code-block:: python
+
+        zone = SafeZone(grid, Circle(Position(500_000, 500_000), 700_000),
+                        STANDARD_PHASES, game.timed_event_handler, layer="player")
+        zone.start()
+
+    Attributes
+    ----------
+    circle : Circle
+        The current safe area.
+    phase : int
+        Index of the current phase; len(phases) once the last shrink is done.
+    shrinking : bool
+        Whether the circle is currently closing in.
+    damage_taken : defaultdict
+        Damage per object, when the default apply_damage is used.
+    """
+
+    def __init__(
+        self,
+        grid,
+        circle: Circle,
+        phases: Sequence[ZonePhase],
+        events: TimedEventHandler,
+        layer="default",
+        tick: float = 1.0,
+        apply_damage: Optional[Callable[[List, float], None]] = None,
+        seed=None,
+    ):
+        """
+        :param grid: The grid the players are in.
+        :param circle: The starting zone.
+        :param phases: The phases, in order.
+        :param events: The handler that schedules the phases and ticks.
+        :param layer: The grid layer holding the players.
+        :param tick: Seconds between damage ticks.
+        :param apply_damage: Called once per tick with (objects outside, damage each).
+        :param seed: Seed for where the zone moves to.
+        """
+        self.grid = grid
+        self.circle = Circle(circle.center.clone(), circle.radius)
+        self.phases = list(phases)
+        self.events = events
+        self.layer = layer
+        self.tick = tick
+        self.apply_damage = apply_damage or self._add_up_damage
+        self.random = random.Random(seed)
+        self.phase = 0
+        self.shrinking = False
+        self.running = False
+        self.damage_taken = defaultdict(float)
+        self._from = None
+        self._to = None
+        self._elapsed = 0.0
+
+    def __repr__(self):
+        return f"SafeZone({self.circle}, phase={self.phase})"
+
+    def start(self) -> None:
+        """Schedule the first phase and start ticking."""
+        self.running = True
+        self._schedule_phase()
+        self.events.add_event(self.tick, self._tick)
+
+    def stop(self) -> None:
+        """Stop ticking; already scheduled events do nothing."""
+        self.running = False
+
+    def damage_per_second(self) -> float:
+        if not self.phases:
+            return 0.0
+        return self.phases[min(self.phase, len(self.phases) - 1)].damage_per_second
+
+    def outside(self) -> list:
+        """Everyone currently outside the zone."""
+        return self.grid.objects_outside_circle(self.circle, self.layer)
+
+    def _schedule_phase(self):
+        if self.phase < len(self.phases):
+            self.events.add_event(self.phases[self.phase].wait, self._begin_shrink)
+
+    def _begin_shrink(self):
+        if not self.running:
+            return
+        target = self.phases[self.phase].radius
+        # the next circle lies wholly inside the current one
+        slack = max(self.circle.radius - target, 0)
+        angle = self.random.uniform(0, 2 * math.pi)
+        distance = slack * math.sqrt(self.random.random())
+        center = self.circle.center
+        self._from = Circle(center.clone(), self.circle.radius)
+        self._to = Circle(
+            Position(
+                center.x + distance * math.cos(angle),
+                center.y + distance * math.sin(angle),
+            ),
+            target,
+        )
+        self._elapsed = 0.0
+        self.shrinking = True
+
+    def _advance(self, dt):
+        if not self.shrinking:
+            return
+        phase = self.phases[self.phase]
+        self._elapsed += dt
+        done = phase.shrink_time <= 0 or self._elapsed >= phase.shrink_time
+        t = 1.0 if done else self._elapsed / phase.shrink_time
+        start, end = self._from, self._to
+        self.circle = Circle(
+            Position(
+                start.center.x + (end.center.x - start.center.x) * t,
+                start.center.y + (end.center.y - start.center.y) * t,
+            ),
+            start.radius + (end.radius - start.radius) * t,
+        )
+        if done:
+            self.shrinking = False
+            self.phase += 1
+            self._schedule_phase()
+
+    def _tick(self):
+        if not self.running:
+            return
+        self._advance(self.tick)
+        amount = self.damage_per_second() * self.tick
+        if amount > 0:
+            outside = self.outside()
+            if outside:
+                self.apply_damage(outside, amount)
+        self.events.add_event(self.tick, self._tick)
+
+    def _add_up_damage(self, objects, amount):
+        damage_taken = self.damage_taken
+        for obj in objects:
+            damage_taken[obj] += amount
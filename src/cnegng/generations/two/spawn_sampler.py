@@ -0,0 +1,108 @@
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from cnegng.ACME.alias_table import AliasTable
+from cnegng.ACME.spatial2d import Position
+from cnegng.generations.two.region import RegionMap
+
+
+def more_loot_when_harder(difficulty):
+    """Loot weight: grows with difficulty."""
+    return np.asarray(difficulty, dtype=float)
+
+
+def fewer_players_when_deadlier(difficulty):
+    """Player weight: highest in easy regions, near zero in the deadliest."""
+    return np.maximum(10 - np.asarray(difficulty, dtype=float), 0.5)
+
+
+class SpawnSampler:
+    """
+    Random spawn positions weighted by RegionMap difficulty.
+
+    Every region gets a weight from its difficulty; an AliasTable over the regions
+    picks one per sample in constant time, and the position is spread uniformly
+    inside the picked region.
+
+    .. code-block:: python
+
+        loot = SpawnSampler(region_map, more_loot_when_harder, seed=3)
+        xs, ys = loot.draw(5_000)
+        # after regions changed difficulty
+        loot.refresh([(4, 7), (4, 8)])
+    """
+
+    def __init__(
+        self,
+        region_map: RegionMap,
+        weight_for_difficulty: Callable,
+        block_size: int = 256,
+        seed=None,
+    ):
+        """
+        :param region_map: The map to spawn on.
+        :param weight_for_difficulty: Maps an array of difficulties to weights.
+        :param block_size: Passed to AliasTable.
+        :param seed: Seed for reproducible spawns.
+        """
+        self.region_map = region_map
+        self.weight_for_difficulty = weight_for_difficulty
+        self.rng = np.random.default_rng(seed)
+        self._columns = len(region_map.map[0])
+        self.table = AliasTable(
+            self._weights(region_map.difficulties().ravel()),
+            block_size=block_size,
+            seed=self.rng,
+        )
+
+    def __repr__(self):
+        return f"SpawnSampler({len(self.table)} regions)"
+
+    def _weights(self, difficulties):
+        weights = np.asarray(self.weight_for_difficulty(difficulties), dtype=float)
+        return np.broadcast_to(weights, np.shape(difficulties))
+
+    def draw(self, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Draw count spawn positions at once.
+
+        :return: (xs, ys) arrays in world units.
+        """
+        cells = self.table.draw(count)
+        grid_x, grid_y = np.divmod(cells, self._columns)
+        size = self.region_map.REGION_SIZE
+        xs = (grid_x + self.rng.random(count)) * size
+        ys = (grid_y + self.rng.random(count)) * size
+        return xs, ys
+
+    def draw_positions(self, count: int) -> List[Position]:
+        xs, ys = self.draw(count)
+        return [Position(x, y) for x, y in zip(xs.tolist(), ys.tolist())]
+
+    def refresh(self, regions: Optional[Iterable[Tuple[int, int]]] = None) -> int:
+        """
+        Pick up difficulty changes in the map.
+
+        Only regions whose weight actually changed are passed on to the table,
+        which rebuilds just the blocks holding them.
+
+        :param regions: The (x, y) regions that changed; all of them by default.
+        :return: Number of regions whose weight changed.
+        """
+        if regions is None:
+            cells = np.arange(len(self.table))
+            difficulties = self.region_map.difficulties().ravel()
+        else:
+            regions = list(regions)
+            cells = np.array(
+                [x * self._columns + y for x, y in regions], dtype=np.int64
+            )
+            difficulties = np.array(
+                [self.region_map.map[x][y].difficulty for x, y in regions]
+            )
+        weights = self._weights(difficulties)
+        changed = weights != self.table.weights[cells]
+        if changed.any():
+            self.table.update(cells[changed], weights[changed])
+        return int(np.count_nonzero(changed))
@@ -15,6 +15,7 @@ class Sprite:
         self.motion = motion  # Motion vector or movement logic
         self.texture = texture  # Visual representation
         self.layer = layer  # Rendering layer
+        self.owning_cell = None  # Grid cell holding the sprite, if any
         self.enemies = set()  # Set of enemies currently interacting with
         self.lookers = set()  # why you over there looking at me
         self.nearby_friends = set()
@@ -0,0 +1,134 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from cnegng.ACME.spatial2d import Area, Position
+from cnegng.ACME.spatial2d.body_solver import CircleSolver, pairs_from_results
+from cnegng.ACME.spatial2d.grid import Grid, GridSize
+
+
+class Body:
+    def __init__(self, x, y):
+        self.owning_cell = None
+        self.position = Position(x, y)
+
+
+def all_pairs(count):
+    a, b = np.triu_indices(count, k=1)
+    return a, b
+
+
+def overlaps(xs, ys, radius):
+    a, b = all_pairs(xs.size)
+    return np.maximum(2 * radius - np.hypot(xs[b] - xs[a], ys[b] - ys[a]), 0)
+
+
+def test_two_bodies_are_pushed_apart_evenly():
+    solver = CircleSolver(iterations=1, relaxation=1.0)
+    xs, ys = solver.solve([0, 6], [0, 0], 5, [0], [1])
+    assert xs.tolist() == pytest.approx([-2, 8])
+    assert ys.tolist() == [0, 0]
+
+
+def test_pinned_body_does_not_move():
+    solver = CircleSolver(iterations=1, relaxation=1.0)
+    xs, _ = solver.solve([0, 6], [0, 0], 5, [0], [1], inverse_mass=[0, 1])
+    assert xs.tolist() == pytest.approx([0, 10])
+
+
+def test_coincident_bodies_separate():
+    solver = CircleSolver(iterations=4, relaxation=1.0)
+    xs, ys = solver.solve([5, 5], [5, 5], 1, [0], [1])
+    assert math.hypot(xs[1] - xs[0], ys[1] - ys[0]) == pytest.approx(2)
+
+
+def test_dense_pile_relaxes_without_blowing_up():
+    random.seed(3)
+    count = 100
+    xs = np.array([random.uniform(0, 60) for _ in range(count)])
+    ys = np.array([random.uniform(0, 60) for _ in range(count)])
+    a, b = all_pairs(count)
+    solver = CircleSolver(iterations=8)
+    before = overlaps(xs, ys, 3).sum()
+    for _ in range(10):
+        xs, ys = solver.solve(xs, ys, 3, a, b)
+    assert overlaps(xs, ys, 3).sum() < before * 0.05
+    # nothing gets flung far away
+    assert xs.min() > -20 and xs.max() < 80
+
+
+def test_wrapped_world_pushes_across_the_seam():
+    world = Area(top=0, left=0, bottom=100, right=100)
+    xs, ys = CircleSolver(iterations=1, relaxation=1.0).solve(
+        [1, 99], [50, 50], 2, [0], [1], world=world
+    )
+    assert xs[0] == pytest.approx(2)
+    assert xs[1] == pytest.approx(98)
+
+
+def test_solve_layer_separates_grid_objects():
+    grid = Grid(Area(top=0, left=0, bottom=100, right=100), GridSize(10, 10))
+    bodies = [Body(50, 50), Body(51, 50), Body(10, 10)]
+    for body in bodies:
+        grid.add_to_cell(body, coords=body.position)
+    version = grid.version
+    moved = CircleSolver(iterations=4, relaxation=1.0).solve_layer(grid, radius=2)
+    assert moved == 2
+    assert grid.version > version
+    gap = bodies[1].position.x - bodies[0].position.x
+    assert gap == pytest.approx(4)
+    assert (bodies[2].position.x, bodies[2].position.y) == (10, 10)
+
+
+def test_pairs_from_results_deduplicates():
+    class Results:
+        offsets = np.array([0, 2, 4, 5])
+        indices = np.array([0, 1, 0, 1, 2])
+
+    a, b = pairs_from_results(Results)
+    assert list(zip(a.tolist(), b.tolist())) == [(0, 1)]
+
+
+def test_bounds_keep_bodies_inside():
+    bounds = Area(top=0, left=0, bottom=100, right=100)
+    xs, ys = CircleSolver(iterations=1, relaxation=1.0).solve(
+        [1, 3], [99, 99], 4, [0], [1], bounds=bounds
+    )
+    # the left body stops at the wall instead of being pushed past it
+    assert xs[0] == 0 and xs[1] == pytest.approx(6)
+    assert 0 <= ys.min() and ys.max() < 100
+
+
+def test_solve_layer_keeps_walled_bodies_in_the_grid():
+    grid = Grid(Area(top=0, left=0, bottom=100, right=100), GridSize(10, 10))
+    bodies = [Body(99, 99), Body(99.5, 99.5), Body(0.5, 50), Body(0, 50)]
+    for body in bodies:
+        grid.add_to_cell(body, coords=body.position)
+    CircleSolver(iterations=4).solve_layer(grid, radius=3)
+    for body in bodies:
+        assert grid.area.contains(body.position)
+        assert body.owning_cell is grid.cell_at(grid.to_coords(body.position))
+
+
+def test_solve_layer_keeps_integer_coordinates():
+    grid = Grid(
+        Area(top=0, left=0, bottom=1024, right=1024),
+        GridSize(16, 16),
+        integer_coords=True,
+    )
+    bodies = [Body(500, 500), Body(502, 500), Body(1023, 1023), Body(1022, 1023)]
+    for body in bodies:
+        grid.add_to_cell(body, coords=body.position)
+    version = grid.version
+    moved = CircleSolver(iterations=4, relaxation=1.0).solve_layer(grid, radius=10)
+    # the body in the corner is already against both walls
+    assert moved == 3
+    assert (bodies[2].position.x, bodies[2].position.y) == (1023, 1023)
+    assert grid.version > version
+    for body in bodies:
+        assert type(body.position.x) is int and type(body.position.y) is int
+        assert body.position.x < 1024 and body.position.y < 1024
+        assert body.owning_cell is grid.cell_at(grid.to_coords(body.position))
+    assert bodies[1].position.x - bodies[0].position.x == 20
@@ -0,0 +1,127 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from cnegng.ACME.spatial2d import Position
+from cnegng.ACME.spatial2d.clustering import DensityClusters, connected_roots
+
+
+def brute_force(items, eps, min_points):
+    """Reference DBSCAN: returns a set of frozensets (clusters) and the noise set."""
+
+    def near(a, b):
+        return (
+            math.dist((a.position.x, a.position.y), (b.position.x, b.position.y)) <= eps
+        )
+
+    core = {a for a in items if sum(near(a, b) for b in items) >= min_points}
+    clusters, seen = [], set()
+    for start in core:
+        if start in seen:
+            continue
+        group, stack = set(), [start]
+        seen.add(start)
+        while stack:
+            a = stack.pop()
+            group.add(a)
+            for b in core:
+                if b not in seen and near(a, b):
+                    seen.add(b)
+                    stack.append(b)
+        clusters.append(group)
+    return clusters, core
+
+
+@pytest.fixture
+def world(make_grid, demo_item):
+    """Three blobs of 40 items each, and 40 items of noise."""
+    random.seed(1)
+    grid = make_grid(cells=20)
+    items = []
+    for cx, cy in [(200, 200), (700, 300), (400, 800)]:
+        for _ in range(40):
+            items.append(
+                demo_item(Position(cx + random.gauss(0, 20), cy + random.gauss(0, 20)))
+            )
+    for _ in range(40):
+        items.append(
+            demo_item(Position(random.uniform(0, 999), random.uniform(0, 999)))
+        )
+    for item in items:
+        grid.add_to_cell(item, coords=item.position)
+    return grid, items
+
+
+def check_against_brute_force(clusters, items, eps, min_points):
+    expected, core = brute_force(items, eps, min_points)
+    labels = {obj: clusters.label_of(obj) for obj in items}
+    for group in expected:
+        assert len({labels[obj] for obj in group}) == 1
+        assert labels[next(iter(group))] != -1
+    assert len({labels[next(iter(group))] for group in expected}) == len(expected)
+    for obj in items:
+        if obj in core:
+            continue
+        label = labels[obj]
+        if label == -1:
+            assert not any(
+                math.dist(
+                    (obj.position.x, obj.position.y), (c.position.x, c.position.y)
+                )
+                <= eps
+                for c in core
+            )
+
+
+def test_connected_roots():
+    parent = connected_roots(6, np.array([0, 3, 4]), np.array([1, 4, 5]))
+    assert parent.tolist() == [0, 0, 2, 3, 3, 3]
+
+
+def test_clusters_match_brute_force(world):
+    grid, items = world
+    clusters = DensityClusters(grid, eps=25, min_points=4)
+    clusters.update()
+    check_against_brute_force(clusters, items, 25, 4)
+    assert len(clusters.clusters()) >= 3
+
+
+def test_incremental_update_matches_full_recompute(world):
+    grid, items = world
+    clusters = DensityClusters(grid, eps=25, min_points=4)
+    clusters.update()
+    random.seed(4)
+    for item in random.sample(items, 10):
+        item.position = Position(random.uniform(0, 999), random.uniform(0, 999))
+    grid.bump_version()
+    clusters.update()
+    check_against_brute_force(clusters, items, 25, 4)
+
+    fresh = DensityClusters(grid, eps=25, min_points=4)
+    fresh.update()
+    assert np.array_equal(
+        clusters.labels >= 0,
+        np.array([fresh.label_of(obj) >= 0 for obj in clusters.objects]),
+    )
+
+
+def test_labels_stay_stable_when_clusters_drift(world):
+    grid, items = world
+    clusters = DensityClusters(grid, eps=25, min_points=4)
+    clusters.update()
+    before = {obj: clusters.label_of(obj) for obj in items}
+    for item in items[:40]:
+        item.position = Position(item.position.x + 3, item.position.y)
+    grid.bump_version()
+    clusters.update()
+    for obj in items[40:120]:
+        assert clusters.label_of(obj) == before[obj]
+
+
+def test_update_without_changes_is_cached(world):
+    grid, _ = world
+    clusters = DensityClusters(grid, eps=25, min_points=4)
+    labels = clusters.update()
+    assert clusters.update() is labels
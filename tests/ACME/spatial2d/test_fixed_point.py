@@ -0,0 +1,143 @@
+import random
+
+import numpy as np
+import pytest
+
+from cnegng.ACME.spatial2d import Area, Circle, FixedPoint, Position
+from cnegng.ACME.spatial2d.fixed_point import distance_sq, within
+from cnegng.ACME.spatial2d.grid import Grid, GridSize, GridTuner
+
+WORLD = Area(top=0, left=0, bottom=1000, right=1000)
+
+
+@pytest.fixture
+def build(make_grid, scatter):
+    def build(cells=16, wrap=False, count=400, seed=3):
+        fixed = FixedPoint(bits=8)
+        grid = make_grid(cells, fixed.area(WORLD), wrap=wrap, integer_coords=True)
+        items = scatter(count, seed)
+        for item in items:
+            item.position = fixed.position(item.position)
+            grid.add_to_cell(item, coords=item.position)
+        return fixed, grid, items
+
+    return build
+
+
+def test_conversions_round_to_nearest_sub_unit():
+    fixed = FixedPoint(bits=4)
+    assert fixed.scale == 16
+    assert fixed.to_fixed(1.5) == 24
+    assert fixed.to_fixed(1.0 / 32) == 1
+    assert fixed.to_fixed(-1.0 / 32) == 0
+    assert fixed.to_float(24) == 1.5
+    assert fixed.to_fixed_array([1.5, -2.0, 1.0 / 32]).tolist() == [24, -32, 1]
+    assert fixed.to_fixed_array([1.5]).dtype == np.int64
+    area = fixed.area(WORLD)
+    assert (area.left, area.top, area.right, area.bottom) == (0, 0, 16000, 16000)
+    circle = fixed.circle(Circle(Position(2, 3), 0.5))
+    assert (circle.center.x, circle.center.y, circle.radius) == (32, 48, 8)
+
+
+def test_negative_bits_are_rejected():
+    with pytest.raises(ValueError):
+        FixedPoint(bits=-1)
+
+
+def test_squared_distances_are_integers():
+    assert distance_sq(Position(0, 0), Position(3, 4)) == 25
+    assert within(Position(0, 0), Position(3, 4), 5)
+    assert not within(Position(0, 0), Position(3, 5), 5)
+
+
+def test_integer_grid_needs_whole_cells():
+    with pytest.raises(ValueError):
+        Grid(
+            Area(top=0, left=0, bottom=100, right=100),
+            GridSize(3, 4),
+            integer_coords=True,
+        )
+    with pytest.raises(ValueError):
+        Grid(
+            Area(top=0, left=0.5, bottom=100, right=100.5),
+            GridSize(4, 4),
+            integer_coords=True,
+        )
+
+
+def test_cell_lookup_uses_shift_or_divide(build):
+    _, grid, _ = build(cells=16)  # 16000 / 16: not a power of two
+    assert grid._shift_x is None
+    assert grid.to_coords(Position(15999, 16000)).x == 0
+    assert grid.to_coords(Position(16000, 16000)).x == 1
+
+    shifted = Grid(
+        Area(top=0, left=0, bottom=4096, right=4096),
+        GridSize(16, 16),
+        integer_coords=True,
+    )
+    assert shifted._shift_x == 8
+    coords = shifted.to_coords(Position(255, 256))
+    assert (coords.x, coords.y) == (0, 1)
+
+
+def test_wrapped_integer_grid_wraps_cells():
+    grid = Grid(
+        Area(top=0, left=0, bottom=4096, right=4096),
+        GridSize(16, 16),
+        wrap=True,
+        integer_coords=True,
+    )
+    coords = grid.to_coords(Position(-1, 4096 + 300))
+    assert (coords.x, coords.y) == (15, 1)
+
+
+def test_circle_queries_match_exact_integer_distances(build):
+    fixed, grid, items = build()
+    circle = fixed.circle(Circle(Position(500, 500), 120))
+    expected = {
+        id(item)
+        for item in items
+        if distance_sq(item.position, circle.center) <= circle.radius**2
+    }
+    assert {id(obj) for obj in grid.objects_in_circle(circle)} == expected
+    area = fixed.area(Area(top=100, left=200, bottom=300, right=450))
+    expected = {id(item) for item in items if area.contains(item.position)}
+    assert {id(obj) for obj in grid.objects_in_area(area)} == expected
+
+
+@pytest.mark.parametrize("wrap", [False, True])
+def test_batched_queries_agree_with_single_queries(wrap, build):
+    fixed, grid, items = build(wrap=wrap)
+    random.seed(5)
+    circles = [
+        fixed.circle(
+            Circle(
+                Position(random.uniform(0, 1000), random.uniform(0, 1000)),
+                random.uniform(5, 150),
+            )
+        )
+        for _ in range(40)
+    ]
+    snapshot = grid.layer_snapshot("default")
+    assert snapshot.xs.dtype == np.int64
+    results = grid.query_many(circles)
+    for index, circle in enumerate(circles):
+        assert {id(obj) for obj in results[index]} == {
+            id(obj) for obj in grid.objects_in_circle(circle)
+        }
+
+
+def test_tuner_keeps_cells_whole(build):
+    _, grid, _ = build()
+    tuner = GridTuner(grid, min_queries=1, max_cells=64)
+    for _ in range(4):
+        list(grid.objects_in_circle(Circle(Position(8000, 8000), 800)))
+    recommended = tuner.recommend()
+    assert grid.area.width % recommended.width == 0
+    assert grid.area.height % recommended.height == 0
+    tuner.maybe_rebuild()
+    if tuner.rebuild is not None:
+        tuner.rebuild.finish()
+    assert grid.area.width % grid.cell_width == 0
+    assert isinstance(grid.cell_width, int)
@@ -0,0 +1,180 @@
+import math
+
+import numpy as np
+import pytest
+
+from cnegng.ACME.spatial2d import Area, Circle, Motion, Position
+from cnegng.ACME.spatial2d.flocking import Flock
+from cnegng.ACME.spatial2d.grid import Grid, GridSize
+
+
+class Agent:
+    def __init__(self, x, y, motion=None):
+        self.position = Position(x, y)
+        self.motion = motion or Motion(0, 0)
+
+
+WORLD = Area(top=0, left=0, bottom=1000, right=1000)
+
+
+def flock_of(agents, **kwargs):
+    kwargs.setdefault("max_speed", 50)
+    kwargs.setdefault("max_force", 100)
+    return Flock(WORLD, agents, neighbour_radius=100, **kwargs)
+
+
+def test_isolated_agents_do_not_steer():
+    flock = flock_of([Agent(100, 100), Agent(800, 800)], separation_radius=50)
+    ax, ay = flock.steering()
+    assert ax.tolist() == [0, 0]
+    assert ay.tolist() == [0, 0]
+
+
+def test_alignment_brings_headings_together():
+    agents = [
+        Agent(500 + i * 10, 500, Motion(direction=i * 0.4, speed=40)) for i in range(5)
+    ]
+    flock = flock_of(agents, separation_radius=20)
+    flock.weights.update(cohesion=0, separation=0)
+    spread = np.std(np.arctan2(flock.vys, flock.vxs))
+    for _ in range(20):
+        flock.step(0.1)
+    assert np.std(np.arctan2(flock.vys, flock.vxs)) < spread / 2
+
+
+def test_separation_pushes_close_agents_apart():
+    flock = flock_of([Agent(500, 500), Agent(504, 500)], separation_radius=40)
+    flock.weights.update(cohesion=0, alignment=0)
+    for _ in range(10):
+        flock.step(0.1)
+    assert flock.xs[1] - flock.xs[0] > 4
+
+
+def test_seek_and_flee():
+    flock = flock_of([Agent(100, 100), Agent(900, 900)])
+    flock.seek([0], Position(200, 100))
+    flock.flee([1], Position(850, 900))
+    for _ in range(10):
+        flock.step(0.1)
+    assert flock.xs[0] > 100
+    assert flock.ys[0] == pytest.approx(100)
+    assert flock.xs[1] > 900
+    flock.clear_targets()
+    assert np.isnan(flock.seek_x).all()
+
+
+def test_speed_is_limited():
+    flock = flock_of([Agent(500, 500, Motion(0, 500))])
+    flock.step(0.1)
+    assert math.hypot(flock.vxs[0], flock.vys[0]) == pytest.approx(50)
+
+
+def in_grid(grid, agents, layer="default"):
+    for agent in agents:
+        grid.add_to_cell(agent, coords=agent.position, layer=layer)
+    return agents
+
+
+def test_wrapped_neighbours_across_the_seam():
+    grid = Grid(WORLD, GridSize(10, 10), wrap=True)
+    agents = in_grid(grid, [Agent(5, 500), Agent(995, 500)])
+    flock = Flock.for_grid(grid, agents, neighbour_radius=100, max_speed=50)
+    flock.weights.update(separation=0, alignment=0)
+    ax, _ = flock.steering()
+    # each is pulled towards the other across the seam, not across the world
+    assert ax[0] < 0 < ax[1]
+    flock.step(1.0)
+    assert flock.xs[0] > 900
+
+
+def test_write_back_updates_agents():
+    agents = [Agent(100, 100, Motion(0, 10))]
+    flock = flock_of(agents)
+    flock.step(1.0)
+    flock.write_back(motions=True)
+    assert agents[0].position.x == pytest.approx(flock.xs[0])
+    assert agents[0].motion.speed == pytest.approx(10)
+
+
+@pytest.mark.parametrize("wrap", [False, True])
+def test_grid_flock_finds_neighbours_through_the_grid(wrap):
+    grid = Grid(WORLD, GridSize(10, 10), wrap=wrap)
+    rng = np.random.default_rng(4)
+    agents = in_grid(
+        grid,
+        [
+            Agent(x, y, Motion(direction, 20))
+            for x, y, direction in rng.random((300, 3)) * (1000, 1000, 6)
+        ],
+        layer="critter",
+    )
+    flock = Flock.for_grid(grid, agents, separation_radius=30, layer="critter")
+    assert flock.neighbour_radius == 100
+    (count, off_x, _, sum_vx, _), (close, sep_x, sep_y, _, _) = flock._neighbourhoods()
+
+    def offset(a, b):
+        delta = b - a
+        return (delta + 500) % 1000 - 500 if wrap else delta
+
+    def block_apart(a, b):
+        gap = abs(a - b)
+        return min(gap, 10 - gap) if wrap else gap
+
+    for index, agent in enumerate(agents):
+        cell = agent.owning_cell.grid_coord
+        block = [
+            other
+            for other in agents
+            if other is not agent
+            and block_apart(other.owning_cell.grid_coord.x, cell.x) <= 1
+            and block_apart(other.owning_cell.grid_coord.y, cell.y) <= 1
+        ]
+        assert count[index] == len(block)
+        assert off_x[index] == pytest.approx(
+            sum(offset(agent.position.x, other.position.x) for other in block)
+        )
+        assert sum_vx[index] == pytest.approx(
+            sum(other.motion.velocity()[0] for other in block)
+        )
+        near = [
+            other
+            for other in agents
+            if other is not agent
+            and math.hypot(
+                offset(agent.position.x, other.position.x),
+                offset(agent.position.y, other.position.y),
+            )
+            <= 30
+        ]
+        assert close[index] == len(near)
+        assert sep_x[index] == pytest.approx(
+            sum(offset(agent.position.x, other.position.x) for other in near)
+        )
+        assert sep_y[index] == pytest.approx(
+            sum(offset(agent.position.y, other.position.y) for other in near)
+        )
+    assert close.sum() > 0
+
+
+def test_grid_flock_neighbour_radius_is_bounded_by_the_cells():
+    grid = Grid(WORLD, GridSize(10, 10))
+    with pytest.raises(ValueError):
+        Flock.for_grid(grid, [], neighbour_radius=150)
+
+
+def test_write_back_rebins_agents_in_the_grid():
+    grid = Grid(WORLD, GridSize(10, 10))
+    agents = in_grid(
+        grid, [Agent(95, 500, Motion(0, 50)), Agent(500, 995, Motion(0, 0))]
+    )
+    flock = Flock.for_grid(grid, agents, neighbour_radius=50, max_speed=50)
+    flock.vys[1] = 50
+    before = grid.layer_snapshot()
+    flock.step(1.0)
+    flock.write_back()
+    assert agents[0].owning_cell is grid.cells[5][1]
+    # kept inside the last row rather than on the edge no cell owns
+    assert agents[1].owning_cell is grid.cells[9][5]
+    assert agents[1].position.y < 1000
+    assert grid.layer_snapshot() is not before
+    assert set(grid.objects_in_circle(Circle(Position(145, 500), 1))) == {agents[0]}
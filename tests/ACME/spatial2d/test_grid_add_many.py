@@ -0,0 +1,102 @@
+import pytest
+
+from cnegng.ACME.spatial2d import Area, Position
+from cnegng.ACME.spatial2d.grid import GridSize
+
+
+def cell_of(item):
+    return item.owning_cell.grid_coord.x, item.owning_cell.grid_coord.y
+
+
+def cells_after_add_to_cell(grid, items):
+    for item in items:
+        grid.add_to_cell(item, coords=item.position, layer="player")
+    cells = [cell_of(item) for item in items]
+    for item in items:
+        item.owning_cell.object_container.remove(item, layer="player")
+    return cells
+
+
+@pytest.mark.parametrize(
+    "grid_kwargs, scatter_kwargs",
+    [
+        (dict(cells=GridSize(12, 7)), dict()),
+        (dict(wrap=True), dict(low=-500, high=1500)),
+        (
+            dict(cells=16, area=Area(0, 0, 1024, 1024), integer_coords=True),
+            dict(high=1023, whole=True),
+        ),
+    ],
+    ids=["plain", "wrap", "integer"],
+)
+def test_add_many_uses_the_cells_of_add_to_cell(
+    grid_kwargs, scatter_kwargs, make_grid, scatter
+):
+    items = scatter(500, seed=11, **scatter_kwargs)
+    expected = cells_after_add_to_cell(make_grid(**grid_kwargs), items)
+    grid = make_grid(**grid_kwargs)
+    grid.add_many(items, layer="player")
+    assert [cell_of(item) for item in items] == expected
+    held = [
+        obj
+        for row in grid.cells
+        for cell in row
+        for obj in cell.object_container.get_all("player")
+    ]
+    assert sorted(map(id, held)) == sorted(map(id, items))
+
+
+def test_add_many_takes_positions_as_arrays(grid, demo_item):
+    items = [demo_item(Position(0, 0)) for _ in range(3)]
+    grid.add_many(items, xs=[5, 505, 995], ys=[5, 5, 995])
+    assert [cell_of(item) for item in items] == [(0, 0), (5, 0), (9, 9)]
+
+
+def test_add_many_bumps_the_version_once(grid, scatter):
+    before = grid.version
+    grid.add_many(scatter(100, seed=11))
+    assert grid.version == before + 1
+
+
+def test_add_many_refuses_owned_or_outside_objects(grid, add_item, demo_item):
+    owned = add_item(grid, 10, 10)
+    loose = demo_item(Position(20, 20))
+    with pytest.raises(ValueError):
+        grid.add_many([loose, owned])
+    with pytest.raises(ValueError):
+        grid.add_many([loose, demo_item(Position(1500, 20))])
+    # nothing was added by the failed calls
+    assert loose.owning_cell is None
+
+
+def test_rebin_many_moves_only_objects_that_left_their_cell(grid, populate, scatter):
+    items = populate(grid, 300, seed=4, layer="player")
+    old_cells = [cell_of(item) for item in items]
+    # the first 100 move in place, the rest stay put
+    for item, moved in zip(items[:100], scatter(100, seed=5)):
+        item.position = moved.position
+    expected = [
+        (coord.x, coord.y) for coord in map(grid.to_coords, (i.position for i in items))
+    ]
+    before = grid.version
+    moved = grid.rebin_many(items, layer="player")
+    assert [cell_of(item) for item in items] == expected
+    assert moved == sum(old != new for old, new in zip(old_cells, expected)) > 0
+    assert grid.version == before + 1
+    held = [
+        obj
+        for row in grid.cells
+        for cell in row
+        for obj in cell.object_container.get_all("player")
+    ]
+    assert sorted(map(id, held)) == sorted(map(id, items))
+
+
+def test_rebin_many_refuses_loose_or_outside_objects(grid, add_item, demo_item):
+    item = add_item(grid, 10, 10)
+    with pytest.raises(ValueError):
+        grid.rebin_many([item, demo_item(Position(20, 20))])
+    item.position = Position(1500, 10)
+    with pytest.raises(ValueError):
+        grid.rebin_many([item])
+    assert cell_of(item) == (0, 0)
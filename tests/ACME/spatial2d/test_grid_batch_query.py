@@ -0,0 +1,83 @@
+import random
+
+import numpy as np
+import pytest
+
+from cnegng.ACME.spatial2d import Area, Circle, Position
+
+
+@pytest.fixture
+def build(make_grid, populate):
+    def build(wrap=False):
+        grid = make_grid(cells=16, wrap=wrap)
+        populate(grid, 500, seed=7)
+        return grid
+
+    return build
+
+
+def random_shapes(count=60, seed=9):
+    random.seed(seed)
+    shapes = []
+    for index in range(count):
+        x, y = random.uniform(-50, 1050), random.uniform(-50, 1050)
+        if index % 2:
+            shapes.append(Circle(Position(x, y), random.uniform(1, 120)))
+        else:
+            w, h = random.uniform(1, 200), random.uniform(1, 200)
+            shapes.append(Area(top=y, left=x, bottom=y + h, right=x + w))
+    return shapes
+
+
+def single(grid, shape):
+    if isinstance(shape, Circle):
+        return set(grid.objects_in_circle(shape))
+    return set(grid.objects_in_area(shape))
+
+
+@pytest.mark.parametrize("wrap", [False, True])
+def test_query_many_matches_single_queries(wrap, build):
+    grid = build(wrap=wrap)
+    shapes = random_shapes()
+    results = grid.query_many(shapes)
+    assert len(results) == len(shapes)
+    for index, shape in enumerate(shapes):
+        hits = results[index]
+        assert len(hits) == len(set(hits))
+        assert set(hits) == single(grid, shape)
+
+
+def test_query_many_csr_layout(build):
+    grid = build()
+    shapes = random_shapes(count=10)
+    results = grid.query_many(shapes)
+    assert results.offsets[0] == 0
+    assert results.offsets[-1] == results.indices.size
+    assert np.all(np.diff(results.offsets) >= 0)
+    assert results.counts().tolist() == [len(results[i]) for i in range(len(shapes))]
+
+
+def test_query_circles_with_shared_radius(build):
+    grid = build()
+    xs = np.array([100.0, 500.0, 900.0])
+    ys = np.array([100.0, 500.0, 900.0])
+    results = grid.query_circles(xs, ys, 75.0)
+    for index in range(3):
+        circle = Circle(Position(xs[index], ys[index]), 75.0)
+        assert set(results[index]) == single(grid, circle)
+
+
+def test_query_many_empty(build):
+    grid = build()
+    results = grid.query_many([])
+    assert len(results) == 0
+    assert results.indices.size == 0
+
+
+def test_snapshot_reused_until_version_changes(build, add_item):
+    grid = build()
+    snapshot = grid.layer_snapshot()
+    assert grid.layer_snapshot() is snapshot
+    add_item(grid, 5, 5)
+    assert grid.layer_snapshot() is not snapshot
+    assert len(grid.layer_snapshot()) == 501
@@ -0,0 +1,62 @@
+import pytest
+
+from cnegng.ACME.spatial2d import Area, Circle, Position
+
+
+class Chest:
+    def __init__(self, name):
+        self.name = name
+
+
+def test_extent_is_registered_in_every_overlapped_cell(grid):
+    chest = Chest("big")
+    grid.add_with_extent(chest, Area(150, 150, 360, 260))
+    cells = [
+        cell for row in grid.cells for cell in row if cell.extent_container.size() > 0
+    ]
+    assert len(cells) == 3 * 2
+
+
+def test_queries_report_an_extent_once(grid):
+    chest = Chest("big")
+    grid.add_with_extent(chest, Area(150, 150, 360, 260))
+    assert list(grid.objects_in_area(Area(0, 0, 1000, 1000))) == [chest]
+    assert list(grid.objects_in_circle(Circle(Position(500, 500), 500))) == [chest]
+
+
+def test_query_hits_an_extent_whose_position_is_outside(grid):
+    """The query only touches the edge of the object, not its centre."""
+    chest = Chest("wide")
+    grid.add_with_extent(chest, Circle(Position(500, 500), 120))
+    assert list(grid.objects_in_area(Area(390, 600, 410, 620))) == []
+    assert list(grid.objects_in_area(Area(600, 490, 650, 510))) == [chest]
+    assert list(grid.objects_in_circle(Circle(Position(700, 500), 90))) == [chest]
+    assert list(grid.objects_in_area(Area(600, 490, 650, 510), layer="other")) == []
+
+
+def test_move_and_remove_extent(grid):
+    chest = Chest("moving")
+    grid.add_with_extent(chest, Area(10, 10, 20, 20))
+    grid.move_extent(chest, Area(810, 810, 990, 990))
+    assert grid.extent_of(chest).left == 810
+    assert list(grid.objects_in_area(Area(0, 0, 50, 50))) == []
+    assert list(grid.objects_in_area(Area(900, 900, 950, 950))) == [chest]
+    assert list(grid.all_objects()) == [chest]
+    grid.remove_extent(chest)
+    assert list(grid.objects_in_area(Area(0, 0, 1000, 1000))) == []
+    assert all(cell.extent_container.size() == 0 for row in grid.cells for cell in row)
+
+
+def test_adding_an_extent_twice_raises(grid):
+    chest = Chest("dupe")
+    grid.add_with_extent(chest, Area(10, 10, 20, 20))
+    with pytest.raises(ValueError):
+        grid.add_with_extent(chest, Area(10, 10, 20, 20))
+
+
+def test_sweep_hits_extents(grid):
+    wall = Chest("wall")
+    grid.add_with_extent(wall, Area(top=0, left=480, bottom=1000, right=520))
+    hit = grid.first_contact(Position(100, 300), Position(900, 300), radius=10)
+    assert hit.obj is wall
+    assert hit.position.x == pytest.approx(470)
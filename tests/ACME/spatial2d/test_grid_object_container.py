@@ -65,3 +65,11 @@ class TestObjectContainer:
         container.add(mock_object, layer=4)
         all_objects = container.get_all(layer=4)
         assert mock_object in all_objects
+
+    def test_container_without_owner_tracking(self, owner, mock_object):
+        first = ObjectContainer(owner=owner, owner_attr_name=None)
+        second = ObjectContainer(owner=owner, owner_attr_name=None)
+        first.add(mock_object, layer=1)
+        second.add(mock_object, layer=1)
+        assert mock_object.owner is None
+        assert list(second.iter_layer(1)) == [mock_object]
@@ -0,0 +1,55 @@
+import pytest
+
+from cnegng.ACME.spatial2d import Circle, Position
+
+
+@pytest.fixture
+def populated_grid(make_grid, populate):
+    grid = make_grid(cells=20)
+    return grid, populate(grid, 2_000, seed=5, layer="player", high=999)
+
+
+def test_objects_outside_circle_matches_brute_force(populated_grid):
+    grid, items = populated_grid
+    circle = Circle(Position(400, 550), 300)
+    expected = {
+        id(item) for item in items if not circle.contains_position(item.position)
+    }
+    found = grid.objects_outside_circle(circle, layer="player")
+    assert len(found) == len(expected)
+    assert {id(obj) for obj in found} == expected
+
+
+def test_only_edge_cells_are_tested_one_by_one(populated_grid):
+    grid, _ = populated_grid
+    circle = Circle(Position(500, 500), 300)
+    inside, outside = grid.classify_cells(circle, margin=1)
+    assert inside[10, 10] and outside[0, 0]
+    # the margin widens the band of edge cells
+    tight_inside, tight_outside = grid.classify_cells(circle)
+    assert (tight_inside >= inside).all() and (tight_outside >= outside).all()
+    assert (tight_inside | tight_outside).sum() > (inside | outside).sum()
+    edge = ~(inside | outside)
+    per_cell = [
+        grid.cells[row][col].object_container.size("player")
+        for row, col in zip(*edge.nonzero())
+    ]
+    grid.stats.reset()
+    grid.objects_outside_circle(circle, layer="player")
+    assert grid.stats.candidates == sum(per_cell)
+    assert grid.stats.candidates < 2_000 / 2
+
+
+def test_objects_moved_in_place_across_the_edge(make_grid, add_item):
+    grid = make_grid(cells=20)
+    circle = Circle(Position(500, 500), 300)
+    # binned in a cell wholly outside the circle, then walked back into the zone
+    returning = add_item(grid, 560, 190, layer="player")
+    # binned in a cell wholly inside, then drifted out
+    leaving = add_item(grid, 520, 255, layer="player")
+    inside, outside = grid.classify_cells(circle)
+    assert outside[3, 11] and inside[5, 10]
+    returning.position = Position(555, 210)
+    leaving.position = Position(520, 200.5)
+    found = grid.objects_outside_circle(circle, layer="player")
+    assert found == [leaving]
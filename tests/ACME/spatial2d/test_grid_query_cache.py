@@ -0,0 +1,75 @@
+import pytest
+
+from cnegng.ACME.spatial2d import Area, Circle, Position
+from cnegng.ACME.spatial2d.grid import QueryCache
+
+
+@pytest.fixture
+def grid(make_grid, add_item):
+    grid = make_grid(query_cache_size=4)
+    for x in range(50, 1000, 100):
+        add_item(grid, x, 500)
+    return grid
+
+
+def test_repeated_query_is_served_from_cache(grid):
+    circle = Circle(Position(500, 500), 120)
+    first = grid.cached_objects_in_circle(circle)
+    second = grid.cached_objects_in_circle(Circle(Position(500, 500), 120))
+    assert first is second
+    assert len(first) == 2
+    assert grid.query_cache.hits == 1
+    assert grid.query_cache.misses == 1
+
+
+def test_mutation_bumps_version_and_invalidates(grid, add_item):
+    area = Area(0, 0, 1000, 1000)
+    before = grid.cached_objects_in_area(area)
+    version = grid.version
+    item = add_item(grid, 10, 10)
+    assert grid.version > version
+    after = grid.cached_objects_in_area(area)
+    assert len(after) == len(before) + 1
+    item.owning_cell.remove(item)
+    assert len(grid.cached_objects_in_area(area)) == len(before)
+    assert grid.query_cache.hits == 0
+
+
+def test_layer_is_part_of_the_key(grid):
+    area = Area(0, 0, 1000, 1000)
+    assert len(grid.cached_objects_in_area(area)) == 10
+    assert grid.cached_objects_in_area(area, layer="other") == ()
+
+
+def test_cache_is_bounded():
+    cache = QueryCache(maxsize=2)
+    for key in ("a", "b", "a", "c"):
+        cache.get(key, lambda: [key])
+    assert len(cache) == 2
+    assert cache.hits == 1
+    assert cache.hit_rate() == pytest.approx(0.25)
+    cache.get("b", lambda: ["b"])
+    assert cache.misses == 4  # "b" was the least recently used and got evicted
+
+
+def test_cache_hits_across_frames_until_the_grid_changes(grid, add_item):
+    area = Area(0, 0, 1000, 1000)
+    chests = Area(top=400, left=0, bottom=600, right=300)
+
+    def frame():
+        # readers only; nothing moves
+        return grid.cached_objects_in_area(chests), grid.cached_objects_in_area(area)
+
+    first = frame()
+    for _ in range(4):
+        assert frame() == first
+    assert grid.query_cache.misses == 2
+    assert grid.query_cache.hits == 8
+    # rebinning through the grid moves the version on by itself
+    mover = add_item(grid, 950, 950)
+    mover.owning_cell.remove(mover)
+    mover.position = Position(150, 450)
+    grid.add_to_cell(mover, coords=mover.position)
+    chests_now, _ = frame()
+    assert mover in chests_now
+    assert grid.query_cache.misses == 4
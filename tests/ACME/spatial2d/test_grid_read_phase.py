@@ -0,0 +1,123 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cnegng.ACME.spatial2d import Area, Circle, Position
+from cnegng.ACME.spatial2d.grid import GridPhaseError
+
+
+@pytest.fixture
+def grid(make_grid, populate, demo_item):
+    grid = make_grid()
+    populate(grid, 500, seed=7, high=999)
+    for index in range(20):
+        grid.add_with_extent(demo_item(None), Circle(Position(index * 50, 500), 80))
+    return grid
+
+
+def test_mutation_inside_read_phase_raises(grid, demo_item):
+    item = demo_item(Position(5, 5))
+    with grid.read_phase() as epoch:
+        assert epoch == 1
+        with pytest.raises(GridPhaseError):
+            grid.add_to_cell(item, coords=item.position)
+        with pytest.raises(GridPhaseError):
+            grid.bump_version()
+    grid.add_to_cell(item, coords=item.position)
+    with grid.read_phase() as epoch:
+        assert epoch == 2
+
+
+def test_read_phase_waits_for_a_write_in_progress(make_grid, demo_item):
+    grid = make_grid()
+    item = demo_item(Position(5, 5))
+    writing = threading.Event()
+    finish = threading.Event()
+    seen = []
+
+    def writer():
+        with grid.write_phase():
+            writing.set()
+            finish.wait(5)
+            grid.add_to_cell(item, coords=item.position)
+
+    def reader():
+        with grid.read_phase():
+            corner = Area(top=0, left=0, bottom=10, right=10)
+            seen.append(item in set(grid.objects_in_area(corner)))
+
+    write_thread = threading.Thread(target=writer)
+    write_thread.start()
+    assert writing.wait(5)
+    read_thread = threading.Thread(target=reader)
+    read_thread.start()
+    read_thread.join(0.2)
+    # the reader is held at the door while the writer is mid-write
+    assert read_thread.is_alive() and seen == []
+    finish.set()
+    write_thread.join(5)
+    read_thread.join(5)
+    assert seen == [True]
+
+
+def test_write_from_another_thread_during_read_phase_raises(make_grid):
+    grid = make_grid()
+    errors = []
+
+    def writer():
+        try:
+            grid.bump_version()
+        except GridPhaseError as error:
+            errors.append(error)
+
+    version = grid.version
+    with grid.read_phase():
+        write_thread = threading.Thread(target=writer)
+        write_thread.start()
+        write_thread.join(5)
+    assert len(errors) == 1 and grid.version == version
+    with grid.write_phase():
+        with pytest.raises(GridPhaseError):
+            with grid.read_phase():
+                pass
+
+
+def test_query_batch_matches_serial_queries(grid):
+    shapes = [
+        Circle(Position(x, y), 120) for x in range(0, 1000, 150) for y in (100, 500)
+    ] + [Area(0, 0, 300, 300), Area(450, 0, 550, 1000)]
+    expected = [
+        set(
+            grid.objects_in_circle(shape)
+            if isinstance(shape, Circle)
+            else grid.objects_in_area(shape)
+        )
+        for shape in shapes
+    ]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = grid.query_batch(shapes, executor=executor, max_workers=4)
+    assert [set(result) for result in results] == expected
+    assert all(len(result) == len(set(result)) for result in results)
+    assert not grid.phases.reading
+
+
+def test_read_phase_stats_are_merged_when_it_closes(grid):
+    shapes = [Circle(Position(x, 500), 90) for x in range(0, 1000, 40)]
+    grid.stats.reset()
+    for shape in shapes:
+        list(grid.objects_in_circle(shape))
+    queries, candidates = grid.stats.queries, grid.stats.candidates
+    grid.stats.reset()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        grid.query_batch(shapes, executor=executor, max_workers=4)
+    assert (grid.stats.queries, grid.stats.candidates) == (queries, candidates)
+
+
+def test_layer_snapshot_is_built_once_per_version_across_readers(grid):
+    with grid.read_phase():
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            snapshots = list(
+                executor.map(lambda _: grid.layer_snapshot("default"), range(32))
+            )
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
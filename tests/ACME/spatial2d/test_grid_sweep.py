@@ -0,0 +1,66 @@
+import pytest
+
+from cnegng.ACME.spatial2d import Position
+from cnegng.ACME.spatial2d.grid.sweep import contact_fraction, segment_cells
+
+
+def test_segment_cells_walks_in_order():
+    cells = [
+        (col, row)
+        for col, row, _, _ in segment_cells(
+            Position(50, 50), Position(350, 50), 100, 100, 10, 10
+        )
+    ]
+    assert cells == [(0, 0), (1, 0), (2, 0), (3, 0)]
+
+
+def test_segment_cells_clips_to_lattice():
+    cells = list(
+        segment_cells(Position(-500, 150), Position(150, 150), 100, 100, 10, 10)
+    )
+    assert [(col, row) for col, row, _, _ in cells] == [(0, 1), (1, 1)]
+    assert cells[0][2] == pytest.approx(500 / 650)
+
+
+def test_contact_fraction():
+    assert contact_fraction(Position(0, 0), 100, 0, Position(50, 0), 10) == 0.4
+    assert contact_fraction(Position(0, 0), 100, 0, Position(50, 20), 10) is None
+    assert contact_fraction(Position(0, 0), 100, 0, Position(5, 0), 10) == 0.0
+
+
+def test_fast_mover_does_not_tunnel(grid, add_item):
+    """A point that crosses most of the map in one frame still hits what is in between."""
+    target = add_item(grid, 505, 500)
+    hit = grid.first_contact(
+        Position(0, 500), Position(990, 500), dt=0.5, object_radius=10
+    )
+    assert hit.obj is target
+    assert hit.fraction == pytest.approx(495 / 990)
+    assert hit.time == pytest.approx(hit.fraction * 0.5)
+    assert hit.position.x == pytest.approx(495)
+
+
+def test_sweep_orders_hits_and_respects_layers(grid, add_item):
+    far = add_item(grid, 800, 510)
+    near = add_item(grid, 200, 490)
+    add_item(grid, 500, 500, layer="other")
+    add_item(grid, 500, 700)  # well off the path
+    hits = grid.sweep(Position(0, 500), Position(1000, 500), radius=20)
+    assert [hit.obj for hit in hits] == [near, far]
+
+
+def test_circle_reaches_into_neighbouring_cells(grid, add_item):
+    beside = add_item(grid, 450, 590)  # next row of cells, within the swept radius
+    hit = grid.first_contact(Position(100, 510), Position(900, 510), radius=85)
+    assert hit is not None and hit.obj is beside
+
+
+def test_first_contact_ignores_the_mover(grid, add_item):
+    mover = add_item(grid, 100, 100)
+    assert grid.first_contact(mover.position, Position(900, 100), ignore=mover) is None
+
+
+def test_cells_along_path_only_visits_swept_cells(grid):
+    cells = list(grid.cells_along_path(Position(50, 60), Position(950, 960)))
+    assert len(cells) == 19
+    assert all(cell.grid_coord.y - cell.grid_coord.x in (0, 1) for cell in cells)
@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from cnegng.ACME.spatial2d import Circle, Position
+from cnegng.ACME.spatial2d.grid import GridRebuild, GridSize, GridTuner
+
+
+@pytest.fixture
+def grid(make_grid, populate):
+    grid = make_grid(cells=4)
+    populate(grid, 2000, seed=11, high=999)
+    return grid
+
+
+def run_queries(grid, count=50, radius=20):
+    for _ in range(count):
+        center = Position(random.uniform(0, 1000), random.uniform(0, 1000))
+        list(grid.objects_in_circle(Circle(center, radius)))
+
+
+def test_grid_records_query_statistics(grid):
+    run_queries(grid, count=10, radius=20)
+    assert grid.stats.queries == 10
+    assert grid.stats.mean_extent() == (40, 40)
+    assert grid.stats.mean_candidates() > 100  # coarse cells hold ~125 objects each
+
+
+def test_tuner_recommends_finer_cells_for_small_queries(grid):
+    tuner = GridTuner(grid, target_candidates=16)
+    assert tuner.recommend() is None  # not enough data yet
+    run_queries(grid)
+    recommended = tuner.recommend()
+    assert recommended.width == recommended.height
+    assert 15 <= recommended.width <= 30
+
+
+def test_rebuild_is_spread_over_steps_and_keeps_every_object(grid):
+    before = set(grid.all_objects())
+    rebuild = GridRebuild(grid, GridSize(20, 20), rows_per_step=5, cells_per_step=4)
+    steps = 0
+    while not rebuild.step():
+        steps += 1
+        # the old cells keep answering queries until the switch
+        assert len(grid.cells) == 4
+    assert steps > 4
+    assert grid.grid_size == GridSize(20, 20)
+    assert set(grid.all_objects()) == before
+    for item in before:
+        assert item.owning_cell is grid.cell_at(grid.to_coords(item.position))
+    assert grid.rebuild is None
+
+
+def test_changes_during_a_rebuild_are_carried_over(grid, add_item):
+    rebuild = GridRebuild(grid, GridSize(10, 10), cells_per_step=16)
+    while len(rebuild._staged) == 0:
+        rebuild.step()
+    moved = next(iter(grid.cells[0][0].all_members()))
+    moved.owning_cell.remove(moved)
+    moved.position = Position(990, 990)
+    grid.add_to_cell(moved, coords=moved.position)
+    extra = add_item(grid, 5, 5)
+    rebuild.finish()
+    assert moved.owning_cell is grid.cells[9][9]
+    assert extra.owning_cell is grid.cells[0][0]
+    assert len(list(grid.all_objects())) == 2001
+
+
+def test_tuner_runs_the_rebuild(grid):
+    tuner = GridTuner(grid, target_candidates=16, rows_per_step=100, cells_per_step=100)
+    run_queries(grid)
+    assert tuner.maybe_rebuild()
+    assert not tuner.maybe_rebuild()  # already rebuilding
+    for _ in range(3):
+        tuner.step()
+    assert tuner.rebuild is None
+    assert grid.grid_size.width > 4
+    run_queries(grid)
+    assert grid.stats.mean_candidates() < 40
@@ -0,0 +1,115 @@
+import math
+
+import numpy as np
+import pytest
+
+from cnegng.ACME.spatial2d import Area, Circle, Position
+from cnegng.ACME.spatial2d.grid.torus import min_image
+
+
+def torus_distance(a, b, size=1000):
+    return math.hypot(min_image(a.x - b.x, size), min_image(a.y - b.y, size))
+
+
+@pytest.fixture
+def wrapped(make_grid, populate):
+    grid = make_grid(wrap=True)
+    return grid, populate(grid, 300, seed=3)
+
+
+@pytest.fixture
+def flat(make_grid, populate):
+    grid = make_grid()
+    return grid, populate(grid, 300, seed=3)
+
+
+def test_circle_query_crosses_the_corner(wrapped):
+    grid, items = wrapped
+    circle = Circle(Position(10, 990), 120)
+    expected = {
+        item for item in items if torus_distance(item.position, circle.center) <= 120
+    }
+    found = list(grid.objects_in_circle(circle))
+    assert len(found) == len(expected)
+    assert set(found) == expected
+    assert any(item.position.x > 500 or item.position.y < 500 for item in expected)
+
+
+def test_area_query_crosses_the_seam(wrapped):
+    grid, items = wrapped
+    area = Area(top=400, left=-100, bottom=600, right=80)
+    expected = {
+        item
+        for item in items
+        if 400 <= item.position.y <= 600
+        and (item.position.x <= 80 or item.position.x >= 900)
+    }
+    assert set(grid.objects_in_area(area)) == expected
+
+
+def test_extent_straddling_the_seam(wrapped, demo_item):
+    grid, _ = wrapped
+    chest = demo_item(None)
+    grid.add_with_extent(chest, Circle(Position(995, 500), 30), layer="chests")
+    assert list(grid.objects_in_circle(Circle(Position(40, 500), 20), "chests")) == [
+        chest
+    ]
+    assert list(grid.objects_in_area(Area(480, -10, 520, 10), "chests")) == [chest]
+
+
+@pytest.mark.parametrize("origin", [Position(5, 5), Position(500, 500)])
+def test_nearest_uses_minimum_image(wrapped, origin):
+    grid, items = wrapped
+    expected = min(items, key=lambda item: torus_distance(item.position, origin))
+    found, distance = grid.nearest(origin)
+    assert found is expected
+    assert distance == pytest.approx(torus_distance(expected.position, origin))
+
+
+def test_nearest_without_wrap(flat):
+    grid, items = flat
+    origin = Position(5, 5)
+    expected = min(items, key=lambda item: item.position.distance(origin))
+    assert grid.nearest(origin)[0] is expected
+    assert grid.nearest(origin, max_distance=0.001) == (None, 0.001)
+
+
+@pytest.mark.parametrize("radius", [40, 150])
+def test_pairs_within_wrap(wrapped, radius):
+    grid, items = wrapped
+    expected = {
+        frozenset((a, b))
+        for index, a in enumerate(items)
+        for b in items[index + 1 :]
+        if torus_distance(a.position, b.position) <= radius
+    }
+    pairs = [frozenset(pair) for pair in grid.pairs_within(radius)]
+    assert len(pairs) == len(expected)
+    assert set(pairs) == expected
+
+
+def test_pairs_within_flat(flat):
+    grid, items = flat
+    expected = {
+        frozenset((a, b))
+        for index, a in enumerate(items)
+        for b in items[index + 1 :]
+        if a.position.distance(b.position) <= 60
+    }
+    pairs = [frozenset(pair) for pair in grid.pairs_within(60)]
+    assert len(pairs) == len(expected)
+    assert set(pairs) == expected
+
+
+def test_positions_outside_the_world_are_binned_wrapped(wrapped, add_item):
+    grid, _ = wrapped
+    item = add_item(grid, -5, 1005)
+    assert item.owning_cell is grid.cells[0][9]
+
+
+def test_min_image_of_arrays_keeps_integers_exact():
+    deltas = np.array([900, -900, 3, 500], dtype=np.int64)
+    offsets = min_image(deltas, 1000)
+    assert offsets.dtype == np.int64
+    assert offsets.tolist() == [-100, 100, 3, -500]
+    assert min_image(np.array([900.5, -0.5]), 1000).tolist() == [-99.5, -0.5]
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from cnegng.ACME.spatial2d import Area, InfluenceMap, Position
+from cnegng.ACME.spatial2d.grid import Grid, GridSize
+
+
+@pytest.fixture
+def field():
+    return InfluenceMap(Area(top=0, left=0, bottom=100, right=100), cols=10, rows=10)
+
+
+def test_for_grid_matches_grid():
+    grid = Grid(
+        Area(top=0, left=0, bottom=500, right=1000), GridSize(20, 10), wrap=True
+    )
+    field = InfluenceMap.for_grid(grid)
+    assert field.values.shape == (10, 20)
+    assert field.wrap
+
+
+def test_stamp_and_sample(field):
+    field.stamp(Position(55, 25), 3.0)
+    assert field.values[2, 5] == 3.0
+    assert field.sample(Position(51, 29)) == 3.0
+    assert field.sample(Position(5, 5)) == 0.0
+
+
+def test_stamp_many_accumulates_in_one_call(field):
+    field.stamp_many([15, 15, 85], [15, 15, 85], [1.0, 2.0, 4.0])
+    assert field.values[1, 1] == 3.0
+    assert field.values[8, 8] == 4.0
+
+
+def test_stamp_with_radius_falls_off(field):
+    field.stamp(Position(55, 55), 1.0, radius=20)
+    assert field.values[5, 5] == pytest.approx(1.0)
+    assert field.values[5, 6] == pytest.approx(0.5)
+    assert field.values[5, 7] == 0.0
+    assert field.values[5, 8] == 0.0
+
+
+def test_decay_halves_after_half_life(field):
+    field.stamp(Position(55, 55), 8.0)
+    field.decay(dt=1.0, half_life=1.0)
+    field.decay(dt=0.5, half_life=0.5)
+    assert field.values[5, 5] == pytest.approx(2.0)
+
+
+def test_diffuse_spreads_and_conserves(field):
+    field.stamp(Position(55, 55), 10.0)
+    field.diffuse(rate=0.5, steps=3)
+    assert field.values[5, 6] > 0
+    assert field.values[5, 5] < 10.0
+    assert field.values.sum() == pytest.approx(10.0)
+
+
+def test_diffuse_wraps_around_edges():
+    field = InfluenceMap(
+        Area(top=0, left=0, bottom=100, right=100), cols=10, rows=10, wrap=True
+    )
+    field.stamp(Position(5, 5), 1.0)
+    field.diffuse(rate=1.0)
+    assert field.values[0, 9] > 0
+    assert field.values[9, 0] > 0
+
+
+def test_sample_many_interpolates_between_centres(field):
+    field.values[0, 0] = 0.0
+    field.values[0, 1] = 1.0
+    samples = field.sample_many(np.array([5.0, 10.0, 15.0]), np.array([5.0] * 3), True)
+    assert samples.tolist() == pytest.approx([0.0, 0.5, 1.0])
+
+
+def test_peak(field):
+    field.stamp(Position(75, 35), 2.0)
+    position, value = field.peak()
+    assert (position.x, position.y, value) == (75, 35, 2.0)
@@ -0,0 +1,79 @@
+import math
+
+import pytest
+
+from cnegng.ACME.spatial2d import Area, Circle, Position
+from cnegng.ACME.spatial2d.packed_rtree import PackedRTree
+
+
+@pytest.fixture
+def items_in_world(scatter):
+    def items_in_world(count):
+        return scatter(count, seed=2, high=1000)
+
+    return items_in_world
+
+
+@pytest.mark.parametrize("count", [0, 1, 15, 16, 17, 300, 5000])
+def test_area_query_matches_brute_force(count, items_in_world):
+    items = items_in_world(count)
+    tree = PackedRTree(items)
+    assert len(tree) == count
+    area = Area(top=200, left=300, bottom=450, right=700)
+    assert set(tree.objects_in_area(area)) == {
+        item for item in items if area.contains(item.position)
+    }
+
+
+def test_circle_query_matches_brute_force(items_in_world):
+    items = items_in_world(3000)
+    tree = PackedRTree(items, node_size=8)
+    circle = Circle(Position(500, 500), 120)
+    found = tree.objects_in_circle(circle)
+    assert len(found) == len(set(found))
+    assert set(found) == {
+        item for item in items if circle.contains_position(item.position)
+    }
+
+
+def test_query_visits_few_nodes(items_in_world):
+    items = items_in_world(5000)
+    tree = PackedRTree(items)
+    tree.objects_in_circle(Circle(Position(500, 500), 20))
+    assert tree.node_visits < 200
+
+
+def test_nearest_matches_brute_force(items_in_world):
+    items = items_in_world(2000)
+    tree = PackedRTree(items)
+    target = Position(123, 456)
+
+    def distance(item):
+        return math.hypot(item.position.x - target.x, item.position.y - target.y)
+
+    found = tree.nearest(target, count=5)
+    expected = sorted(items, key=distance)[:5]
+    assert [obj for obj, _ in found] == expected
+    assert found[0][1] == pytest.approx(distance(expected[0]))
+
+
+def test_nearest_respects_max_distance(demo_item):
+    tree = PackedRTree([demo_item(Position(0, 0))])
+    assert tree.nearest(Position(100, 0), max_distance=50) == []
+
+
+def test_extents_are_tested_exactly(demo_item):
+    disc = demo_item(Position(100, 100))
+    box = demo_item(Position(300, 300))
+    tree = PackedRTree(
+        [disc, box],
+        extents=[
+            Circle(Position(100, 100), 50),
+            Area(top=280, left=280, bottom=320, right=320),
+        ],
+    )
+    # touches the circle's bounding box corner but not the circle
+    assert tree.objects_in_area(Area(top=0, left=0, bottom=60, right=60)) == []
+    assert tree.objects_in_area(Area(top=0, left=0, bottom=70, right=70)) == [disc]
+    assert tree.objects_in_circle(Circle(Position(340, 300), 25)) == [box]
+    assert tree.nearest(Position(100, 200))[0] == (disc, pytest.approx(50))
@@ -0,0 +1,101 @@
+import random
+import time
+
+import pytest
+
+from cnegng.ACME.spatial2d import Area, Picker, Position
+
+
+class FakeTexture:
+    def __init__(self, width, height):
+        self.size = (width, height)
+
+    def get_size(self):
+        return self.size
+
+
+WORLD = Area(top=0, left=0, bottom=1_000_000, right=1_000_000)
+SCREEN = Area(top=0, left=0, bottom=1000, right=2000)
+
+
+@pytest.fixture
+def sprite(demo_item):
+    """sprite(position, size=(24, 24)): an item drawn with a texture of that size."""
+
+    def sprite(position, size=(24, 24)):
+        item = demo_item(position)
+        item.texture = FakeTexture(*size)
+        return item
+
+    return sprite
+
+
+@pytest.fixture
+def make_picker(make_grid):
+    def make_picker(items, wrap=False, **kwargs):
+        grid = make_grid(20, WORLD, wrap=wrap)
+        for item in items:
+            grid.add_to_cell(item, coords=item.position)
+        kwargs.setdefault("max_size", (24, 24))
+        return Picker(grid, WORLD, SCREEN, **kwargs)
+
+    return make_picker
+
+
+def test_screen_to_world_inverts_scale_by(make_picker):
+    picker = make_picker([])
+    world = Position(123_456, 654_321)
+    back = picker.screen_to_world(picker.to_screen(world))
+    assert back.x == pytest.approx(world.x)
+    assert back.y == pytest.approx(world.y)
+
+
+def test_pick_hits_the_texture_rectangle(sprite, make_picker):
+    item = sprite(Position(500_000, 500_000))  # drawn from screen (1000, 500)
+    picker = make_picker([item])
+    assert picker.pick(Position(1000.5, 500.5)) is item
+    assert picker.pick(Position(1023.5, 523.5)) is item
+    assert picker.pick(Position(999.5, 510)) is None
+    assert picker.pick(Position(1024.5, 510)) is None
+
+
+def test_pick_uses_each_texture_size(sprite, make_picker):
+    small = sprite(Position(500_000, 500_000), size=(4, 4))
+    picker = make_picker([small])
+    assert picker.pick(Position(1002, 502)) is small
+    assert picker.pick(Position(1010, 510)) is None
+
+
+def test_topmost_follows_draw_order(sprite, make_picker):
+    below = sprite(Position(500_000, 500_000))
+    above = sprite(Position(500_005, 500_005))
+    rank = {below: 0, above: 1}
+    picker = make_picker([above, below], draw_order=rank.get)
+    assert picker.pick_all(Position(1010, 510)) == [below, above]
+    assert picker.pick(Position(1010, 510)) is above
+    rank[below], rank[above] = 1, 0
+    assert picker.pick(Position(1010, 510)) is below
+
+
+def test_wrapped_images_are_not_picked(sprite, make_picker):
+    # drawn at the right edge of the screen, not at the left
+    item = sprite(Position(999_995, 1_000))
+    picker = make_picker([item], wrap=True)
+    assert picker.pick(Position(5, 5)) is None
+    assert picker.pick(Position(1999.995, 2.5)) is item
+
+
+def test_picking_at_full_scale_is_fast(sprite, make_picker):
+    random.seed(4)
+    items = [sprite(WORLD.random_position_inside()) for _ in range(20_000)]
+    picker = make_picker(
+        items, draw_order={item: i for i, item in enumerate(items)}.get
+    )
+    points = [
+        Position(random.uniform(0, 2000), random.uniform(0, 1000)) for _ in range(200)
+    ]
+    start = time.perf_counter()
+    for point in points:
+        picker.pick(point)
+    per_pick = (time.perf_counter() - start) / len(points)
+    assert per_pick < 0.001
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from cnegng.ACME.spatial2d import Area
+from cnegng.ACME.spatial2d.poisson_disk import PoissonDiskSampler
+
+
+def min_spacing(xs, ys, radii=None):
+    """Smallest distance between two points, relative to the spacing they need."""
+    dx = xs[:, None] - xs[None, :]
+    dy = ys[:, None] - ys[None, :]
+    distance = np.hypot(dx, dy)
+    if radii is not None:
+        distance = distance / np.maximum(radii[:, None], radii[None, :])
+    np.fill_diagonal(distance, np.inf)
+    return distance.min()
+
+
+AREA = Area(top=0, left=0, bottom=1000, right=2000)
+
+
+def test_points_keep_their_distance_and_stay_inside():
+    xs, ys = PoissonDiskSampler(AREA, 40, seed=1).sample()
+    assert min_spacing(xs, ys) >= 40
+    assert xs.min() >= 0 and xs.max() < 2000
+    assert ys.min() >= 0 and ys.max() < 1000
+
+
+def test_sample_fills_the_area():
+    xs, ys = PoissonDiskSampler(AREA, 40, seed=2).sample()
+    # a maximal sample leaves no gap that could take another point
+    assert len(xs) >= 0.55 * AREA.width * AREA.height / 40**2
+    gx, gy = np.meshgrid(np.arange(10, 2000, 20), np.arange(10, 1000, 20))
+    gaps = np.hypot(
+        gx.ravel()[:, None] - xs[None, :], gy.ravel()[:, None] - ys[None, :]
+    ).min(axis=1)
+    assert gaps.max() < 2 * 40
+
+
+def test_same_seed_same_sample():
+    first = PoissonDiskSampler(AREA, 50, seed=3).sample()
+    second = PoissonDiskSampler(AREA, 50, seed=3).sample()
+    assert np.array_equal(first[0], second[0])
+    assert np.array_equal(first[1], second[1])
+
+
+def test_count_picks_a_subset():
+    sampler = PoissonDiskSampler(AREA, PoissonDiskSampler.radius_for(AREA, 300), seed=4)
+    xs, ys = sampler.sample(300)
+    assert len(xs) == 300
+    assert min_spacing(xs, ys) >= sampler.radius
+
+
+def test_spacing_can_vary():
+    def spacing(xs, ys):
+        return np.where(xs < 1000, 30.0, 90.0)
+
+    sampler = PoissonDiskSampler(AREA, 30, spacing=spacing, max_radius=90, seed=5)
+    xs, ys = sampler.sample()
+    assert min_spacing(xs, ys, spacing(xs, ys)) >= 1
+    left = np.count_nonzero(xs < 1000)
+    assert left > 4 * (len(xs) - left)
+
+
+def test_bad_arguments():
+    with pytest.raises(ValueError):
+        PoissonDiskSampler(AREA, 0)
+    with pytest.raises(ValueError):
+        PoissonDiskSampler(AREA, 10, spacing=lambda xs, ys: xs)
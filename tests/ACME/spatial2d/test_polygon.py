@@ -0,0 +1,84 @@
+import random
+
+import numpy as np
+import pytest
+
+from cnegng.ACME.spatial2d import Area, Polygon, Position
+
+
+@pytest.fixture
+def square():
+    return Polygon(
+        [Position(100, 100), Position(300, 100), Position(300, 300), Position(100, 300)]
+    )
+
+
+@pytest.fixture
+def notch():
+    # a U shape: the region between x 40 and 60 above y 60 is cut out
+    return Polygon(
+        [
+            Position(0, 0),
+            Position(40, 0),
+            Position(40, 60),
+            Position(60, 60),
+            Position(60, 0),
+            Position(100, 0),
+            Position(100, 100),
+            Position(0, 100),
+        ]
+    )
+
+
+def test_polygon_needs_three_points():
+    with pytest.raises(ValueError):
+        Polygon([Position(0, 0), Position(1, 1)])
+
+
+def test_polygon_bounds(notch):
+    bounds = notch.bounds
+    assert (bounds.top, bounds.left, bounds.bottom, bounds.right) == (0, 0, 100, 100)
+
+
+def test_contains_position_convex(square):
+    assert square.contains_position(Position(200, 200))
+    assert not square.contains_position(Position(50, 200))
+    assert not square.contains_position(Position(200, 350))
+
+
+def test_contains_position_concave(notch):
+    assert notch.contains_position(Position(20, 20))
+    assert notch.contains_position(Position(50, 80))
+    assert not notch.contains_position(Position(50, 30))
+
+
+def test_contains_points_matches_single_test(notch):
+    random.seed(5)
+    positions = [
+        Position(random.uniform(-20, 120), random.uniform(-20, 120)) for _ in range(500)
+    ]
+    batched = notch.contains_positions(positions)
+    assert batched.dtype == np.bool_
+    assert batched.tolist() == [notch.contains_position(p) for p in positions]
+
+
+def test_objects_in_polygon_matches_brute_force(notch, make_grid, populate):
+    grid = make_grid(8, Area(top=0, left=0, bottom=100, right=100))
+    items = populate(grid, 400, seed=11, high=99.9)
+
+    found = list(grid.objects_in_polygon(notch))
+    assert len(found) == len(set(found))
+    assert set(found) == {
+        item for item in items if notch.contains_position(item.position)
+    }
+
+
+def test_cells_in_polygon_classifies_cells(square, make_grid):
+    grid = make_grid(8, Area(top=0, left=0, bottom=400, right=400))
+    inside, boundary = grid.cells_in_polygon(square)
+    # cells are 50 wide and the edges run along cell lines 2 and 6
+    assert {(c.grid_coord.x, c.grid_coord.y) for c in inside} == {
+        (x, y) for x in (3, 4, 5) for y in (3, 4, 5)
+    }
+    for cell in boundary:
+        assert cell.grid_coord.x in (2, 6) or cell.grid_coord.y in (2, 6)
@@ -0,0 +1,81 @@
+import math
+
+import pytest
+
+from cnegng.ACME.spatial2d import Area, Circle, Motion, Position
+from cnegng.ACME.spatial2d.grid import Grid, GridSize
+from cnegng.ACME.spatial2d.prediction import time_to_enter, time_to_within
+
+
+class Mover:
+    def __init__(self, position: Position, motion: Motion = None):
+        self.owning_cell = None
+        self.position = position
+        if motion is not None:
+            self.motion = motion
+
+
+def test_motion_velocity():
+    vx, vy = Motion(direction=math.pi / 2, speed=10).velocity()
+    assert vx == pytest.approx(0)
+    assert vy == pytest.approx(10)
+
+
+def test_time_to_within_head_on():
+    t = time_to_within(
+        Position(0, 0), Motion(0, 5), Position(100, 0), Motion(math.pi, 5), 10
+    )
+    assert t == pytest.approx(9.0)
+
+
+def test_time_to_within_already_close_and_never():
+    assert time_to_within(Position(0, 0), None, Position(3, 4), None, 5) == 0
+    # moving away
+    assert math.isinf(
+        time_to_within(Position(0, 0), None, Position(10, 0), Motion(0, 1), 5)
+    )
+    # passing by too far off the line
+    assert math.isinf(
+        time_to_within(Position(0, 0), None, Position(-50, 20), Motion(0, 10), 5)
+    )
+
+
+def test_time_to_enter_circle():
+    t = time_to_enter(Position(0, 50), Motion(0, 10), Circle(Position(100, 50), 20))
+    assert t == pytest.approx(8.0)
+
+
+@pytest.fixture
+def grid():
+    return Grid(Area(top=0, left=0, bottom=1000, right=1000), GridSize(10, 10))
+
+
+def add(grid, mover):
+    grid.add_to_cell(mover, coords=mover.position)
+    return mover
+
+
+def test_objects_entering_circle(grid):
+    zone = Circle(Position(500, 500), 50)
+    soon = add(grid, Mover(Position(300, 500), Motion(0, 50)))  # enters at t=3
+    later = add(grid, Mover(Position(500, 100), Motion(math.pi / 2, 50)))  # t=7
+    add(grid, Mover(Position(300, 500), Motion(math.pi, 50)))  # moving away
+    add(grid, Mover(Position(100, 100)))  # parked
+    inside = add(grid, Mover(Position(510, 500)))
+
+    hits = grid.objects_entering_circle(zone, within=10, max_speed=50)
+    assert [obj for obj, _ in hits] == [soon, later]
+    assert [t for _, t in hits] == pytest.approx([3.0, 7.0])
+
+    assert [obj for obj, _ in grid.objects_entering_circle(zone, 5, 50)] == [soon]
+    with_inside = grid.objects_entering_circle(zone, 5, 50, include_inside=True)
+    assert with_inside[0] == (inside, 0.0)
+
+
+def test_objects_approaching_a_moving_object(grid):
+    hunter = add(grid, Mover(Position(100, 500), Motion(0, 20)))
+    prey = add(grid, Mover(Position(300, 500)))
+    add(grid, Mover(Position(900, 900)))
+    hits = grid.objects_approaching(hunter, reach=20, within=15, max_speed=20)
+    assert [obj for obj, _ in hits] == [prey]
+    assert hits[0][1] == pytest.approx(9.0)
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from cnegng.ACME.spatial2d import Area, Position, VisibilityMap
+
+
+def world(cells=10, teams=1, **kwargs):
+    # cells of 10 x 10 world units
+    area = Area(top=0, left=0, bottom=cells * 10, right=cells * 10)
+    return VisibilityMap(area, cells, cells, teams=teams, **kwargs)
+
+
+def cell_center(col, row):
+    return Position(col * 10 + 5, row * 10 + 5)
+
+
+def test_observer_sees_cells_within_its_radius():
+    fog = world()
+    fog.add_observer("a", 0, cell_center(4, 4), radius=20)
+    seen = fog.seen(0)
+    assert seen[4, 4] and seen[4, 6] and seen[6, 4] and seen[5, 5]
+    assert not seen[6, 6] and not seen[4, 7]
+    assert seen.sum() == 13
+    assert fog.visible(0, Position(47, 61))
+    assert not fog.visible(0, Position(47, 75))
+
+
+def test_bits_are_packed_eight_cells_to_a_byte():
+    fog = world(cells=20)
+    fog.add_observer("a", 0, cell_center(9, 0), radius=0)
+    assert fog.bits.shape == (1, 20, 3)
+    assert fog.bits[0, 0].tolist() == [0, 0b01000000, 0]
+
+
+def test_teams_see_separately_and_overlaps_are_counted():
+    fog = world(teams=2)
+    fog.add_observer("a", 0, cell_center(2, 2), radius=10)
+    fog.add_observer("b", 0, cell_center(3, 2), radius=10)
+    fog.add_observer("c", 1, cell_center(8, 8), radius=10)
+    assert fog.counts[0, 2, 2] == 2 and fog.counts[0, 2, 3] == 2
+    assert not fog.visible(1, cell_center(2, 2))
+    assert fog.visible(1, cell_center(8, 8))
+    fog.remove_observer("a")
+    assert fog.visible(0, cell_center(2, 2))
+    assert not fog.visible(0, cell_center(1, 2))
+
+
+def test_moving_within_a_cell_restamps_nothing():
+    fog = world()
+    fog.add_observer("a", 0, Position(41, 41), radius=20)
+    before = fog.bits.copy()
+    assert fog.move_many(["a"], [48], [49]) == 0
+    assert fog.move_observer("a", Position(71, 41))
+    assert not np.array_equal(before, fog.bits)
+    fresh = world()
+    fresh.add_observer("a", 0, Position(71, 41), radius=20)
+    assert np.array_equal(fresh.counts, fog.counts)
+    assert np.array_equal(fresh.bits, fog.bits)
+
+
+def test_incremental_moves_match_a_fresh_stamp():
+    rng = np.random.default_rng(5)
+    opaque = rng.random((30, 30)) < 0.15
+    fog = world(cells=30, teams=3, opaque=opaque)
+    keys = list(range(60))
+    xs = rng.random(60) * 300
+    ys = rng.random(60) * 300
+    for key in keys:
+        fog.add_observer(key, key % 3, Position(xs[key], ys[key]), radius=45)
+    for _ in range(5):
+        xs = np.clip(xs + rng.normal(0, 15, 60), 0, 299)
+        ys = np.clip(ys + rng.normal(0, 15, 60), 0, 299)
+        fog.move_many(keys, xs, ys)
+    fresh = world(cells=30, teams=3, opaque=opaque)
+    for key in keys:
+        fresh.add_observer(key, key % 3, Position(xs[key], ys[key]), radius=45)
+    assert np.array_equal(fresh.counts, fog.counts)
+    assert np.array_equal(fresh.bits, fog.bits)
+
+
+def test_opaque_cells_hide_what_is_behind_them():
+    opaque = np.zeros((10, 10), dtype=bool)
+    opaque[4, 5] = True
+    fog = world(opaque=opaque)
+    fog.add_observer("a", 0, cell_center(3, 4), radius=40)
+    assert fog.visible(0, cell_center(5, 4))  # the wall itself
+    assert not fog.visible(0, cell_center(6, 4))
+    assert not fog.visible(0, cell_center(7, 4))
+    assert fog.visible(0, cell_center(6, 6))
+    fog.set_opaque(None)
+    assert fog.visible(0, cell_center(7, 4))
+
+
+def test_filter_keeps_only_visible_objects(make_grid, add_item):
+    grid = make_grid(area=Area(top=0, left=0, bottom=100, right=100))
+    near = add_item(grid, 12, 12)
+    add_item(grid, 88, 88)  # out of sight
+    fog = VisibilityMap.for_grid(grid)
+    fog.add_observer("a", 0, Position(15, 15), radius=20)
+    found = grid.objects_in_area(Area(top=0, left=0, bottom=100, right=100))
+    assert fog.filter(0, found) == [near]
+
+
+def test_bad_arguments_are_rejected():
+    fog = world(teams=2)
+    with pytest.raises(ValueError):
+        fog.add_observer("a", 2, cell_center(0, 0), radius=10)
+    fog.add_observer("a", 0, cell_center(0, 0), radius=10)
+    with pytest.raises(ValueError):
+        fog.add_observer("a", 0, cell_center(0, 0), radius=10)
+    with pytest.raises(ValueError):
+        fog.set_opaque(np.zeros((3, 3), dtype=bool))
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from cnegng.ACME.alias_table import AliasTable, build_alias
+
+
+def frequencies(table, draws=200_000):
+    return np.bincount(table.draw(draws), minlength=len(table)) / draws
+
+
+def test_build_alias_reproduces_the_weights():
+    weights = np.array([1.0, 5.0, 0.0, 2.0])
+    prob, alias = build_alias(weights)
+    # probability mass every slot ends up with
+    mass = prob.copy()
+    np.add.at(mass, alias, 1 - prob)
+    assert np.allclose(mass / len(weights), weights / weights.sum())
+
+
+def test_draws_follow_the_weights():
+    weights = np.array([1, 5, 0, 2, 0, 0, 8, 4], dtype=float)
+    table = AliasTable(weights, block_size=3, seed=1)
+    assert len(table) == 8
+    assert table.total == 20
+    assert np.allclose(frequencies(table), weights / weights.sum(), atol=0.005)
+
+
+def test_update_rebuilds_only_touched_blocks():
+    weights = np.ones(1000)
+    table = AliasTable(weights, block_size=100, seed=2)
+    table.update([5, 17, 950], [0, 0, 300])
+    assert table.blocks_rebuilt == 2
+    expected = table.weights / table.weights.sum()
+    assert table.weights[950] == 300
+    seen = frequencies(table, 400_000)
+    assert seen[5] == 0 and seen[17] == 0
+    assert seen[950] == pytest.approx(expected[950], abs=0.01)
+    assert np.allclose(seen, expected, atol=0.002)
+
+
+def test_draw_one_and_bad_weights():
+    table = AliasTable([0, 0, 3], seed=3)
+    assert table.draw_one() == 2
+    with pytest.raises(ValueError):
+        AliasTable([1, -1])
+    with pytest.raises(ValueError):
+        AliasTable([])
+    table.update([2], [0])
+    with pytest.raises(ValueError):
+        table.draw(1)
@@ -0,0 +1,90 @@
+import numpy as np
+import pygame
+import pytest
+
+from cnegng.ACME.particles import ParticleSystem
+from cnegng.ACME.spatial2d import Area, Position
+
+
+def screen_area(width, height):
+    return Area(top=0, left=0, bottom=height, right=width)
+
+
+def test_emit_and_update_move_particles():
+    particles = ParticleSystem(10, gravity=(0, 10))
+    particles.emit([0, 5], [0, 5], [1, 2], [0, 0], [1.0, 0.25], (255, 0, 0))
+    assert particles.live_count() == 2
+    particles.update(0.5)
+    assert particles.x[:2].tolist() == pytest.approx([0.5, 6.0])
+    assert particles.y[:2].tolist() == pytest.approx([2.5, 7.5])
+    assert particles.live_count() == 1
+
+
+def test_ring_overwrites_the_oldest_particles():
+    particles = ParticleSystem(4)
+    particles.emit(np.arange(3), 0, 0, 0, 1.0, (1, 2, 3))
+    particles.emit([10, 11, 12], 0, 0, 0, 1.0, (1, 2, 3))
+    assert sorted(particles.x.tolist()) == [2, 10, 11, 12]
+    particles.emit(np.arange(100, 110), 0, 0, 0, 1.0, (1, 2, 3))
+    assert sorted(particles.x.tolist()) == [106, 107, 108, 109]
+    assert particles.live_count() == 4
+
+
+def test_burst_sprays_within_the_spread():
+    particles = ParticleSystem(1000, seed=3)
+    particles.burst(
+        Position(50, 50),
+        500,
+        speed=10,
+        lifetime=2,
+        color=(0, 255, 0),
+        direction=0,
+        spread=np.pi / 2,
+    )
+    speeds = np.hypot(particles.vx[:500], particles.vy[:500])
+    assert ((speeds >= 5) & (speeds <= 10)).all()
+    assert (particles.vx[:500] > 0).all()
+    assert (particles.remaining[:500] <= 2).all()
+
+
+def test_render_writes_faded_pixels():
+    surface = pygame.Surface((20, 10), depth=32)
+    particles = ParticleSystem(8)
+    particles.emit([2, 15, 500], [3, 8, 5], 0, 0, 2.0, [(200, 100, 50)])
+    particles.update(1.0)
+    drawn = particles.render(surface, screen_area(20, 10))
+    assert drawn == 2
+    assert surface.get_at((2, 3))[:3] == (100, 50, 25)
+    assert surface.get_at((15, 8))[:3] == (100, 50, 25)
+    assert surface.get_at((0, 0))[:3] == (0, 0, 0)
+
+
+def test_render_scales_world_to_screen_and_draws_blocks():
+    surface = pygame.Surface((100, 100), depth=32)
+    particles = ParticleSystem(4)
+    particles.emit([500_000], [250_000], 0, 0, 1.0, (255, 255, 255))
+    world = Area(top=0, left=0, bottom=1_000_000, right=1_000_000)
+    assert (
+        particles.render(
+            surface, world, Area(top=50, left=0, bottom=100, right=50), size=2
+        )
+        == 1
+    )
+    for x, y in [(25, 62), (26, 62), (25, 63), (26, 63)]:
+        assert surface.get_at((x, y))[:3] == (255, 255, 255)
+    assert surface.get_at((27, 62))[:3] == (0, 0, 0)
+
+
+def test_dead_particles_are_not_drawn():
+    surface = pygame.Surface((10, 10), depth=32)
+    particles = ParticleSystem(4)
+    particles.emit([5], [5], 0, 0, 0.1, (255, 255, 255))
+    particles.update(0.2)
+    assert particles.render(surface, screen_area(10, 10)) == 0
+    particles.clear()
+    assert particles.live_count() == 0
+
+
+def test_bad_capacity_is_rejected():
+    with pytest.raises(ValueError):
+        ParticleSystem(0)
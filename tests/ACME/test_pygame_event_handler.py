@@ -2,6 +2,7 @@ from flexmock import flexmock
 import pygame
 
 from cnegng.ACME import PyGameEventHandler
+from cnegng.ACME.spatial2d import Position
 
 
 class SpecificEventHandler(PyGameEventHandler):
@@ -42,3 +43,33 @@ def test_pygame_key_event_handler():
     fake_event = flexmock(type=pygame.KEYDOWN, key=pygame.K_w)
     event_handler.handle_event(fake_event)
     assert event_handler.some_value == 2
+
+
+class ClickHandler(PyGameEventHandler):
+    def __init__(self, picker):
+        self.picked = []
+        super().__init__()
+        self.register_pick_handler(picker, self.handle_pick)
+        self.register_mousedown_event_handler(pygame.BUTTON_RIGHT, self.handle_right)
+
+    def handle_pick(self, obj, event):
+        self.picked.append(obj)
+
+    def handle_right(self, event):
+        self.picked.append("right")
+
+
+def test_pygame_pick_handler():
+    picker = flexmock()
+    picker.should_receive("pick").with_args(Position(10, 20)).and_return("sprite")
+    event_handler = ClickHandler(picker)
+    event_handler.handle_event(
+        flexmock(type=pygame.MOUSEBUTTONDOWN, button=pygame.BUTTON_LEFT, pos=(10, 20))
+    )
+    event_handler.handle_event(
+        flexmock(type=pygame.MOUSEBUTTONDOWN, button=pygame.BUTTON_RIGHT, pos=(1, 2))
+    )
+    event_handler.handle_event(
+        flexmock(type=pygame.MOUSEBUTTONDOWN, button=pygame.BUTTON_MIDDLE, pos=(1, 2))
+    )
+    assert event_handler.picked == ["sprite", "right"]
@@ -108,3 +108,13 @@ def test_all_events_trigger(timed_event_handler: TimedEventHandler) -> None:
 
     timed_event_handler.apply(2.0)
     assert triggered[1]  # Now second event should trigger
+
+
+def test_current_time_follows_apply(timed_event_handler: TimedEventHandler) -> None:
+    """
+    Test that the clock reads the total time applied.
+    """
+    assert timed_event_handler.current_time == 0.0
+    timed_event_handler.apply(1.5)
+    timed_event_handler.apply(2.0)
+    assert timed_event_handler.current_time == 3.5
@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from cnegng.ACME.spatial2d import Area, Position
+from cnegng.ACME.spatial2d.grid import Grid, GridSize
+
+WORLD = Area(top=0, left=0, bottom=1000, right=1000)
+
+
+class DemoItem:
+    """A point object that a Grid can hold."""
+
+    def __init__(self, position: Position):
+        self.owning_cell = None
+        self.position = position
+
+
+@pytest.fixture
+def demo_item():
+    """The DemoItem class, for tests that make their own items."""
+    return DemoItem
+
+
+@pytest.fixture
+def make_grid():
+    """
+    make_grid(cells=10, area=WORLD, **kwargs): a Grid of cells x cells, or of a
+    GridSize; the keywords go to Grid.
+    """
+
+    def make(cells=10, area=WORLD, **kwargs):
+        grid_size = cells if isinstance(cells, GridSize) else GridSize(cells, cells)
+        return Grid(area, grid_size, **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def grid(make_grid):
+    return make_grid()
+
+
+@pytest.fixture
+def add_item():
+    """add_item(grid, x, y, layer="default"): a new DemoItem, added to the grid."""
+
+    def add(grid, x, y, layer="default"):
+        item = DemoItem(Position(x, y))
+        grid.add_to_cell(item, coords=item.position, layer=layer)
+        return item
+
+    return add
+
+
+@pytest.fixture
+def scatter():
+    """
+    scatter(count, seed, low=0, high=999.9, whole=False): DemoItems at random
+    positions with both coordinates between low and high, integers if whole.
+    """
+
+    def scatter(count, seed, low=0, high=999.9, whole=False):
+        random.seed(seed)
+        draw = random.randint if whole else random.uniform
+        return [
+            DemoItem(Position(draw(low, high), draw(low, high))) for _ in range(count)
+        ]
+
+    return scatter
+
+
+@pytest.fixture
+def populate(scatter):
+    """
+    populate(grid, count, seed, layer="default", **kwargs): scattered DemoItems,
+    added to the grid; the keywords go to scatter().
+    """
+
+    def populate(grid, count, seed, layer="default", **kwargs):
+        items = scatter(count, seed, **kwargs)
+        for item in items:
+            grid.add_to_cell(item, coords=item.position, layer=layer)
+        return items
+
+    return populate
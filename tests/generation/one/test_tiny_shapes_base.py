@@ -0,0 +1,55 @@
+import pygame
+import pytest
+
+from cnegng.ACME.spatial2d import Area, Grid, Position
+from cnegng.ACME.spatial2d.grid import GridSize
+from cnegng.generations.one import Sprite
+from cnegng.generations.one.base.tiny_shapes_base import (
+    PICK_HIGHLIGHT_COLOR,
+    SCREEN_HEIGHT,
+    SCREEN_WIDTH,
+    TinyShapesBase,
+)
+
+
+class PickDemo(TinyShapesBase):
+    def setup_basic_helpers(self):
+        self.area = Area(top=0, left=0, bottom=SCREEN_HEIGHT, right=SCREEN_WIDTH)
+        self.grid = Grid(self.area, GridSize(8, 8))
+        super().setup_basic_helpers()
+
+    def setup_basic_sprites(self):
+        texture = pygame.Surface((self.SHAPE_SIZE, self.SHAPE_SIZE))
+        texture.fill((200, 0, 0))
+        self.sprites = [Sprite("target", texture, Position(400, 300))]
+        self.grid.add_to_cell(self.sprites[0], coords=self.sprites[0].position)
+
+
+def click(game, x, y):
+    game.event_handler.handle_event(
+        pygame.event.Event(
+            pygame.MOUSEBUTTONDOWN, button=pygame.BUTTON_LEFT, pos=(x, y)
+        )
+    )
+
+
+@pytest.fixture
+def game():
+    return PickDemo()
+
+
+def test_clicking_a_sprite_outlines_it(game):
+    sprite = game.sprites[0]
+    click(game, 410, 310)
+    assert game.picked_sprite is sprite
+    game.surface.fill(game.fill_color)
+    game.render()
+    rect = game.picked_rect()
+    assert rect.collidepoint(410, 310)
+    assert game.surface.get_at(rect.topleft)[:3] == PICK_HIGHLIGHT_COLOR
+    # the sprite itself is drawn over by nothing
+    assert game.surface.get_at((410, 310))[:3] == (200, 0, 0)
+
+    click(game, 900, 900)
+    assert game.picked_sprite is None
+    assert game.picked_rect() is None
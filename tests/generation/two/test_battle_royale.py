@@ -0,0 +1,99 @@
+import numpy as np
+
+from cnegng.ACME.spatial2d import Area, Position
+from cnegng.ACME.spatial2d.poisson_disk import PoissonDiskSampler
+from cnegng.ACME.spatial2d.dimensions import Dimensions
+from cnegng.generations.two.battle_royale import BattleRoyale
+from cnegng.generations.two.loot_chest import LootChest
+
+
+def test_static_index_holds_chests():
+    game = BattleRoyale(Dimensions(1_000_000, 1_000_000))
+    near = LootChest(Position(10_000, 10_000))
+    far = LootChest(Position(900_000, 900_000))
+    game.chests.update([near, far])
+    index = game.build_static_index()
+    assert index.objects_in_area(Area(top=0, left=0, bottom=50_000, right=50_000)) == [
+        near
+    ]
+
+
+def test_place_chests_spreads_them_out():
+    game = BattleRoyale(Dimensions(1_000_000, 1_000_000))
+    chests = game.place_chests(500, seed=1)
+    assert len(chests) == 500
+    assert game.chests == set(chests)
+    assert len(game.static_index) == 500
+    spacing = PoissonDiskSampler.radius_for(Area(0, 0, 1_000_000, 1_000_000), 500)
+    nearest = min(
+        a.position.distance(b.position)
+        for a in chests[:50]
+        for b in chests
+        if a is not b
+    )
+    assert nearest >= spacing
+
+
+def test_spacing_can_follow_difficulty():
+    game = BattleRoyale(Dimensions(1_000_000, 1_000_000))
+    for column in game.region_map.map:
+        for region in column:
+            region.difficulty = 1
+    for x in range(50, 100):
+        for region in game.region_map.map[x]:
+            region.difficulty = 9
+    # hard regions get items twice as far apart
+    positions = game.scatter_positions(
+        2_000,
+        radius=8_000,
+        spacing_by_difficulty=lambda difficulty: np.where(difficulty > 5, 2.0, 1.0),
+        seed=2,
+    )
+    easy = sum(1 for position in positions if position.x < 500_000)
+    assert easy > 2 * (len(positions) - easy)
+
+
+def test_spawn_samplers_stay_on_the_map():
+    game = BattleRoyale(Dimensions(1_000_000, 1_000_000))
+    assert game.loot_spawns() is game.loot_spawns()
+    for position in game.player_spawns().draw_positions(100):
+        assert 0 <= position.x < 1_000_000
+        assert 0 <= position.y < 1_000_000
+
+
+def test_flow_fields_lead_everyone_to_the_goal():
+    game = BattleRoyale(Dimensions(1_000_000, 1_000_000))
+    assert game.flow_fields() is game.flow_fields()
+    goal = Position(505_000, 505_000)
+    field = game.flow_fields().field_to(goal)
+    xs = np.array([5_000.0, 995_000.0, 5_000.0])
+    ys = np.array([5_000.0, 5_000.0, 995_000.0])
+    for _ in range(400):
+        xs, ys = field.step(xs, ys, speed=5_000, dt=1.0, target=goal)
+    assert np.allclose(xs, goal.x) and np.allclose(ys, goal.y)
+
+
+def test_pathfinder_finds_routes_across_the_map():
+    game = BattleRoyale(Dimensions(1_000_000, 1_000_000))
+    assert game.pathfinder() is game.pathfinder()
+    path = game.pathfinder().find_path((0, 0), (99, 99))
+    assert path[0] == (0, 0) and path[-1] == (99, 99)
+
+
+def test_update_steps_players_critters_and_projectiles():
+    class Walker:
+        def __init__(self):
+            self.elapsed = 0
+
+        def update(self, dt):
+            self.elapsed += dt
+
+    game = BattleRoyale(Dimensions(1_000_000, 1_000_000))
+    player, critter = Walker(), Walker()
+    game.players.add(player)
+    game.critters.add(critter)
+    game.projectiles.fire(Position(0, 0), 100, 0, ttl=1.0)
+    game.update(0.5)
+    assert player.elapsed == critter.elapsed == 0.5
+    assert game.projectiles.x[0] == 50
+    assert game.projectile_hits == []
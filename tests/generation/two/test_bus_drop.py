@@ -0,0 +1,168 @@
+import gc
+import time
+
+import numpy as np
+import pytest
+
+from cnegng.ACME import TimedEventHandler
+from cnegng.ACME.spatial2d import Area, Position
+from cnegng.ACME.spatial2d.dimensions import Dimensions
+from cnegng.generations.two.battle_royale import BattleRoyale
+from cnegng.generations.two.bus_drop import BusDrop
+
+BIG_WORLD = Area(top=0, left=0, bottom=1_000_000, right=1_000_000)
+
+
+@pytest.fixture
+def make_drop(make_grid, demo_item):
+    def make_drop(count=200, **kwargs):
+        grid = make_grid(cells=20)
+        players = [demo_item(None) for _ in range(count)]
+        events = TimedEventHandler()
+        kwargs.setdefault("flight_time", 10)
+        kwargs.setdefault("glide_range", 100)
+        kwargs.setdefault("glide_speed", 50)
+        kwargs.setdefault("seed", 3)
+        drop = BusDrop(
+            grid, players, Position(0, 500), Position(1000, 500), events, **kwargs
+        )
+        return grid, players, events, drop
+
+    return make_drop
+
+
+def fly(events, seconds, frame=0.05):
+    for _ in range(round(seconds / frame)):
+        events.apply(frame)
+
+
+def test_plan_keeps_jumps_on_the_path_and_landings_on_the_map(make_drop):
+    _, _, _, drop = make_drop()
+    assert np.all(np.diff(drop.jump_time) >= 0)
+    assert np.all((drop.jump_time >= 0) & (drop.jump_time <= 10))
+    assert np.allclose(drop.jump_y, 500)
+    assert np.allclose(drop.jump_x, drop.jump_time * 100)
+    glide = np.hypot(drop.land_x - drop.jump_x, drop.land_y - drop.jump_y)
+    assert np.all(glide <= 100 + 1e-9)
+    assert np.all((drop.land_x >= 0) & (drop.land_x < 1000))
+    assert np.allclose(drop.land_time, drop.jump_time + glide / 50)
+
+
+def test_ticks_move_the_bus_and_land_players_in_the_grid(make_drop):
+    grid, players, events, drop = make_drop()
+    landed = []
+    drop.on_land = landed.extend
+    drop.start()
+    fly(events, 5)
+    # at most one tick behind the clock
+    assert 475 - 1e-6 <= drop.bus_position.x <= 500
+    assert 0 < drop.landed < len(players)
+    for player in landed:
+        assert player.owning_cell is not None
+        assert player.owning_cell.area.contains(player.position)
+    waiting = [player for player in players if player.owning_cell is None]
+    assert len(waiting) == len(players) - drop.landed
+    fly(events, 20)
+    assert drop.finished()
+    assert len(landed) == len(players)
+    assert not events.has_pending_events()
+
+
+def test_positions_follow_bus_glide_and_landing(make_drop):
+    _, _, _, drop = make_drop(count=50)
+    xs, ys, airborne = drop.positions_at(0)
+    assert np.allclose(xs, 0) and np.allclose(ys, 500)
+    assert not airborne.any()
+    middle = (drop.jump_time + drop.land_time) / 2
+    for index in range(50):
+        xs, ys, airborne = drop.positions_at(middle[index])
+        if drop.land_time[index] > drop.jump_time[index]:
+            assert airborne[index]
+        assert xs[index] == pytest.approx((drop.jump_x[index] + drop.land_x[index]) / 2)
+    xs, ys, airborne = drop.positions_at(drop.land_time.max())
+    assert np.allclose(xs, drop.land_x) and np.allclose(ys, drop.land_y)
+    assert not airborne.any()
+
+
+def test_current_time_moves_between_ticks(make_drop):
+    _, _, events, drop = make_drop()
+    drop.start()
+    events.apply(0.1)
+    assert drop.elapsed == 0
+    assert drop.current_time == pytest.approx(0.1)
+    assert drop.bus_position_at(drop.current_time).x == pytest.approx(10)
+
+
+def test_move_airborne_moves_only_gliders(make_drop):
+    _, players, _, drop = make_drop(count=50)
+    time = float(np.median(drop.jump_time))
+    xs, ys, airborne = drop.positions_at(time)
+    moved = drop.move_airborne(time)
+    assert moved.tolist() == np.flatnonzero(airborne).tolist()
+    for index, player in enumerate(players):
+        if airborne[index]:
+            assert (player.position.x, player.position.y) == (xs[index], ys[index])
+        else:
+            assert player.position is None
+
+
+def test_landings_at_the_far_edge_stay_on_the_map(make_drop):
+    grid, players, events, drop = make_drop(count=50, glide_range=5000)
+    assert drop.land_x.max() == np.nextafter(1000.0, 0.0)
+    drop.start()
+    fly(events, 200, frame=1.0)
+    assert drop.finished()
+    assert all(player.owning_cell is not None for player in players)
+
+
+def test_stop_halts_the_drop(make_drop):
+    _, _, events, drop = make_drop()
+    drop.start()
+    fly(events, 2)
+    drop.stop()
+    landed = drop.landed
+    fly(events, 20)
+    assert drop.landed == landed
+
+
+def test_large_drop_spreads_its_work_over_the_flight(make_grid, demo_item):
+    grid = make_grid(100, BIG_WORLD)
+    players = [demo_item(None) for _ in range(10_000)]
+    events = TimedEventHandler()
+    started = time.perf_counter()
+    drop = BusDrop(
+        grid,
+        players,
+        Position(0, 500_000),
+        Position(1_000_000, 500_000),
+        events,
+        seed=1,
+    )
+    planning = time.perf_counter() - started
+    drop.start()
+    slowest = 0.0
+    # a full garbage collection can take longer than the limit by itself, and says
+    # nothing about how the drop spreads its own work
+    gc.disable()
+    try:
+        while not drop.finished():
+            started = time.perf_counter()
+            events.apply(1 / 60)
+            slowest = max(slowest, time.perf_counter() - started)
+    finally:
+        gc.enable()
+    assert planning < 0.05
+    assert slowest < 0.008
+
+
+def test_battle_royale_drops_players_along_its_bus_path(make_grid, demo_item):
+    grid = make_grid(50, BIG_WORLD)
+    contest = BattleRoyale(Dimensions(1_000_000, 1_000_000), grid=grid)
+    players = [demo_item(None) for _ in range(20)]
+    drop = contest.bus_drop(players, TimedEventHandler(), seed=4)
+    start, end = contest.bus_path()
+    assert (drop.bus_position.x, drop.bus_position.y) == (start.x, start.y)
+    assert (drop.end_position.x, drop.end_position.y) == (end.x, end.y)
+    assert contest.players == set(players)
+    with pytest.raises(ValueError):
+        BattleRoyale(Dimensions(10, 10)).bus_drop(players, TimedEventHandler())
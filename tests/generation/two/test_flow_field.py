@@ -0,0 +1,95 @@
+import math
+
+import numpy as np
+import pytest
+
+from cnegng.ACME.spatial2d import Position
+from cnegng.generations.two.flow_field import FlowField, FlowFields
+from cnegng.generations.two.region import RegionMap
+
+SIZE = RegionMap.REGION_SIZE
+
+
+def flat_map(difficulty=1):
+    region_map = RegionMap(10, 10)
+    for column in region_map.map:
+        for region in column:
+            region.difficulty = difficulty
+    return region_map
+
+
+def test_integration_on_open_ground_is_octile_distance():
+    field = FlowField(np.ones((10, 10)), goal=(0, 0))
+    assert field.integration[0, 0] == 0
+    assert field.integration[5, 0] == pytest.approx(5)
+    assert field.integration[3, 3] == pytest.approx(3 * math.sqrt(2))
+    assert field.integration[5, 2] == pytest.approx(3 + 2 * math.sqrt(2))
+    assert field.direction_x[0, 0] == 0 and field.direction_y[0, 0] == 0
+    assert field.direction_x[4, 4] == pytest.approx(-math.sqrt(0.5))
+    assert field.direction_y[4, 4] == pytest.approx(-math.sqrt(0.5))
+
+
+def test_field_goes_around_hard_regions():
+    costs = np.ones((9, 9))
+    # a wall across the middle with a gap at the bottom
+    costs[4, :8] = np.inf
+    field = FlowField(costs, goal=(8, 0))
+    assert math.isfinite(field.integration[0, 0])
+    assert field.integration[0, 0] > 8
+    # from behind the wall the way leads down to the gap, not straight at it
+    assert field.direction_y[3, 0] > 0.5
+    xs, ys = np.array([0.5 * SIZE]), np.array([0.5 * SIZE])
+    goal = field.goal_center()
+    for _ in range(100):
+        xs, ys = field.step(xs, ys, speed=SIZE / 4, dt=1.0)
+        assert costs[int(xs[0] // SIZE), int(ys[0] // SIZE)] == 1
+    assert xs[0] == pytest.approx(goal.x) and ys[0] == pytest.approx(goal.y)
+
+
+def test_unreachable_regions_stand_still():
+    costs = np.ones((5, 5))
+    costs[2, :] = np.inf
+    field = FlowField(costs, goal=(0, 0))
+    assert math.isinf(field.integration[4, 4])
+    dx, dy = field.directions([4.5 * SIZE], [4.5 * SIZE])
+    assert dx[0] == 0 and dy[0] == 0
+
+
+def test_directions_in_the_goal_region_head_for_the_target():
+    field = FlowField(np.ones((4, 4)), goal=(1, 1))
+    target = Position(1.2 * SIZE, 1.8 * SIZE)
+    dx, dy = field.directions(
+        [1.2 * SIZE, 3.5 * SIZE], [1.2 * SIZE, 1.5 * SIZE], target
+    )
+    assert dx[0] == pytest.approx(0) and dy[0] == pytest.approx(1)
+    assert dx[1] == pytest.approx(-1) and dy[1] == pytest.approx(0)
+    xs, ys = field.step([1.2 * SIZE], [1.2 * SIZE], speed=SIZE, dt=1.0, target=target)
+    assert xs[0] == pytest.approx(target.x) and ys[0] == pytest.approx(target.y)
+
+
+def test_goal_outside_the_map_is_rejected():
+    with pytest.raises(ValueError):
+        FlowField(np.ones((3, 3)), goal=(3, 0))
+
+
+def test_fields_are_cached_per_goal_region():
+    fields = FlowFields(flat_map(), maxsize=2)
+    first = fields.field_to(Position(1.1 * SIZE, 1.1 * SIZE))
+    assert fields.field_to(Position(1.9 * SIZE, 1.2 * SIZE)) is first
+    assert (fields.hits, fields.misses) == (1, 1)
+    fields.field_to_region((5, 5))
+    fields.field_to_region((6, 6))
+    assert fields.field_to_region((1, 1)) is not first
+    assert fields.misses == 4
+
+
+def test_refresh_picks_up_new_difficulties():
+    region_map = flat_map()
+    fields = FlowFields(region_map)
+    before = fields.field_to_region((0, 0))
+    region_map.map[1][0].difficulty = 20
+    assert fields.field_to_region((0, 0)) is before
+    fields.refresh()
+    after = fields.field_to_region((0, 0))
+    assert after is not before
+    assert after.integration[2, 0] > before.integration[2, 0]
@@ -0,0 +1,174 @@
+import math
+
+import numpy as np
+import pytest
+
+from cnegng.ACME.spatial2d import Position
+from cnegng.generations.two.flow_field import FlowField
+from cnegng.generations.two.hierarchical_path import HierarchicalPathfinder
+from cnegng.generations.two.region import RegionMap
+
+
+def flat_map(size=20, difficulty=1):
+    region_map = RegionMap(size, size)
+    for column in region_map.map:
+        for region in column:
+            region.difficulty = difficulty
+    return region_map
+
+
+def walls(difficulty):
+    """Difficulty 99 and up is impassable."""
+    difficulty = np.asarray(difficulty, dtype=float)
+    return np.where(difficulty >= 99, np.inf, difficulty)
+
+
+def assert_connected(path):
+    for (ax, ay), (bx, by) in zip(path, path[1:]):
+        assert max(abs(ax - bx), abs(ay - by)) == 1
+
+
+def test_open_ground_path_is_straight():
+    paths = HierarchicalPathfinder(flat_map(), cluster_size=5)
+    path = paths.find_path((1, 1), (18, 1))
+    assert path[0] == (1, 1) and path[-1] == (18, 1)
+    assert_connected(path)
+    assert paths.path_cost(path) == pytest.approx(17)
+
+
+def test_path_is_close_to_the_cheapest():
+    region_map = flat_map(30)
+    rng = np.random.default_rng(4)
+    for column in region_map.map:
+        for region in column:
+            region.difficulty = int(rng.integers(1, 10))
+    paths = HierarchicalPathfinder(region_map, cluster_size=6)
+    for start, goal in [((0, 0), (29, 29)), ((3, 25), (27, 2)), ((14, 0), (15, 29))]:
+        path = paths.find_path(start, goal)
+        assert_connected(path)
+        best = FlowField(paths.costs, goal).integration[start]
+        assert best <= paths.path_cost(path) <= best * 1.25
+
+
+def test_path_goes_through_the_gap():
+    region_map = flat_map()
+    for y in range(19):
+        region_map.map[10][y].difficulty = 99
+    paths = HierarchicalPathfinder(
+        region_map, cluster_size=5, cost_for_difficulty=walls
+    )
+    path = paths.find_path((2, 2), (17, 2))
+    assert_connected(path)
+    assert (10, 19) in path
+    assert all(not math.isinf(paths.costs[region]) for region in path)
+
+
+def test_unreachable_goal_gives_none():
+    region_map = flat_map()
+    for y in range(20):
+        region_map.map[10][y].difficulty = 99
+    paths = HierarchicalPathfinder(
+        region_map, cluster_size=5, cost_for_difficulty=walls
+    )
+    assert paths.find_path((2, 2), (17, 2)) is None
+    assert paths.find_path((10, 3), (2, 2)) is None
+    assert paths.find_path((4, 4), (4, 4)) == [(4, 4)]
+
+
+def test_paths_within_one_cluster_may_leave_it():
+    region_map = flat_map()
+    # a wall inside the cluster, so going round means leaving it
+    for y in range(0, 5):
+        region_map.map[2][y].difficulty = 99
+    paths = HierarchicalPathfinder(
+        region_map, cluster_size=5, cost_for_difficulty=walls
+    )
+    path = paths.find_path((0, 0), (4, 0))
+    assert_connected(path)
+    assert any(y >= 5 for _, y in path)
+
+
+def test_paths_are_cached():
+    paths = HierarchicalPathfinder(flat_map(), cluster_size=5, cache_size=1)
+    first = paths.find_path((0, 0), (19, 19))
+    assert paths.find_path((0, 0), (19, 19)) == first
+    assert (paths.hits, paths.misses) == (1, 1)
+    paths.find_path((0, 19), (19, 0))
+    paths.find_path((0, 0), (19, 19))
+    assert paths.misses == 3
+
+
+def test_update_regions_repairs_only_paths_through_changed_clusters():
+    region_map = flat_map()
+    paths = HierarchicalPathfinder(
+        region_map, cluster_size=5, cost_for_difficulty=walls
+    )
+    top = paths.find_path((0, 1), (19, 1))
+    bottom = paths.find_path((0, 18), (19, 18))
+    for x in range(5, 10):
+        for y in range(0, 5):
+            region_map.map[x][y].difficulty = 99
+    changed = [(x, y) for x in range(5, 10) for y in range(0, 5)]
+    assert paths.update_regions(changed) == 1
+    assert paths.find_path((0, 18), (19, 18)) == bottom
+    repaired = paths.find_path((0, 1), (19, 1))
+    assert repaired != top
+    assert_connected(repaired)
+    assert not any(5 <= x < 10 and y < 5 for x, y in repaired)
+    # the repaired graph matches one built from scratch
+    fresh = HierarchicalPathfinder(
+        region_map, cluster_size=5, cost_for_difficulty=walls
+    )
+    assert paths.path_cost(repaired) == pytest.approx(
+        fresh.path_cost(fresh.find_path((0, 1), (19, 1)))
+    )
+    assert paths.update_regions(changed) == 0
+
+
+def test_repaired_paths_match_a_fresh_plan():
+    region_map = flat_map(30)
+    rng = np.random.default_rng(11)
+    for column in region_map.map:
+        for region in column:
+            region.difficulty = float(rng.uniform(1, 10))
+    paths = HierarchicalPathfinder(region_map, cluster_size=6)
+    pairs = [
+        (tuple(rng.integers(0, 30, 2).tolist()), tuple(rng.integers(0, 30, 2).tolist()))
+        for _ in range(40)
+    ]
+    for start, goal in pairs:
+        paths.find_path(start, goal)
+    changed = []
+    for x in range(6, 12):
+        for y in range(12, 18):
+            # dearer in one corner of the cluster, cheaper in another
+            region_map.map[x][y].difficulty *= 3 if x < 9 else 0.5
+            changed.append((x, y))
+    for x, y in [(25, 3), (26, 3), (27, 4)]:
+        region_map.map[x][y].difficulty += 4
+        changed.append((x, y))
+    rerouted = paths.update_regions(changed)
+    assert 0 < rerouted < len(pairs)
+    fresh = HierarchicalPathfinder(region_map, cluster_size=6)
+    hits = paths.hits
+    for start, goal in pairs:
+        assert paths.find_path(start, goal) == fresh.find_path(start, goal)
+    # every path was repaired in the cache, none planned from scratch
+    assert paths.hits - hits == len(pairs)
+
+
+def test_find_waypoints_ends_at_the_goal():
+    paths = HierarchicalPathfinder(flat_map(), cluster_size=5)
+    size = RegionMap.REGION_SIZE
+    goal = Position(15.2 * size, 3.7 * size)
+    waypoints = paths.find_waypoints(Position(0.5 * size, 0.5 * size), goal)
+    assert waypoints[0].x == pytest.approx(0.5 * size)
+    assert (waypoints[-1].x, waypoints[-1].y) == (goal.x, goal.y)
+
+
+def test_bad_arguments_are_rejected():
+    with pytest.raises(ValueError):
+        HierarchicalPathfinder(flat_map(), cluster_size=0)
+    paths = HierarchicalPathfinder(flat_map(), cluster_size=5)
+    with pytest.raises(ValueError):
+        paths.find_path((0, 0), (20, 0))
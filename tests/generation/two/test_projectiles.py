@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from cnegng.ACME.spatial2d import Position
+from cnegng.generations.two.projectiles import ProjectileStore
+
+
+def test_projectiles_move_and_expire_without_a_grid():
+    store = ProjectileStore(grid=None)
+    store.fire_many([0, 10], [0, 10], [100, 0], [0, -50], [1.0, 0.3])
+    assert store.step(0.25) == []
+    assert store.x[:2].tolist() == [25, 10]
+    assert store.y[:2].tolist() == [0, -2.5]
+    store.step(0.25)
+    assert len(store) == 1
+    assert store.x[0] == 50
+
+
+def test_fast_projectile_hits_without_tunnelling(make_grid, add_item):
+    grid = make_grid()
+    target = add_item(grid, 500, 105, layer="player")
+    store = ProjectileStore(grid, hit_radius=10)
+    # crosses the whole target in one step
+    store.fire(Position(100, 100), 20_000, 0, ttl=1.0, owner="shooter", damage=7)
+    hits = store.step(0.05)
+    assert len(hits) == 1
+    hit = hits[0]
+    assert hit.target is target and hit.owner == "shooter" and hit.damage == 7
+    expected_x = 500 - np.sqrt(100 - 25)
+    assert hit.position.x == pytest.approx(expected_x)
+    assert hit.time == pytest.approx((expected_x - 100) / 20_000)
+    assert len(store) == 0
+
+
+def test_earliest_hit_across_layers_wins_and_owner_is_ignored(make_grid, add_item):
+    grid = make_grid()
+    shooter = add_item(grid, 100, 500, layer="player")
+    far_player = add_item(grid, 700, 500, layer="player")
+    critter = add_item(grid, 400, 500, layer="critter")
+    store = ProjectileStore(grid, hit_radius=5)
+    store.fire(Position(100, 500), 10_000, 0, ttl=1.0, owner=shooter)
+    store.fire(Position(900, 500), -10_000, 0, ttl=1.0, owner=critter)
+    hits = store.step(0.1)
+    assert {(hit.owner, hit.target) for hit in hits} == {
+        (shooter, critter),
+        (critter, far_player),
+    }
+
+
+def test_off_axis_shots_aimed_at_a_target_hit_it(make_grid, add_item):
+    rng = np.random.default_rng(5)
+    for (x, y), (target_x, target_y) in rng.random((20, 2, 2)) * 1000:
+        grid = make_grid()
+        target = add_item(grid, target_x, target_y, layer="player")
+        # the path only passes the target to within rounding, so the default
+        # hit radius is what makes these count
+        store = ProjectileStore(grid)
+        speed = 3000 / np.hypot(target_x - x, target_y - y)
+        store.fire(
+            Position(x, y), (target_x - x) * speed, (target_y - y) * speed, ttl=1.0
+        )
+        assert [hit.target for hit in store.step(1.0)] == [target]
+
+
+def test_hit_radius_must_be_positive():
+    with pytest.raises(ValueError):
+        ProjectileStore(hit_radius=0)
+
+
+def test_projectiles_leaving_the_map_are_dropped(make_grid):
+    store = ProjectileStore(make_grid())
+    store.fire_many([990, 500], [500, 500], [100, 0], [0, 0], 5.0)
+    store.step(0.5)
+    assert len(store) == 1
+    assert store.x[0] == 500
+
+
+def test_projectiles_wrap_on_a_torus(make_grid, add_item):
+    grid = make_grid(wrap=True)
+    target = add_item(grid, 20, 500, layer="player")
+    store = ProjectileStore(grid, hit_radius=5)
+    store.fire(Position(960, 500), 1000, 0, ttl=5.0)
+    hits = store.step(0.1)
+    assert [hit.target for hit in hits] == [target]
+
+
+def test_compaction_keeps_survivors_in_order_and_arrays_grow():
+    store = ProjectileStore(capacity=2)
+    owners = [f"p{index}" for index in range(6)]
+    store.fire_many(np.arange(6), 0, 1, 0, [1, 0.1, 1, 0.1, 1, 1], owners)
+    assert store.x.size >= 6
+    store.step(0.5)
+    assert len(store) == 4
+    assert store.owner[:4].tolist() == ["p0", "p2", "p4", "p5"]
+    assert store.x[:4].tolist() == [0.5, 2.5, 4.5, 5.5]
+    assert store.owner[4] is None
+
+
+def test_many_projectiles_in_one_step(make_grid, add_item):
+    grid = make_grid()
+    rng = np.random.default_rng(2)
+    targets = [
+        add_item(grid, x, y, layer="player") for x, y in rng.random((500, 2)) * 1000
+    ]
+    store = ProjectileStore(grid, hit_radius=3)
+    xs, ys = rng.random((2, 5000)) * 1000
+    angles = rng.random(5000) * 2 * np.pi
+    store.fire_many(xs, ys, np.cos(angles) * 2000, np.sin(angles) * 2000, 2.0)
+    hits = store.step(1 / 60)
+    assert len(store) + len(hits) <= 5000
+    for hit in hits:
+        assert hit.target in targets
+        assert hit.position.distance(hit.target.position) <= 3 + 1e-6
@@ -0,0 +1,31 @@
+from cnegng.ACME.spatial2d import Position
+from cnegng.generations.two.region import RegionMap
+
+
+def test_region_map_influence_map_has_a_cell_per_region():
+    region_map = RegionMap(20, 20)
+    field = region_map.influence_map()
+    assert field.values.shape == (20, 20)
+    assert field.cell_of(Position(25_000, 195_000)) == (2, 19)
+
+
+def test_difficulty_at_many_matches_terrain_at():
+    region_map = RegionMap(20, 20)
+    xs = [0, 15_000, 199_999, 250_000, -5]
+    ys = [0, 195_000, 5_000, 250_000, 30_000]
+    expected = [region_map.terrain_at((x, y)).difficulty for x, y in zip(xs, ys)]
+    assert region_map.difficulty_at_many(xs, ys).tolist() == expected
+
+
+def test_region_map_visibility_map_blocks_sight_with_terrain():
+    region_map = RegionMap(20, 20)
+    for column in region_map.map:
+        for region in column:
+            region.terrain_type = "grassland"
+    region_map.map[5][2].terrain_type = "forest"
+    fog = region_map.visibility_map(teams=2, blocking=("forest",))
+    assert fog.counts.shape == (2, 20, 20)
+    fog.add_observer("scout", 0, Position(25_000, 25_000), radius=60_000)
+    assert fog.visible(0, Position(55_000, 25_000))
+    assert not fog.visible(0, Position(65_000, 25_000))
+    assert not fog.visible(1, Position(35_000, 25_000))
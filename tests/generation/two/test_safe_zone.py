@@ -0,0 +1,73 @@
+import pytest
+
+from cnegng.ACME import TimedEventHandler
+from cnegng.ACME.spatial2d import Circle, Position
+from cnegng.generations.two.safe_zone import SafeZone, ZonePhase
+
+
+@pytest.fixture
+def populated_grid(make_grid, populate):
+    def populated_grid(count=2_000):
+        grid = make_grid(cells=20)
+        return grid, populate(grid, count, seed=5, layer="player", high=999)
+
+    return populated_grid
+
+
+def test_zone_shrinks_in_phases_and_damages_in_batches(populated_grid):
+    grid, items = populated_grid()
+    events = TimedEventHandler()
+    batches = []
+    phases = [
+        ZonePhase(wait=2, shrink_time=4, radius=300, damage_per_second=1),
+        ZonePhase(wait=1, shrink_time=2, radius=100, damage_per_second=3),
+    ]
+    zone = SafeZone(
+        grid,
+        Circle(Position(500, 500), 800),
+        phases,
+        events,
+        layer="player",
+        apply_damage=lambda objects, amount: batches.append((len(objects), amount)),
+        seed=1,
+    )
+    zone.start()
+    events.apply(1)
+    assert zone.circle.radius == 800 and not zone.shrinking
+    for _ in range(3):
+        events.apply(1)
+    assert zone.shrinking
+    assert 300 < zone.circle.radius < 800
+    for _ in range(10):
+        events.apply(1)
+    assert zone.phase == 2
+    assert zone.circle.radius == 100
+    # the final circle fits inside the first one
+    assert zone.circle.center.distance(Position(500, 500)) <= 800 - 100
+    # one call per tick, with the whole batch
+    assert len(batches) > 5
+    assert batches[-1][1] == 3
+    assert batches[-1][0] == len(zone.outside())
+
+
+def test_default_damage_is_added_up(populated_grid):
+    grid, items = populated_grid(count=200)
+    events = TimedEventHandler()
+    zone = SafeZone(
+        grid,
+        Circle(Position(0, 0), 500),
+        [ZonePhase(wait=100, shrink_time=1, radius=0, damage_per_second=2)],
+        events,
+        layer="player",
+        tick=0.5,
+    )
+    zone.start()
+    events.apply(0.5)
+    events.apply(0.5)
+    outside = [item for item in items if item.position.distance(Position(0, 0)) > 500]
+    assert outside
+    assert all(zone.damage_taken[item] == 2 for item in outside)
+    assert len(zone.damage_taken) == len(outside)
+    zone.stop()
+    events.apply(0.5)
+    assert all(zone.damage_taken[item] == 2 for item in outside)
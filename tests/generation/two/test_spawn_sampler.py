@@ -0,0 +1,57 @@
+import numpy as np
+
+from cnegng.generations.two.region import RegionMap
+from cnegng.generations.two.spawn_sampler import (
+    SpawnSampler,
+    fewer_players_when_deadlier,
+    more_loot_when_harder,
+)
+
+
+def flat_map(difficulty=1):
+    region_map = RegionMap(10, 10)
+    for column in region_map.map:
+        for region in column:
+            region.difficulty = difficulty
+    return region_map
+
+
+def test_positions_land_in_weighted_regions():
+    region_map = flat_map()
+    region_map.map[2][7].difficulty = 50
+    sampler = SpawnSampler(region_map, lambda d: (d > 10) * 1.0, seed=1)
+    xs, ys = sampler.draw(1000)
+    size = RegionMap.REGION_SIZE
+    assert ((xs >= 2 * size) & (xs < 3 * size)).all()
+    assert ((ys >= 7 * size) & (ys < 8 * size)).all()
+    # jittered across the region, not stacked on a corner
+    assert np.ptp(xs) > size / 2 and np.ptp(ys) > size / 2
+
+
+def test_loot_prefers_hard_regions_and_players_easy_ones():
+    region_map = flat_map()
+    for y in range(10):
+        region_map.map[0][y].difficulty = 9
+    size = RegionMap.REGION_SIZE
+    loot_xs, _ = SpawnSampler(region_map, more_loot_when_harder, seed=2).draw(20_000)
+    player_xs, _ = SpawnSampler(region_map, fewer_players_when_deadlier, seed=2).draw(
+        20_000
+    )
+    hard_loot = np.count_nonzero(loot_xs < size) / 20_000
+    hard_players = np.count_nonzero(player_xs < size) / 20_000
+    assert hard_loot > 0.4
+    assert hard_players < 0.02
+
+
+def test_refresh_passes_on_only_changed_regions():
+    region_map = flat_map()
+    sampler = SpawnSampler(region_map, more_loot_when_harder, block_size=10, seed=3)
+    assert sampler.refresh() == 0
+    region_map.map[3][3].difficulty = 100
+    assert sampler.refresh([(3, 3), (3, 4)]) == 1
+    assert sampler.table.blocks_rebuilt == 1
+    xs, ys = sampler.draw(10_000)
+    size = RegionMap.REGION_SIZE
+    inside = (xs // size == 3) & (ys // size == 3)
+    assert np.count_nonzero(inside) / 10_000 > 0.45
+    assert len(sampler.draw_positions(3)) == 3